@@ -1,23 +1,28 @@
 # app/activos.py (versión mejorada e integrada con GUI intuitiva)
 import json
 import os
-import tkinter as tk
-from tkinter import ttk, messagebox
 
 # Usar ruta absoluta para el archivo de activos
 ACTIVOS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados", "activos.json")
-resultados_dir = os.path.dirname(ACTIVOS_FILE)
-os.makedirs(resultados_dir, exist_ok=True)
 
-if not os.path.exists(ACTIVOS_FILE):
-    with open(ACTIVOS_FILE, "w") as f:
-        json.dump([], f, indent=4)
+def inicializar_archivo_activos():
+    """Crea resultados/ y un activos.json vacío si no existen (no se hace al importar)."""
+    os.makedirs(os.path.dirname(ACTIVOS_FILE), exist_ok=True)
+    if not os.path.exists(ACTIVOS_FILE):
+        with open(ACTIVOS_FILE, "w") as f:
+            json.dump([], f, indent=4)
 
 def calcular_valor_activo(c, i, d):
     return round((c + i + d) / 3, 2)
 
 def registrar_activo_gui():
     """Muestra ventana de registro de activos con diseño moderno y profesional."""
+    # tkinter solo se importa con la interfaz: el análisis funciona sin pantalla
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+
+    inicializar_archivo_activos()
+
     ventana = tk.Toplevel()
     ventana.title("➕ Registrar Activo - SECUREVAL")
     ventana.geometry("650x650")
@@ -321,6 +326,7 @@ def obtener_activos():
                     "descripcion": "Valor por defecto para activos no especificados"
                 }
             ]
+            os.makedirs(os.path.dirname(ACTIVOS_FILE), exist_ok=True)
             with open(ACTIVOS_FILE, "w", encoding='utf-8') as f:
                 json.dump(activos_default, f, indent=4, ensure_ascii=False)
             return activos_default
@@ -0,0 +1,519 @@
+# app/almacen_resultados.py - Almacén de resultados en SQLite
+# =====================================
+# Guarda cada análisis en resultados/resultados.sqlite con tablas
+# normalizadas, para que monitoreo, tratamiento y exportación PDF consulten
+# solo lo que necesitan en lugar de volver a leer los JSON completos:
+# - escaneos: un análisis por dominio (se conserva el último) con sus
+#   recuentos y máximos, calculados al guardarlo, para el catálogo, y la
+#   instantánea de sus indicadores (KPIs), que no cambia una vez guardado
+# - hosts: datos de cada subdominio (sistema operativo)
+# - puertos y tls: resultados de las sondas por host
+# - hallazgos: una fila por (host, tecnología) con su riesgo
+# - cves: identificadores CVE de cada hallazgo
+# - Modo WAL + busy_timeout para leer mientras otro proceso escribe
+# riesgo.json se sigue generando como lista de filas, junto a su versión
+# normalizada (exportar_riesgo_json), y el escaneo guarda la huella (fecha de modificación en ns y tamaño) del
+# archivo escrito. Las pantallas consultan en solo lectura: si riesgo.json
+# no coincide con su huella (análisis anterior al almacén o archivo
+# sustituido) se consulta una copia en memoria importada de los JSON una
+# vez por huella, sin escribir nada en disco. Al terminar cada análisis se importan una vez al
+# almacén los dominios analizados antes de él (importar_carpetas).
+# =====================================
+import os
+import json
+import time
+import sqlite3
+import itertools
+import threading
+import contextlib
+from urllib.parse import quote
+from .formato_resultados import RIESGO_NORMALIZADO, cargar_resultados, guardar_normalizado, guardar_resultados
+from .indicadores import calcular_indicadores, por_subdominio
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
+NOMBRE_BD = "resultados.sqlite"
+# Distribuciones ya calculadas por análisis (no cambian una vez guardado)
+MAX_DISTRIBUCIONES = 32
+_distribuciones = {}
+_lock_distribuciones = threading.Lock()
+_bases_en_memoria = itertools.count()
+# Copias en memoria de los dominios leídos de sus JSON: carpeta -> (huella, almacén)
+_importados = {}
+_lock_importados = threading.Lock()
+
+# Columnas numéricas sin tipo declarado: SQLite conserva int o float tal
+# cual se guardaron y la vista de compatibilidad reproduce las filas exactas
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS escaneos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dominio TEXT NOT NULL,
+    fecha REAL NOT NULL,
+    metadata TEXT NOT NULL,
+    huella TEXT,
+    total_hallazgos INTEGER,
+    total_subdominios INTEGER,
+    riesgo_max,
+    cvss_max,
+    indicadores TEXT
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    escaneo_id INTEGER NOT NULL REFERENCES escaneos(id) ON DELETE CASCADE,
+    subdominio TEXT NOT NULL,
+    sistema_operativo TEXT,
+    UNIQUE (escaneo_id, subdominio)
+);
+CREATE TABLE IF NOT EXISTS puertos (
+    host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    numero INTEGER,
+    linea TEXT NOT NULL,
+    PRIMARY KEY (host_id, posicion)
+);
+CREATE TABLE IF NOT EXISTS tls (
+    host_id INTEGER PRIMARY KEY REFERENCES hosts(id) ON DELETE CASCADE,
+    version TEXT,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hallazgos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    escaneo_id INTEGER NOT NULL REFERENCES escaneos(id) ON DELETE CASCADE,
+    host_id INTEGER NOT NULL REFERENCES hosts(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    tecnologia TEXT,
+    tipo_servicio TEXT,
+    cvss_max,
+    valor_activo,
+    probabilidad,
+    vulnerabilidad,
+    riesgo,
+    criticidad TEXT
+);
+CREATE TABLE IF NOT EXISTS cves (
+    hallazgo_id INTEGER NOT NULL REFERENCES hallazgos(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    cve_id TEXT NOT NULL,
+    PRIMARY KEY (hallazgo_id, posicion)
+);
+CREATE INDEX IF NOT EXISTS idx_escaneos_dominio ON escaneos(dominio, id);
+CREATE INDEX IF NOT EXISTS idx_hallazgos_escaneo ON hallazgos(escaneo_id, posicion);
+CREATE INDEX IF NOT EXISTS idx_hallazgos_criticidad ON hallazgos(criticidad);
+CREATE INDEX IF NOT EXISTS idx_hallazgos_tecnologia ON hallazgos(tecnologia);
+CREATE INDEX IF NOT EXISTS idx_cves_cve_id ON cves(cve_id);
+"""
+# Columnas de escaneos añadidas después de crear la tabla
+_COLUMNAS_ESCANEOS = (("huella", "TEXT"), ("total_hallazgos", "INTEGER"), ("total_subdominios", "INTEGER"),
+                      ("riesgo_max", ""), ("cvss_max", ""), ("indicadores", "TEXT"))
+# Recuentos y máximos de cada escaneo para el catálogo
+_RESUMIR_ESCANEOS = """
+UPDATE escaneos SET
+    total_hallazgos = (SELECT COUNT(*) FROM hallazgos h WHERE h.escaneo_id = escaneos.id),
+    total_subdominios = (SELECT COUNT(DISTINCT h.host_id) FROM hallazgos h WHERE h.escaneo_id = escaneos.id),
+    riesgo_max = (SELECT COALESCE(MAX(h.riesgo), 0) FROM hallazgos h WHERE h.escaneo_id = escaneos.id),
+    cvss_max = (SELECT COALESCE(MAX(h.cvss_max), 0) FROM hallazgos h WHERE h.escaneo_id = escaneos.id)
+WHERE {}"""
+
+def huella_riesgo(carpeta):
+    """Huella de riesgo.json de una carpeta ("mtime_ns:tamaño"), o None si no existe."""
+    try:
+        estado = os.stat(os.path.join(carpeta, "riesgo.json"))
+    except OSError:
+        return None
+    return f"{estado.st_mtime_ns}:{estado.st_size}"
+
+def _numero_puerto(linea):
+    """Puerto de una línea "80/tcp open http"; None para mensajes."""
+    inicio = linea.split("/", 1)[0]
+    return int(inicio) if "/" in linea and inicio.isdigit() else None
+
+class AlmacenResultados:
+    """
+    Resultados de análisis en SQLite, compartible entre hilos y procesos.
+
+    Con solo_lectura la base no se crea ni se modifica (falla con
+    sqlite3.Error si no existe). ruta=":memory:" crea una base temporal
+    con una sola conexión, compartida por todos los hilos.
+    """
+
+    def __init__(self, ruta=None, solo_lectura=False):
+        self.ruta = ruta or os.path.join(RESULTADOS_DIR, NOMBRE_BD)
+        self.solo_lectura = solo_lectura
+        # Identifica la base en las caches del módulo
+        self._clave = (f":memory:{next(_bases_en_memoria)}" if self.ruta == ":memory:"
+                       else os.path.abspath(self.ruta))
+        self._local = threading.local()
+        self._inicializada = False
+        self._lock = threading.Lock()
+
+    def _conexion(self):
+        """Devuelve la conexión del hilo actual, creando la base si hace falta."""
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            if self.ruta == ":memory:":
+                return self._conexion_en_memoria()
+            if self.solo_lectura:
+                conexion = sqlite3.connect(f"file:{quote(os.path.abspath(self.ruta))}?mode=ro",
+                                           uri=True, timeout=30)
+                conexion.execute("PRAGMA busy_timeout = 30000")
+                self._local.conexion = conexion
+                return conexion
+            if self.ruta != ":memory:":
+                os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            conexion = sqlite3.connect(self.ruta, timeout=30)
+            conexion.execute("PRAGMA busy_timeout = 30000")
+            conexion.execute("PRAGMA foreign_keys = ON")
+            with self._lock:
+                if not self._inicializada:
+                    conexion.execute("PRAGMA journal_mode = WAL")
+                    conexion.executescript(_ESQUEMA)
+                    columnas = [c[1] for c in conexion.execute("PRAGMA table_info(escaneos)")]
+                    for columna, tipo in _COLUMNAS_ESCANEOS:
+                        if columna not in columnas:
+                            # Base creada con una versión anterior del esquema
+                            conexion.execute(f"ALTER TABLE escaneos ADD COLUMN {columna} {tipo}")
+                    conexion.execute(_RESUMIR_ESCANEOS.format("total_hallazgos IS NULL"))
+                    for escaneo_id, in conexion.execute("SELECT id FROM escaneos WHERE indicadores IS NULL").fetchall():
+                        self._guardar_indicadores(conexion, escaneo_id)
+                    conexion.commit()
+                    self._inicializada = True
+            self._local.conexion = conexion
+        return conexion
+
+    def _conexion_en_memoria(self):
+        # Una conexión por hilo vería una base vacía distinta en cada hilo
+        with self._lock:
+            if not self._inicializada:
+                conexion = sqlite3.connect(":memory:", check_same_thread=False)
+                conexion.execute("PRAGMA foreign_keys = ON")
+                conexion.executescript(_ESQUEMA)
+                self._compartida = conexion
+                self._inicializada = True
+            return self._compartida
+
+    def guardar_escaneo(self, dominio, resultados, metadata=None, fecha=None):
+        """
+        Guarda un análisis completo (filas del formato anterior de riesgo.json) y
+        elimina el anterior del mismo dominio, en una sola transacción.
+
+        Returns:
+            int: identificador del escaneo
+        """
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute("DELETE FROM escaneos WHERE dominio = ?", (dominio,))
+            escaneo_id = conexion.execute(
+                "INSERT INTO escaneos (dominio, fecha, metadata) VALUES (?, ?, ?)",
+                (dominio, fecha or time.time(), json.dumps(metadata or {}, ensure_ascii=False))).lastrowid
+            hosts = {}
+            for posicion, fila in enumerate(resultados):
+                subdominio = fila.get("subdominio", "")
+                host_id = hosts.get(subdominio)
+                if host_id is None:
+                    host_id = hosts[subdominio] = self._guardar_host(conexion, escaneo_id, fila)
+                hallazgo_id = conexion.execute(
+                    "INSERT INTO hallazgos (escaneo_id, host_id, posicion, tecnologia, tipo_servicio, cvss_max, "
+                    "valor_activo, probabilidad, vulnerabilidad, riesgo, criticidad) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (escaneo_id, host_id, posicion, fila.get("tecnologia"), fila.get("tipo_servicio"),
+                     fila.get("cvss_max", 0.0), fila.get("valor_activo"), fila.get("probabilidad"),
+                     fila.get("vulnerabilidad"), fila.get("riesgo", 0), fila.get("criticidad"))).lastrowid
+                conexion.executemany(
+                    "INSERT INTO cves (hallazgo_id, posicion, cve_id) VALUES (?, ?, ?)",
+                    [(hallazgo_id, i, cve) for i, cve in enumerate(fila.get("cves") or [])])
+            conexion.execute(_RESUMIR_ESCANEOS.format("id = ?"), (escaneo_id,))
+            self._guardar_indicadores(conexion, escaneo_id)
+        return escaneo_id
+
+    def _guardar_indicadores(self, conexion, escaneo_id):
+        conexion.execute("UPDATE escaneos SET indicadores = ? WHERE id = ?",
+                         (json.dumps(calcular_indicadores(conexion, escaneo_id), ensure_ascii=False), escaneo_id))
+
+    def _guardar_host(self, conexion, escaneo_id, fila):
+        host_id = conexion.execute(
+            "INSERT INTO hosts (escaneo_id, subdominio, sistema_operativo) VALUES (?, ?, ?)",
+            (escaneo_id, fila.get("subdominio", ""), fila.get("sistema_operativo"))).lastrowid
+        conexion.executemany(
+            "INSERT INTO puertos (host_id, posicion, numero, linea) VALUES (?, ?, ?, ?)",
+            [(host_id, i, _numero_puerto(linea), linea) for i, linea in enumerate(fila.get("puertos") or [])])
+        tls = fila.get("tls")
+        version = tls.get("tls_version") if isinstance(tls, dict) else None
+        conexion.execute("INSERT INTO tls (host_id, version, datos) VALUES (?, ?, ?)",
+                         (host_id, version, json.dumps(tls, ensure_ascii=False)))
+        return host_id
+
+    def ultimo_escaneo(self, dominio):
+        """{"id", "dominio", "fecha", "metadata", "huella"} del último análisis, o None."""
+        fila = self._conexion().execute(
+            "SELECT id, dominio, fecha, metadata, huella FROM escaneos WHERE dominio = ? ORDER BY id DESC LIMIT 1",
+            (dominio,)).fetchone()
+        if fila is None:
+            return None
+        return {"id": fila[0], "dominio": fila[1], "fecha": fila[2], "metadata": json.loads(fila[3]),
+                "huella": fila[4]}
+
+    def dominios(self):
+        """
+        Dominios almacenados con su último análisis, leyendo solo la tabla
+        escaneos (los recuentos se calculan al guardar cada análisis).
+
+        Returns:
+            list: dicts con dominio, escaneo_id, fecha, metadata, huella,
+                  total_hallazgos, total_subdominios, riesgo_max y cvss_max
+        """
+        filas = self._conexion().execute("""
+            SELECT e.dominio, e.id, e.fecha, e.metadata, e.huella, e.total_hallazgos, e.total_subdominios,
+                   e.riesgo_max, e.cvss_max
+            FROM escaneos e WHERE e.id = (SELECT MAX(id) FROM escaneos WHERE dominio = e.dominio)
+            ORDER BY e.dominio""").fetchall()
+        return [{"dominio": d, "escaneo_id": i, "fecha": f, "metadata": json.loads(m), "huella": hu,
+                 "total_hallazgos": n, "total_subdominios": s, "riesgo_max": r, "cvss_max": c}
+                for d, i, f, m, hu, n, s, r, c in filas]
+
+    def indicadores(self, dominio):
+        """
+        Indicadores del último análisis (ver indicadores.calcular_indicadores),
+        o None: la instantánea guardada con el análisis, o calculados si la
+        base es anterior a ella y se abrió en solo lectura.
+        """
+        conexion = self._conexion()
+        fila = conexion.execute(
+            "SELECT id, indicadores FROM escaneos WHERE dominio = ? ORDER BY id DESC LIMIT 1", (dominio,)).fetchone()
+        if fila is None:
+            return None
+        if fila[1] is None:
+            return calcular_indicadores(conexion, fila[0])
+        return json.loads(fila[1])
+
+    def distribuciones(self, dominio):
+        """
+        Distribuciones del último análisis (ver distribuciones.calcular_distribuciones),
+        o None. Se calculan una vez por análisis y se comparten (no modificarlas).
+        """
+        # NumPy solo hace falta para el dashboard
+        from .distribuciones import calcular_distribuciones, columnas_escaneo
+        escaneo = self.ultimo_escaneo(dominio)
+        if escaneo is None:
+            return None
+        clave = (self._clave, escaneo["id"], escaneo["fecha"])
+        with _lock_distribuciones:
+            resultado = _distribuciones.get(clave)
+        if resultado is None:
+            resultado = calcular_distribuciones(columnas_escaneo(self._conexion(), escaneo["id"]))
+            with _lock_distribuciones:
+                _distribuciones[clave] = resultado
+                while len(_distribuciones) > MAX_DISTRIBUCIONES:
+                    del _distribuciones[next(iter(_distribuciones))]
+        return resultado
+
+    def hallazgos(self, dominio, criticidad=None):
+        """
+        Hallazgos del último análisis como filas del formato anterior (vista
+        de compatibilidad), en el orden original. None si no hay análisis.
+        """
+        escaneo = self.ultimo_escaneo(dominio)
+        if escaneo is None:
+            return None
+        conexion = self._conexion()
+        condicion, parametros = "h.escaneo_id = ?", [escaneo["id"]]
+        if criticidad:
+            condicion += " AND h.criticidad = ?"
+            parametros.append(criticidad)
+        filas = conexion.execute(f"""
+            SELECT h.id, h.host_id, s.subdominio, h.tecnologia, h.tipo_servicio, s.sistema_operativo,
+                   h.cvss_max, h.valor_activo, h.probabilidad, h.vulnerabilidad, h.riesgo, h.criticidad
+            FROM hallazgos h JOIN hosts s ON s.id = h.host_id
+            WHERE {condicion} ORDER BY h.posicion""", parametros).fetchall()
+
+        puertos, tls = {}, {}
+        for host_id, linea in conexion.execute("""
+                SELECT p.host_id, p.linea FROM puertos p JOIN hosts s ON s.id = p.host_id
+                WHERE s.escaneo_id = ? ORDER BY p.host_id, p.posicion""", (escaneo["id"],)):
+            puertos.setdefault(host_id, []).append(linea)
+        for host_id, datos in conexion.execute("""
+                SELECT t.host_id, t.datos FROM tls t JOIN hosts s ON s.id = t.host_id
+                WHERE s.escaneo_id = ?""", (escaneo["id"],)):
+            tls[host_id] = json.loads(datos)
+        cves = {}
+        for hallazgo_id, cve in conexion.execute("""
+                SELECT c.hallazgo_id, c.cve_id FROM cves c JOIN hallazgos h ON h.id = c.hallazgo_id
+                WHERE h.escaneo_id = ? ORDER BY c.hallazgo_id, c.posicion""", (escaneo["id"],)):
+            cves.setdefault(hallazgo_id, []).append(cve)
+
+        return [{
+            "subdominio": subdominio,
+            "tecnologia": tecnologia,
+            "tipo_servicio": tipo_servicio,
+            "sistema_operativo": sistema_operativo,
+            "puertos": puertos.get(host_id, []),
+            "tls": tls.get(host_id),
+            "cvss_max": cvss_max,
+            "valor_activo": valor_activo,
+            "probabilidad": probabilidad,
+            "vulnerabilidad": vulnerabilidad,
+            "riesgo": riesgo,
+            "criticidad": criticidad,
+            "cves": cves.get(hallazgo_id, []),
+        } for (hallazgo_id, host_id, subdominio, tecnologia, tipo_servicio, sistema_operativo,
+               cvss_max, valor_activo, probabilidad, vulnerabilidad, riesgo, criticidad) in filas]
+
+    def resumen(self, dominio):
+        """Resumen por subdominio con el formato de resumen.json, o None."""
+        escaneo = self.ultimo_escaneo(dominio)
+        if escaneo is None:
+            return None
+        conexion = self._conexion()
+        resumen = {subdominio: {"tecnologias": [], "total_tecnologias": info["total_tecnologias"],
+                                "total_cves": info["total_cves"], "riesgo_max": info["riesgo_max"],
+                                "riesgo_promedio": info["riesgo_promedio"]}
+                   for subdominio, info in por_subdominio(conexion, escaneo["id"]).items()}
+        for subdominio, tecnologia in conexion.execute("""
+                SELECT s.subdominio, h.tecnologia FROM hallazgos h JOIN hosts s ON s.id = h.host_id
+                WHERE h.escaneo_id = ? ORDER BY h.posicion""", (escaneo["id"],)):
+            tecnologias = resumen[subdominio]["tecnologias"]
+            if tecnologia not in tecnologias:
+                tecnologias.append(tecnologia)
+        return resumen
+
+    def exportar_riesgo_json(self, dominio, ruta):
+        """
+        Escribe riesgo.json (lista de filas) y riesgo_normalizado.json en su
+        misma carpeta a partir del almacén, y guarda la huella de riesgo.json
+        en el último análisis del dominio.
+        """
+        filas = self.hallazgos(dominio) or []
+        guardar_resultados(ruta, filas)
+        guardar_normalizado(os.path.join(os.path.dirname(ruta), RIESGO_NORMALIZADO), filas)
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute(
+                "UPDATE escaneos SET huella = ? WHERE id = (SELECT MAX(id) FROM escaneos WHERE dominio = ?)",
+                (huella_riesgo(os.path.dirname(ruta)), dominio))
+
+    def importar_json(self, dominio, carpeta):
+        """
+        Importa un análisis anterior al almacén desde riesgo.json y
+        metadata.json de su carpeta, con la huella de riesgo.json.
+
+        Returns:
+            bool: True si se importó
+        """
+        huella = huella_riesgo(carpeta)
+        if huella is None:
+            return False
+        try:
+            resultados = cargar_resultados(os.path.join(carpeta, "riesgo.json"))
+        except (OSError, ValueError):
+            return False
+        resultados = [fila for fila in resultados if isinstance(fila, dict)]
+        metadata = {}
+        try:
+            with open(os.path.join(carpeta, "metadata.json"), "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            pass
+        fecha = int(huella.split(":")[0]) / 1e9
+        escaneo_id = self.guardar_escaneo(dominio, resultados, metadata, fecha)
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute("UPDATE escaneos SET huella = ? WHERE id = ?", (huella, escaneo_id))
+        return True
+
+    def importar_carpetas(self, resultados_dir=None):
+        """
+        Importa los dominios de resultados_dir cuyo riesgo.json no está en el
+        almacén (análisis anteriores a él) o no coincide con su huella, para
+        que el catálogo y las consultas no vuelvan a leer sus JSON.
+
+        Returns:
+            int: dominios importados
+        """
+        resultados_dir = resultados_dir or RESULTADOS_DIR
+        try:
+            nombres = sorted(n for n in os.listdir(resultados_dir)
+                             if n != "__pycache__" and os.path.isdir(os.path.join(resultados_dir, n)))
+        except OSError:
+            return 0
+        almacenados = {fila["dominio"]: fila["huella"] for fila in self.dominios()}
+        importados = 0
+        for nombre in nombres:
+            carpeta = os.path.join(resultados_dir, nombre)
+            huella = huella_riesgo(carpeta)
+            if huella is not None and almacenados.get(nombre) != huella and self.importar_json(nombre, carpeta):
+                importados += 1
+        return importados
+
+    def cerrar(self):
+        if self.ruta == ":memory:":
+            with self._lock:
+                if self._inicializada:
+                    self._compartida.close()
+                    self._inicializada = False
+            return
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+def _importado(dominio, carpeta):
+    """
+    Copia en memoria de un dominio importada desde sus JSON, reutilizada
+    mientras riesgo.json conserve la misma huella (None si no se pudo leer).
+    """
+    clave = os.path.abspath(carpeta)
+    with _lock_importados:
+        previo = _importados.get(clave)
+        if previo is not None and previo[0] == huella_riesgo(carpeta):
+            return previo[1]
+        # La copia anterior no se cierra: puede seguir en uso en otro hilo
+        _importados.pop(clave, None)
+        almacen = AlmacenResultados(":memory:")
+        if not almacen.importar_json(dominio, carpeta):
+            return None
+        _importados[clave] = (almacen.ultimo_escaneo(dominio)["huella"], almacen)
+        return almacen
+
+@contextlib.contextmanager
+def abrir_dominio(dominio, resultados_dir=None):
+    """
+    Almacén con el último análisis de un dominio, sin escribir en disco:
+    resultados.sqlite en solo lectura si la huella guardada coincide con
+    riesgo.json; si no (o si no hay almacén), una copia en memoria importada
+    desde los JSON de la carpeta del dominio, que se reutiliza hasta que
+    cambie riesgo.json. None si no hay análisis.
+    """
+    resultados_dir = resultados_dir or RESULTADOS_DIR
+    carpeta = os.path.join(resultados_dir, dominio)
+    huella = huella_riesgo(carpeta)
+    almacen = AlmacenResultados(os.path.join(resultados_dir, NOMBRE_BD), solo_lectura=True)
+    try:
+        try:
+            escaneo = almacen.ultimo_escaneo(dominio)
+        except sqlite3.Error:
+            # Sin almacén, o creado antes de guardar la huella
+            escaneo = None
+        if huella is not None and escaneo is not None and escaneo["huella"] == huella:
+            yield almacen
+        else:
+            yield _importado(dominio, carpeta) if huella is not None else None
+    finally:
+        almacen.cerrar()
+
+def consultar_dominio(dominio, metodo, resultados_dir=None, **kwargs):
+    """
+    Consulta de solo lectura para las pantallas de monitoreo, tratamiento
+    y exportación (ver abrir_dominio).
+
+    Args:
+        metodo: nombre del método de AlmacenResultados ("hallazgos",
+                "resumen", "indicadores", "distribuciones", "ultimo_escaneo")
+
+    Returns:
+        El resultado del método, o None si el dominio no tiene análisis o
+        el almacén no está disponible (el llamador puede leer entonces los JSON)
+    """
+    try:
+        with abrir_dominio(dominio, resultados_dir) as almacen:
+            return getattr(almacen, metodo)(dominio, **kwargs) if almacen else None
+    except sqlite3.Error as e:
+        print(f"⚠️ Almacén de resultados no disponible: {e}")
+        return None
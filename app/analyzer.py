@@ -18,18 +18,62 @@
 import os
 import json
 import subprocess
-import requests
 import socket
-import ssl
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+import xml.etree.ElementTree as ET
+import time
+import sqlite3
 import threading
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
 from .activos import obtener_activos
+from .cache_cves import CacheCVEs, clave_consulta
+from .nvd_cliente import ClienteNVD
+from .nvd_offline import EspejoNVD
+from .lector_whatweb import leer_registros
+from .plugins_whatweb import consulta_cve, producto_desde_cadena, producto_y_version
+from .cpe import IndiceCPE, mas_graves, partes_consulta_cpe
+from .checkpoint import Checkpoint
+from .almacen_resultados import NOMBRE_BD, AlmacenResultados
+from .formato_resultados import RIESGO_NORMALIZADO, guardar_normalizado, guardar_resultados
+from .sonda_http import SondaHTTP
+from .escaner_tcp import escanear_tcp, lineas_puertos
+from .filtro_subdominios import FiltroSubdominios, cargar_exclusiones, normalizar_subdominio, en_alcance
+from .estado_hosts import VENTANA_INCREMENTAL, cargar_estado, guardar_estado, host_reutilizable, huella_whatweb
 
 NVD_API_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0"
 # Usar ruta absoluta para resultados
 RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
-os.makedirs(RESULTADOS_DIR, exist_ok=True)
+
+# Hosts sondeados en paralelo (SO, TLS y puertos) dentro de analizar_dominio
+CONCURRENCIA_HOSTS = 4
+# Resoluciones DNS simultáneas en la etapa de resolución previa
+CONCURRENCIA_DNS = 32
+# Escanear todos los hosts con una única ejecución de nmap (salida XML)
+ESCANEO_PUERTOS_LOTE = True
+# Límite de tiempo de nmap por host (segundos)
+TIMEOUT_NMAP_HOST = 45
+# Escáner de puertos: "nmap" (el escáner TCP integrado solo si nmap no está
+# instalado) o "tcp" (siempre el integrado, app/escaner_tcp.py)
+ESCANER_PUERTOS = "nmap"
+# Escaneo progresivo: tras el barrido rápido (-F) de todos los hosts, una
+# segunda pasada con más puertos y detección de versiones (-sV) solo sobre
+# los hosts con algún puerto abierto. Los productos detectados se buscan
+# en la base de CVEs como una tecnología más del host
+ESCANEO_PROGRESIVO = False
+PUERTOS_PROFUNDOS = 1000
+TIMEOUT_NMAP_PROFUNDO = 120
+# Origen de los CVEs: "online" (API de NVD) u "offline" (espejo local)
+BACKEND_CVES = "online"
+# Solapar descubrimiento, huellas y escaneo (hosts por lote parcial de nmap)
+MODO_STREAMING = False
+TAM_LOTE_STREAMING = 16
+# CVEs por CPE: resultados por página pedidos a la NVD (máximo 2000; se
+# recorren todas las páginas) y CVEs conservados (los de mayor CVSS)
+RESULTADOS_CPE_NVD = 2000
+LIMITE_CVES_CPE = 10
+# Reutilizar los datos de los hosts cuya huella de WhatWeb no ha cambiado
+# (vigencia: VENTANA_INCREMENTAL de app/estado_hosts.py)
+MODO_INCREMENTAL = False
 
 def clasificar_servicio(tech, url):
     tech_lower = tech.lower()
@@ -50,63 +94,95 @@ def clasificar_servicio(tech, url):
         return "Panel Administrativo"
     return "Otro"
 
+# Sonda HEAD compartida (pool keep-alive, sesiones TLS y cabeceras HTTPS
+# obtenidas por verificar_tls)
+sonda_http = SondaHTTP()
+
+def clasificar_sistema_operativo(cabeceras):
+    """Heurística de SO a partir de la respuesta HEAD (formato curl -sI)."""
+    headers = cabeceras.lower()
+    if "x-aspnet-version" in headers or "iis" in headers:
+        return "Windows/IIS"
+    elif "x-powered-by: php" in headers:
+        return "Linux/PHP"
+    elif "ubuntu" in headers or "linux" in headers:
+        return "Linux"
+    elif "windows" in headers:
+        return "Windows"
+    elif "cloudflare" in headers:
+        return "Proxy/CDN"
+    else:
+        return "Desconocido"
+
 def detectar_sistema_operativo(subdominio):
+    """
+    SO estimado por las cabeceras HTTP del host.
+
+    Si verificar_tls ya obtuvo las cabeceras HTTPS del host por su conexión
+    se usan esas; si no, se envía HEAD a la URL (http:// si no indica esquema).
+    """
     try:
-        result = subprocess.check_output(["curl", "-sI", f"http://{subdominio}"], timeout=10).decode()
-        headers = result.lower()
-        if "x-aspnet-version" in headers or "iis" in headers:
-            return "Windows/IIS"
-        elif "x-powered-by: php" in headers:
-            return "Linux/PHP"
-        elif "ubuntu" in headers or "linux" in headers:
-            return "Linux"
-        elif "windows" in headers:
-            return "Windows"
-        elif "cloudflare" in headers:
-            return "Proxy/CDN"
-        else:
-            return "Desconocido"
-    except:
+        cabeceras = sonda_http.cabeceras_host(extraer_hostname(subdominio))
+        return clasificar_sistema_operativo(cabeceras or sonda_http.head(subdominio))
+    except Exception:
         return "Desconocido"
 
-def verificar_tls(subdominio):
+def verificar_tls(subdominio, ip=None):
+    """Obtiene versión TLS, cifrado y vencimiento del certificado.
+
+    Acepta una URL o un hostname; el hostname se usa como SNI. Si se indica
+    ip, se conecta directamente a ella sin volver a resolver el nombre.
+    Por la misma conexión se piden las cabeceras HTTP (HEAD /), que
+    detectar_sistema_operativo reutiliza sin abrir otra conexión.
+    """
     try:
-        context = ssl.create_default_context()
-        with socket.create_connection((subdominio, 443), timeout=5) as sock:
-            with context.wrap_socket(sock, server_hostname=subdominio) as ssock:
-                cert = ssock.getpeercert()
-                cipher = ssock.cipher()
-                version = ssock.version()
-                return {
-                    "tls_version": version,
-                    "cifrado": cipher[0],
-                    "valido_hasta": cert.get("notAfter", "")
-                }
-    except:
+        hostname = extraer_hostname(subdominio)
+        (cert, cipher, version), _ = sonda_http.sondear_https(hostname, 443, ip, timeout=5)
+        return {
+            "tls_version": version,
+            "cifrado": cipher[0],
+            "valido_hasta": cert.get("notAfter", "")
+        }
+    except Exception:
         return {"tls_version": "No disponible", "cifrado": "-", "valido_hasta": "-"}
 
-def escanear_puertos_nmap(url):
-    """Escanea puertos usando nmap, extrayendo el hostname de la URL"""
+def extraer_hostname(url):
+    """Extrae el hostname de una URL o de un host con puerto/ruta"""
+    if "://" in url:
+        return url.split("://")[1].split("/")[0].split(":")[0]
+    return url.split("/")[0].split(":")[0]
+
+def escanear_puertos_nmap(url, ip=None, escaner=None, progresivo=None):
+    """Escanea puertos usando nmap, extrayendo el hostname de la URL
+
+    Si se indica ip (ya resuelta por la etapa DNS) se escanea directamente
+    sin volver a resolver el nombre. escaner ("nmap" o "tcp") y progresivo
+    valen por defecto ESCANER_PUERTOS y ESCANEO_PROGRESIVO.
+    """
+    escaner = escaner or ESCANER_PUERTOS
+    progresivo = ESCANEO_PROGRESIVO if progresivo is None else progresivo
     try:
         # Extraer hostname de la URL
-        if "://" in url:
-            hostname = url.split("://")[1].split("/")[0].split(":")[0]
-        else:
-            hostname = url.split("/")[0].split(":")[0]
+        hostname = extraer_hostname(url)
         
         print(f"🛡️ Escaneando puertos para hostname: {hostname}")
         
         # Verificar si el hostname se puede resolver antes de escanear
-        try:
-            import socket
-            socket.gethostbyname(hostname)
-        except socket.gaierror:
+        direcciones = [ip] if ip else _resolver_direcciones(hostname)
+        if not direcciones:
             print(f"❌ No se puede resolver DNS para {hostname}")
             return [f"DNS no resuelve: {hostname}"]
+
+        if escaner == "tcp":
+            return escanear_puertos_tcp(direcciones[:1])[direcciones[0]]
         
         # Ejecutar nmap con configuración optimizada
-        cmd = ["nmap", "-T4", "-F", "--max-retries", "1", hostname]
-        resultado = subprocess.check_output(cmd, timeout=45, stderr=subprocess.DEVNULL).decode()
+        cmd = ["nmap", "-T4", "-F", "--max-retries", "1", ip or hostname]
+        try:
+            resultado = subprocess.check_output(cmd, timeout=45, stderr=subprocess.DEVNULL).decode()
+        except FileNotFoundError:
+            print("⚠️ Nmap no está instalado: se usa el escáner TCP integrado")
+            return escanear_puertos_tcp(direcciones[:1])[direcciones[0]]
         
         # Extraer solo las líneas con puertos abiertos
         lineas = []
@@ -122,6 +198,8 @@ def escanear_puertos_nmap(url):
         
         if lineas:
             print(f"✅ Puertos abiertos encontrados para {hostname}: {len(lineas)} puertos")
+            if progresivo:
+                return escaneo_profundo([ip or hostname]).get(ip or hostname) or lineas
             return lineas
         else:
             print(f"🔒 No se encontraron puertos abiertos para {hostname}")
@@ -140,6 +218,279 @@ def escanear_puertos_nmap(url):
         print(f"❌ Error inesperado al escanear {hostname}: {e}")
         return [f"Error: {str(e)[:50]}..."]
 
+def escanear_puertos_tcp(ips):
+    """
+    Escanea IPs con el escáner TCP connect integrado (app/escaner_tcp.py),
+    con los mismos puertos que nmap -F.
+
+    Returns:
+        dict: IP -> lista de puertos con el formato de escanear_puertos_nmap
+    """
+    print(f"🛡️ Escaneo TCP integrado de {len(ips)} IPs")
+    resultados = {}
+    for ip, abiertos in escanear_tcp(ips, timeout_host=TIMEOUT_NMAP_HOST).items():
+        if abiertos is None:
+            print(f"⏱️ Timeout en escaneo de puertos para {ip} ({TIMEOUT_NMAP_HOST}s)")
+            resultados[ip] = [f"Timeout en escaneo ({TIMEOUT_NMAP_HOST}s)"]
+        elif abiertos:
+            print(f"✅ Puertos abiertos encontrados para {ip}: {len(abiertos)} puertos")
+            resultados[ip] = lineas_puertos(abiertos)
+        else:
+            print(f"🔒 No se encontraron puertos abiertos para {ip}")
+            resultados[ip] = ["No hay puertos abiertos"]
+    return resultados
+
+def parsear_xml_nmap(xml_texto):
+    """
+    Interpreta la salida XML de nmap (-oX).
+
+    Returns:
+        dict: hostname (o IP si nmap no conserva el nombre) ->
+              {"puertos": ["80/tcp open http", ...], "timeout": bool}
+              Con detección de versiones las líneas incluyen producto y
+              versión: "22/tcp open ssh OpenSSH 8.2p1".
+    """
+    hosts = {}
+    raiz = ET.fromstring(xml_texto)
+    for host in raiz.iter("host"):
+        nombres = [h.get("name") for h in host.findall("hostnames/hostname") if h.get("type") == "user"]
+        direcciones = [a.get("addr") for a in host.findall("address") if a.get("addrtype") in ("ipv4", "ipv6")]
+        lineas = []
+        for puerto in host.findall("ports/port"):
+            estado = puerto.find("state")
+            if estado is None or estado.get("state") != "open":
+                continue
+            servicio = puerto.find("service")
+            nombre_servicio = servicio.get("name", "unknown") if servicio is not None else "unknown"
+            linea = f"{puerto.get('portid')}/{puerto.get('protocol', 'tcp')} open {nombre_servicio}"
+            # Con -sV: producto y versión, como la columna VERSION de nmap
+            if servicio is not None and servicio.get("product"):
+                linea += " " + " ".join(filter(None, (servicio.get("product"), servicio.get("version"))))
+            lineas.append(linea)
+        info = {"puertos": lineas, "timeout": host.get("timedout") == "true"}
+        for clave in nombres + direcciones:
+            hosts.setdefault(clave, info)
+    return hosts
+
+def _puertos_abiertos(puertos):
+    """Líneas de puertos abiertos (sin los mensajes de DNS, timeout o error)."""
+    return [p for p in puertos if not any(x in p.lower() for x in
+            ["dns no resuelve", "timeout", "error", "no hay puertos", "nmap no disponible"])]
+
+def escaneo_profundo(objetivos):
+    """
+    Segunda pasada del escaneo progresivo: PUERTOS_PROFUNDOS puertos con
+    detección de versiones (nmap -sV) sobre hosts que ya tienen algún
+    puerto abierto.
+
+    Returns:
+        dict: objetivo -> líneas de puertos con producto y versión. Los
+              objetivos que fallan no aparecen (se conserva el barrido).
+    """
+    if not objetivos:
+        return {}
+    print(f"🔬 Escaneo profundo con detección de versiones de {len(objetivos)} hosts")
+    cmd = ["nmap", "-T4", "-sV", "--version-light", "--top-ports", str(PUERTOS_PROFUNDOS),
+           "--max-retries", "1", "--host-timeout", f"{TIMEOUT_NMAP_PROFUNDO}s", "-oX", "-"] + list(objetivos)
+    try:
+        salida = subprocess.check_output(cmd, timeout=TIMEOUT_NMAP_PROFUNDO * len(objetivos),
+                                         stderr=subprocess.DEVNULL).decode()
+        hosts_xml = parsear_xml_nmap(salida)
+    except FileNotFoundError:
+        print("⏭️ Nmap no está instalado: sin detección de versiones de servicios")
+        return {}
+    except (subprocess.SubprocessError, ET.ParseError) as e:
+        print(f"❌ Error en escaneo profundo: {str(e)[:100]}")
+        return {}
+    return {objetivo: hosts_xml[objetivo]["puertos"] for objetivo in objetivos
+            if objetivo in hosts_xml and hosts_xml[objetivo]["puertos"] and not hosts_xml[objetivo]["timeout"]}
+
+def _sin_cpe_repetidos(tecnologias):
+    """
+    Una sola tecnología por CPE en un host: el plugin PHP y X-Powered-By
+    (PHP/8.1.2) son el mismo producto y no deben contar dos hallazgos.
+    """
+    vistos = set()
+    unicas = []
+    for tech, consulta in tecnologias:
+        if consulta and consulta.startswith("cpe:2.3:"):
+            if consulta in vistos:
+                continue
+            vistos.add(consulta)
+        unicas.append((tech, consulta))
+    return unicas
+
+def servicios_con_version(puertos):
+    """
+    Productos detectados por el escaneo de versiones de un host, como
+    tecnologías para la búsqueda de CVEs.
+
+    Returns:
+        list: (producto, consulta de CVEs) en el orden de los puertos
+    """
+    servicios = {}
+    for linea in puertos or []:
+        campos = linea.split(None, 3)
+        if len(campos) < 4 or campos[1] != "open":
+            continue
+        producto, version = producto_desde_cadena(campos[3])
+        if producto and version and producto not in servicios:
+            servicios[producto] = indice_cpe.cpe_para(producto, version) or f"{producto} {version}"
+    return list(servicios.items())
+
+def escanear_puertos_nmap_lote(urls, cache=None, escaner=None, progresivo=None):
+    """
+    Escanea todos los hosts en una sola ejecución de nmap con salida XML.
+
+    Deduplica las URLs por IP resuelta, deja que nmap paralelice entre
+    hosts y devuelve un dict URL -> lista de puertos con el mismo formato
+    que escanear_puertos_nmap. cache (CacheEndpoints) reutiliza las
+    resoluciones DNS de la ejecución. escaner y progresivo como en
+    escanear_puertos_nmap.
+    """
+    escaner = escaner or ESCANER_PUERTOS
+    progresivo = ESCANEO_PROGRESIVO if progresivo is None else progresivo
+    hostnames = {}
+    for url in urls:
+        hostnames.setdefault(extraer_hostname(url), []).append(url)
+
+    # Agrupar por IP: los subdominios que apuntan a la misma dirección
+    # se escanean una sola vez
+    resultados_host = {}
+    ips = {}
+    for hostname in hostnames:
+        ip = (cache or CacheEndpoints()).resolver(hostname)
+        if ip is None:
+            print(f"❌ No se puede resolver DNS para {hostname}")
+            resultados_host[hostname] = [f"DNS no resuelve: {hostname}"]
+        else:
+            ips.setdefault(ip, []).append(hostname)
+
+    if ips and escaner == "tcp":
+        puertos_ip = escanear_puertos_tcp(list(ips))
+    elif ips:
+        print(f"🛡️ Escaneando puertos en lote para {len(hostnames)} hosts ({len(ips)} IPs distintas)")
+        cmd = ["nmap", "-T4", "-F", "--max-retries", "1",
+               "--host-timeout", f"{TIMEOUT_NMAP_HOST}s", "-oX", "-"] + list(ips)
+        try:
+            salida = subprocess.check_output(cmd, timeout=TIMEOUT_NMAP_HOST * len(ips),
+                                             stderr=subprocess.DEVNULL).decode()
+            hosts_xml = parsear_xml_nmap(salida)
+            puertos_ip = {}
+            for ip in ips:
+                info = hosts_xml.get(ip)
+                if info and info["timeout"]:
+                    puertos_ip[ip] = [f"Timeout en escaneo ({TIMEOUT_NMAP_HOST}s)"]
+                elif info and info["puertos"]:
+                    print(f"✅ Puertos abiertos encontrados para {ip}: {len(info['puertos'])} puertos")
+                    puertos_ip[ip] = info["puertos"]
+                else:
+                    puertos_ip[ip] = ["No hay puertos abiertos"]
+        except subprocess.TimeoutExpired:
+            print("⏱️ Timeout en escaneo de puertos en lote")
+            puertos_ip = {ip: [f"Timeout en escaneo ({TIMEOUT_NMAP_HOST}s)"] for ip in ips}
+        except FileNotFoundError:
+            print("⚠️ Nmap no está instalado: se usa el escáner TCP integrado")
+            puertos_ip = escanear_puertos_tcp(list(ips))
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error en comando nmap en lote: código {e.returncode}")
+            puertos_ip = {ip: ["Error en comando nmap"] for ip in ips}
+        except Exception as e:
+            print(f"❌ Error inesperado en escaneo en lote: {e}")
+            puertos_ip = {ip: [f"Error: {str(e)[:50]}..."] for ip in ips}
+
+    if ips and progresivo:
+        # Segunda pasada solo donde el barrido encontró algo escuchando
+        puertos_ip.update(escaneo_profundo([ip for ip in ips if _puertos_abiertos(puertos_ip[ip])]))
+
+    for ip, hostnames_ip in ips.items():
+        for hostname in hostnames_ip:
+            resultados_host[hostname] = puertos_ip[ip]
+
+    return {url: list(resultados_host[hostname])
+            for hostname, urls_host in hostnames.items() for url in urls_host}
+
+def _resolver_direcciones(hostname):
+    """Direcciones IP de un hostname (IPv4 primero); [] si no resuelve."""
+    try:
+        infos = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, OSError):
+        return []
+    direcciones = list(dict.fromkeys(info[4][0] for info in infos))
+    return sorted(direcciones, key=lambda direccion: ":" in direccion)
+
+class CacheEndpoints:
+    """
+    Cache de sondas por endpoint válida durante una ejecución.
+
+    Los puertos se indexan por IP resuelta y TLS por (IP, hostname SNI), de
+    modo que los subdominios que comparten endpoint se sondean una sola vez.
+    Es segura entre hilos: si dos hilos piden la misma clave, uno ejecuta
+    la sonda y el otro espera su resultado.
+
+    Las resoluciones DNS también se guardan, incluidas las negativas
+    (NXDOMAIN), y pueden hacerse en bloque con resolver_lote. escaner y
+    progresivo se pasan a escanear_puertos_nmap (por defecto ESCANER_PUERTOS
+    y ESCANEO_PROGRESIVO).
+    """
+
+    def __init__(self, escaner=None, progresivo=None):
+        self._lock = threading.Lock()
+        self._entradas = {}
+        self.escaner = escaner
+        self.progresivo = progresivo
+
+    def obtener(self, clave, funcion, *args):
+        with self._lock:
+            futuro = self._entradas.get(clave)
+            propietario = futuro is None
+            if propietario:
+                futuro = Future()
+                self._entradas[clave] = futuro
+        if propietario:
+            try:
+                futuro.set_result(funcion(*args))
+            except BaseException as e:
+                futuro.set_exception(e)
+        return futuro.result()
+
+    def direcciones(self, hostname):
+        return self.obtener(("dns", hostname), _resolver_direcciones, hostname)
+
+    def resoluble(self, hostname):
+        return bool(self.direcciones(hostname))
+
+    def resolver(self, hostname):
+        """IPv4 del host (clave de endpoint) o None."""
+        return next((d for d in self.direcciones(hostname) if ":" not in d), None)
+
+    def resolver_lote(self, hostnames, hilos=None):
+        """
+        Resuelve varios hostnames en paralelo y guarda los resultados.
+
+        Returns:
+            dict: hostname -> lista de direcciones ([] si no resuelve)
+        """
+        pendientes = list(dict.fromkeys(hostnames))
+        if not pendientes:
+            return {}
+        hilos = min(hilos or CONCURRENCIA_DNS, len(pendientes))
+        with ThreadPoolExecutor(max_workers=hilos) as pool_dns:
+            return dict(zip(pendientes, pool_dns.map(self.direcciones, pendientes)))
+
+    def puertos(self, url):
+        ip = self.resolver(extraer_hostname(url))
+        if ip is None:
+            return escanear_puertos_nmap(url, None, self.escaner, self.progresivo)
+        return list(self.obtener(("puertos", ip), escanear_puertos_nmap, url, ip, self.escaner, self.progresivo))
+
+    def tls(self, url):
+        hostname = extraer_hostname(url)
+        ip = self.resolver(hostname)
+        if ip is None:
+            return verificar_tls(url)
+        return dict(self.obtener(("tls", ip, hostname), verificar_tls, hostname, ip))
+
 def ejecutar_assetfinder(dominio):
     salida = os.path.join(RESULTADOS_DIR, dominio, "subdominios.txt")
     os.makedirs(os.path.dirname(salida), exist_ok=True)
@@ -147,24 +498,185 @@ def ejecutar_assetfinder(dominio):
         subprocess.run(["assetfinder", "--subs-only", dominio], stdout=f, check=True)
     return salida
 
+def filtrar_subdominios(file_subdominios, dominio, cache):
+    """
+    Etapa previa a WhatWeb: normaliza y deduplica los subdominios de
+    AssetFinder, aplica el alcance, los resuelve en paralelo y agrupa los
+    que solo responden por DNS comodín (ver FiltroSubdominios). Deja en
+    subdominios_resueltos.txt los que deben analizarse.
+
+    Returns:
+        str: ruta del archivo filtrado (entrada de WhatWeb)
+    """
+    carpeta = os.path.dirname(file_subdominios)
+    with open(file_subdominios, "r") as f:
+        lineas = [linea for linea in f if linea.strip()]
+    filtro = FiltroSubdominios(dominio, cache.direcciones, cargar_exclusiones(carpeta))
+    # Resolver en bloque los candidatos: el filtro encuentra la cache llena
+    candidatos = (normalizar_subdominio(linea) for linea in lineas)
+    cache.resolver_lote(h for h in candidatos if h and en_alcance(h, filtro.dominio, filtro.excluir))
+    subdominios = filtro.filtrar(lineas)
+    print(f"🌐 {len(subdominios)}/{len(lineas)} subdominios pasan a WhatWeb (descartados: {filtro.resumen()})")
+    salida = os.path.join(carpeta, "subdominios_resueltos.txt")
+    with open(salida, "w") as f:
+        f.writelines(s + "\n" for s in subdominios)
+    return salida
+
 def ejecutar_whatweb(file_subdominios, dominio):
     salida = os.path.join(RESULTADOS_DIR, dominio, "tecnologias.json")
     subprocess.run(["whatweb", "-i", file_subdominios, "--log-json", salida], check=True)
     return salida
 
-cve_cache = {}
-def buscar_cves(tecnologia):
-    if tecnologia in cve_cache:
-        return cve_cache[tecnologia]
-    url = f"{NVD_API_URL}?keywordSearch={tecnologia}&resultsPerPage=3"
+def iniciar_descubrimiento_streaming(dominio, cache=None):
+    """
+    Lanza AssetFinder y WhatWeb conectados: cada subdominio que emite
+    AssetFinder se guarda en subdominios.txt, se filtra en paralelo (alcance,
+    DNS y comodines, ver FiltroSubdominios) y, si se admite, se envía a
+    WhatWeb por su entrada estándar (una tubería acotada por el sistema
+    operativo). cache (CacheEndpoints) conserva las resoluciones para el
+    resto del análisis.
+
+    Returns:
+        tuple: (ruta de tecnologias.json, función que indica si WhatWeb
+                sigue escribiendo) para leer los resultados en seguimiento
+    """
+    if cache is None:
+        cache = CacheEndpoints()
+    carpeta = os.path.join(RESULTADOS_DIR, dominio)
+    os.makedirs(carpeta, exist_ok=True)
+    salida_subdominios = os.path.join(carpeta, "subdominios.txt")
+    salida_tecnologias = os.path.join(carpeta, "tecnologias.json")
+    open(salida_tecnologias, "w").close()
+
+    assetfinder = subprocess.Popen(["assetfinder", "--subs-only", dominio],
+                                   stdout=subprocess.PIPE, text=True)
     try:
-        response = requests.get(url, timeout=15)
-        if response.status_code == 200:
-            datos = response.json().get("vulnerabilities", [])
-            cve_cache[tecnologia] = datos
-            return datos
-    except:
-        pass
+        whatweb = subprocess.Popen(["whatweb", "-i", "/dev/stdin", "--log-json", salida_tecnologias],
+                                   stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
+    except BaseException:
+        assetfinder.kill()
+        raise
+
+    lock_whatweb = threading.Lock()
+    filtro = FiltroSubdominios(dominio, cache.direcciones, cargar_exclusiones(carpeta))
+
+    def filtrar_y_enviar(subdominio):
+        host = filtro.admitir(subdominio)
+        if host is None:
+            return
+        with lock_whatweb:
+            whatweb.stdin.write(host + "\n")
+            whatweb.stdin.flush()
+
+    def transferir():
+        vistos = set()
+        try:
+            with open(salida_subdominios, "w") as f, \
+                    ThreadPoolExecutor(max_workers=CONCURRENCIA_DNS) as pool_dns:
+                envios = []
+                for linea in assetfinder.stdout:
+                    subdominio = linea.strip()
+                    if not subdominio or subdominio in vistos:
+                        continue
+                    vistos.add(subdominio)
+                    f.write(subdominio + "\n")
+                    f.flush()
+                    envios.append(pool_dns.submit(filtrar_y_enviar, subdominio))
+                for envio in envios:
+                    envio.result()
+        except (BrokenPipeError, OSError) as e:
+            print(f"❌ Error enviando subdominios a WhatWeb: {e}")
+        finally:
+            try:
+                whatweb.stdin.close()
+            except OSError:
+                pass
+            if assetfinder.wait() != 0:
+                print(f"⚠️ AssetFinder terminó con código {assetfinder.returncode}")
+            print(f"🔎 AssetFinder terminó: {len(vistos)} subdominios (descartados: {filtro.resumen()})")
+
+    threading.Thread(target=transferir, daemon=True).start()
+
+    def seguir():
+        if whatweb.poll() is None:
+            return True
+        if whatweb.returncode != 0:
+            print(f"⚠️ WhatWeb terminó con código {whatweb.returncode}")
+        return False
+
+    return salida_tecnologias, seguir
+
+cve_cache = {}
+# Cache persistente entre ejecuciones (resultados/cache_cves.sqlite)
+cache_cves_nvd = CacheCVEs()
+
+# Cliente NVD compartido: pool de conexiones y límite de tasa (NVD_API_KEY opcional)
+cliente_nvd = ClienteNVD(NVD_API_URL)
+# Espejo local de la NVD para equipos sin conexión (python3 -m app.nvd_offline)
+espejo_nvd = EspejoNVD()
+# Índice producto -> CPE (diccionario local + productos del espejo)
+indice_cpe = IndiceCPE(espejo_nvd)
+
+def buscar_cves(tecnologia, backend=None):
+    """
+    Busca CVEs de una tecnología.
+
+    backend: "online" (API de NVD, con cache) u "offline" (espejo local).
+             Por defecto BACKEND_CVES.
+    """
+    if (backend or BACKEND_CVES) == "offline":
+        if not espejo_nvd.disponible():
+            print(f"⚠️ Espejo NVD local no encontrado: {espejo_nvd.ruta}")
+            return []
+        return espejo_nvd.buscar_keyword(tecnologia, limite=3)
+    return _consultar_nvd(tecnologia, {"keywordSearch": tecnologia, "resultsPerPage": 3})
+
+def buscar_cves_cpe(cpe, backend=None):
+    """
+    Busca CVEs por nombre CPE con versión (cpe:2.3:a:vendor:producto[:versión]).
+
+    La NVD (virtualMatchString) o el espejo local evalúan los rangos de
+    versiones afectadas; se devuelven los LIMITE_CVES_CPE de mayor CVSS.
+    """
+    if (backend or BACKEND_CVES) == "offline":
+        if not espejo_nvd.disponible():
+            print(f"⚠️ Espejo NVD local no encontrado: {espejo_nvd.ruta}")
+            return []
+        vendor, producto, version = partes_consulta_cpe(cpe)
+        return mas_graves(espejo_nvd.buscar_cpe(vendor, producto, version), LIMITE_CVES_CPE)
+    return _consultar_nvd(cpe, {"virtualMatchString": cpe, "resultsPerPage": RESULTADOS_CPE_NVD},
+                          limite=LIMITE_CVES_CPE, paginar=True)
+
+def buscar_cves_consulta(consulta, backend=None):
+    """Busca CVEs de una consulta de plugin: nombre CPE o palabra clave."""
+    if consulta.startswith("cpe:2.3:"):
+        return buscar_cves_cpe(consulta, backend)
+    return buscar_cves(consulta, backend)
+
+def _consultar_nvd(consulta, parametros, limite=None, paginar=False):
+    """
+    Consulta la API de NVD pasando por cve_cache y la cache persistente.
+
+    Con paginar se reúnen todas las páginas antes de elegir los `limite`
+    más graves (la primera página no tiene por qué contenerlos).
+    """
+    if consulta in cve_cache:
+        return cve_cache[consulta]
+    clave = clave_consulta(consulta, parametros)
+    encontrado, datos = cache_cves_nvd.obtener(clave)
+    if encontrado:
+        cve_cache[consulta] = datos
+        return datos
+    ok, datos = (cliente_nvd.consultar_todo if paginar else cliente_nvd.consultar)(parametros)
+    if ok:
+        if limite:
+            datos = mas_graves(datos, limite)
+        cve_cache[consulta] = datos
+        # Las respuestas vacías se guardan como negativas (vida corta)
+        cache_cves_nvd.guardar(clave, datos, negativo=not datos)
+        return datos
+    # Error o límite agotado: evitar repetir el timeout durante un rato
+    cache_cves_nvd.guardar(clave, [], negativo=True)
     return []
 
 def evaluar_riesgo_secureval(va, cvss):
@@ -220,7 +732,69 @@ def evaluar_riesgo_secureval(va, cvss):
     riesgo = round(va * prob * vul, 2)
     return prob, vul, riesgo
 
-def analizar_dominio(dominio, opciones=None):
+def _consulta_cve_plugin(plugins, tech):
+    """
+    Consulta de CVEs de un plugin de WhatWeb: nombre CPE con versión si el
+    producto está en el índice CPE y se conoce su versión, palabra clave si
+    no, None si es informativo.
+    """
+    datos = plugins.get(tech) if isinstance(plugins, dict) else {}
+    producto, version = producto_y_version(tech, datos)
+    if not producto:
+        return None
+    return indice_cpe.cpe_para(producto, version) or consulta_cve(tech, datos)
+
+def _sondear_host(url, opciones, escanear_puertos=True, cache=None):
+    """Ejecuta las sondas costosas de un host (SO, TLS y puertos).
+
+    Es independiente del resto de hosts, por lo que puede ejecutarse en un
+    hilo del pool de analizar_dominio. Con escanear_puertos=False los
+    puertos se dejan en None porque los aporta el escaneo en lote. Con
+    cache (CacheEndpoints), TLS y puertos se comparten entre las URLs que
+    apuntan al mismo endpoint.
+    """
+    if cache is None:
+        cache = CacheEndpoints()
+
+    # Solo verificar TLS si la opción está habilitada. Va antes que la
+    # detección de SO para que la sonda HTTPS reanude su sesión TLS
+    info_tls = cache.tls(url) if opciones.get('tls', True) else "No verificado"
+
+    sistema_operativo = detectar_sistema_operativo(url)
+
+    # Solo escanear puertos si la opción está habilitada
+    if not escanear_puertos:
+        puertos = None
+    elif opciones.get('puertos', True):
+        print(f"🛡️ Iniciando escaneo de puertos para {url}")
+        puertos = cache.puertos(url)
+    else:
+        print(f"⏭️ Saltando escaneo de puertos para {url} (opción deshabilitada)")
+        puertos = ["Escaneo de puertos deshabilitado"]
+
+    return sistema_operativo, info_tls, puertos
+
+def _sondeo_sin_dns(hostname, opciones, escanear_puertos=True):
+    """Resultado de _sondear_host para un host que no resuelve, sin sondearlo."""
+    info_tls = ({"tls_version": "No disponible", "cifrado": "-", "valido_hasta": "-"}
+                if opciones.get('tls', True) else "No verificado")
+    if not escanear_puertos:
+        puertos = None
+    elif opciones.get('puertos', True):
+        puertos = [f"DNS no resuelve: {hostname}"]
+    else:
+        puertos = ["Escaneo de puertos deshabilitado"]
+    return "Desconocido", info_tls, puertos
+
+def _futuro_resuelto(valor):
+    """Future ya completado (trabajo recuperado de un checkpoint)."""
+    futuro = Future()
+    futuro.set_result(valor)
+    return futuro
+
+def analizar_dominio(dominio, opciones=None, concurrencia=None, puertos_en_lote=None,
+                     backend_cves=None, streaming=None, reanudar=False, incremental=None,
+                     ventana_incremental=None, escaner_puertos=None, progresivo=None):
     """
     Analiza un dominio con las opciones especificadas
     
@@ -229,6 +803,29 @@ def analizar_dominio(dominio, opciones=None):
         opciones: Diccionario con las opciones habilitadas:
                  {'subdominios': bool, 'tecnologias': bool, 'puertos': bool, 
                   'tls': bool, 'cves': bool}
+        concurrencia: Número máximo de hosts sondeados en paralelo
+                 (por defecto CONCURRENCIA_HOSTS; 1 = secuencial).
+                 No altera el contenido de los archivos generados.
+        puertos_en_lote: Escanear todos los hosts con una sola ejecución
+                 de nmap (por defecto ESCANEO_PUERTOS_LOTE).
+        backend_cves: "online" u "offline" (por defecto BACKEND_CVES).
+        streaming: Solapar AssetFinder, WhatWeb y el escaneo: los hosts se
+                 procesan a medida que se descubren (por defecto MODO_STREAMING).
+        reanudar: Continuar un análisis interrumpido a partir de
+                 resultados/<dominio>/checkpoint.jsonl: no se repiten el
+                 descubrimiento, las sondas, los escaneos de puertos ni las
+                 consultas de CVEs que ya terminaron.
+        incremental: Reutilizar SO, TLS, puertos y CVEs del análisis anterior
+                 para los hosts cuya huella de WhatWeb no ha cambiado (por
+                 defecto MODO_INCREMENTAL). Solo se sondean hosts nuevos o
+                 modificados.
+        ventana_incremental: Antigüedad máxima en segundos de los datos
+                 reutilizados (por defecto VENTANA_INCREMENTAL).
+        escaner_puertos: "nmap" o "tcp" (por defecto ESCANER_PUERTOS).
+        progresivo: Segunda pasada de puertos con detección de versiones
+                 sobre los hosts con puertos abiertos (por defecto
+                 ESCANEO_PROGRESIVO). Los hosts de un análisis incremental
+                 solo se reutilizan si se escanearon en el mismo modo.
     """
     if opciones is None:
         opciones = {
@@ -244,13 +841,72 @@ def analizar_dominio(dominio, opciones=None):
     carpeta = os.path.join(RESULTADOS_DIR, dominio)
     os.makedirs(carpeta, exist_ok=True)
 
-    subdominios_txt = ejecutar_assetfinder(dominio) if opciones.get('subdominios', True) else None
-    tecnologias_json = ejecutar_whatweb(subdominios_txt, dominio) if opciones.get('tecnologias', True) else None
+    if streaming is None:
+        streaming = MODO_STREAMING
+    streaming = streaming and opciones.get('subdominios', True) and opciones.get('tecnologias', True)
+
+    checkpoint = Checkpoint(carpeta)
+    if reanudar:
+        if not checkpoint.existe():
+            print("ℹ️ No hay análisis interrumpido que reanudar: se analiza desde el principio")
+            reanudar = False
+        else:
+            checkpoint.cargar()
+            if checkpoint.opciones != opciones:
+                print("⚠️ El análisis interrumpido usaba otras opciones: se analiza desde el principio")
+                checkpoint = Checkpoint(carpeta)
+                reanudar = False
+            else:
+                print(f"♻️ Reanudando análisis: {len(checkpoint.sondeos)} hosts sondeados, "
+                      f"{len(checkpoint.puertos)} escaneos de puertos y "
+                      f"{len(checkpoint.cves)} consultas de CVEs recuperados")
+
+    if escaner_puertos is None:
+        escaner_puertos = ESCANER_PUERTOS
+    if progresivo is None:
+        progresivo = ESCANEO_PROGRESIVO
+
+    # Resultados por endpoint (IP / IP+SNI) y resoluciones DNS compartidos
+    # durante esta ejecución
+    cache = CacheEndpoints(escaner_puertos, progresivo)
+    seguir = None
+    tecnologias_previas = os.path.join(carpeta, "tecnologias.json")
+    if reanudar and "descubrimiento" in checkpoint.etapas and os.path.exists(tecnologias_previas):
+        print("⏭️ Descubrimiento ya completado: se reutiliza tecnologias.json")
+        tecnologias_json = tecnologias_previas
+    elif streaming:
+        print("⚡ Modo streaming: descubrimiento, huellas y escaneo solapados")
+        tecnologias_json, seguir = iniciar_descubrimiento_streaming(dominio, cache)
+    else:
+        subdominios_txt = ejecutar_assetfinder(dominio) if opciones.get('subdominios', True) else None
+        if subdominios_txt:
+            subdominios_txt = filtrar_subdominios(subdominios_txt, dominio, cache)
+        tecnologias_json = ejecutar_whatweb(subdominios_txt, dominio) if opciones.get('tecnologias', True) else None
 
     if not tecnologias_json or not os.path.exists(tecnologias_json):
         print("❌ No se pudo obtener información de tecnologías")
         return []
 
+    checkpoint.iniciar(opciones, reanudar)
+    if opciones.get('cves', True) and (backend_cves or BACKEND_CVES) != "offline":
+        # Consultas ya resueltas antes de la interrupción
+        cve_cache.update(checkpoint.cves)
+
+    if incremental is None:
+        incremental = MODO_INCREMENTAL
+    if ventana_incremental is None:
+        ventana_incremental = VENTANA_INCREMENTAL
+    opciones_previas, hosts_previos = cargar_estado(carpeta)
+    if incremental and hosts_previos and opciones_previas != opciones:
+        print("⚠️ El análisis anterior usaba otras opciones: se sondean todos los hosts")
+        hosts_previos = {}
+    elif not incremental:
+        hosts_previos = {}
+    # url -> estado del host (huella, fecha, sondas y CVEs por tecnología)
+    estado_hosts = {}
+    reutilizados = {}
+    inicio_analisis = time.time()
+
     activos = obtener_activos()
     resultados = []
     errores = []
@@ -258,35 +914,163 @@ def analizar_dominio(dominio, opciones=None):
     puertos_totales_detectados = 0
     hosts_con_puertos = 0
 
+    if concurrencia is None:
+        concurrencia = CONCURRENCIA_HOSTS
+    if puertos_en_lote is None:
+        puertos_en_lote = ESCANEO_PUERTOS_LOTE
+    lote = puertos_en_lote and opciones.get('puertos', True)
+    # En streaming nmap recibe lotes parciales a medida que llegan hosts
+    tam_lote = TAM_LOTE_STREAMING if streaming else None
+    pool = ThreadPoolExecutor(max_workers=concurrencia) if concurrencia > 1 else None
+    # Cola acotada: como mucho 4 sondas por hilo pendientes a la vez
+    cupo_sondas = threading.BoundedSemaphore(concurrencia * 4) if pool else None
+    pool_puertos = ThreadPoolExecutor(max_workers=1) if lote else None
+    pool_cves = (ThreadPoolExecutor(max_workers=max(cliente_nvd.concurrencia, 1))
+                 if opciones.get('cves', True) and (backend_cves or BACKEND_CVES) != "offline" else None)
+
     print(f"📄 Procesando archivo de tecnologías: {tecnologias_json}")
-    
-    with open(tecnologias_json, "r") as f:
-        lineas_procesadas = 0
-        for line in f:
+    if pool:
+        print(f"🧵 Sondeo concurrente de hosts con {concurrencia} hilos")
+
+    lote_pendiente = []
+    futuros_lote = {}
+    consultas_enviadas = set()
+
+    def lanzar_lote():
+        urls = list(lote_pendiente)
+        lote_pendiente.clear()
+        futuro = pool_puertos.submit(escanear_puertos_nmap_lote, urls, cache, escaner_puertos, progresivo)
+        futuro.add_done_callback(registrar_lote)
+        for url_lote in urls:
+            futuros_lote[url_lote] = futuro
+
+    def lanzar_sondeo(url):
+        cupo_sondas.acquire()
+        futuro = pool.submit(_sondear_host, url, opciones, not lote, cache)
+        futuro.add_done_callback(lambda _: cupo_sondas.release())
+        futuro.add_done_callback(lambda f: registrar_sondeo(url, f))
+        return futuro
+
+    # Registro en el checkpoint de cada trabajo terminado con éxito
+    def registrar_sondeo(url, futuro):
+        if not futuro.cancelled() and futuro.exception() is None:
+            checkpoint.registrar_sondeo(url, futuro.result())
+
+    def registrar_lote(futuro):
+        if not futuro.cancelled() and futuro.exception() is None:
+            for url_lote, puertos_url in futuro.result().items():
+                checkpoint.registrar("puertos", url=url_lote, puertos=puertos_url)
+
+    def registrar_cves(consulta, futuro):
+        # Las respuestas vacías pueden ser un error de red: se repiten al reanudar
+        if not futuro.cancelled() and futuro.exception() is None and futuro.result():
+            checkpoint.registrar("cves", consulta=consulta, datos=futuro.result())
+
+    # Primera pasada: leer WhatWeb registro a registro y lanzar en cuanto
+    # llega cada host sus sondas, su escaneo de puertos y sus CVEs
+    entradas = []
+    registros_procesados = 0
+    try:
+        for numero_linea, data, error in leer_registros(tecnologias_json, seguir=seguir):
+            if error:
+                entradas.append((numero_linea, None, None, ValueError(error)))
+                continue
+            registros_procesados += 1
+            if not isinstance(data, dict):
+                entradas.append((numero_linea, None, None, ValueError(f"registro no es un objeto: {str(data)[:50]}")))
+                continue
+            url = data.get("target")
+            plugins = data.get("plugins", {})
+
+            if not url:
+                continue
+
+            huella = huella_whatweb(data)
+            previo = hosts_previos.get(url)
+            if host_reutilizable(previo, huella, ventana_incremental, inicio_analisis, progresivo):
+                reutilizados[url] = previo
+                estado_hosts[url] = {"huella": huella, "fecha": previo["fecha"], "progresivo": progresivo}
+            else:
+                estado_hosts[url] = {"huella": huella, "fecha": inicio_analisis, "progresivo": progresivo}
+
+            hostname = extraer_hostname(url)
+            if url in reutilizados:
+                sondeo = _futuro_resuelto((previo["sistema_operativo"], previo["tls"], previo["puertos"]))
+            elif url in checkpoint.sondeos:
+                sondeo = _futuro_resuelto(checkpoint.sondeos[url])
+            elif not cache.resoluble(hostname):
+                # Resolución ya hecha (y cacheada) en el descubrimiento: sin DNS
+                # no se lanzan las sondas de SO, TLS ni puertos
+                print(f"⏭️ {hostname} no resuelve: se omiten sus sondas")
+                sondeo = _futuro_resuelto(_sondeo_sin_dns(hostname, opciones, not lote))
+                if lote:
+                    futuros_lote[url] = _futuro_resuelto({url: [f"DNS no resuelve: {hostname}"]})
+            else:
+                sondeo = lanzar_sondeo(url) if pool else None
+            entradas.append((registros_procesados, url, plugins, sondeo))
+
+            if lote and url in reutilizados:
+                futuros_lote[url] = _futuro_resuelto({url: previo["puertos"]})
+            elif lote and url in checkpoint.puertos:
+                futuros_lote[url] = _futuro_resuelto({url: checkpoint.puertos[url]})
+            elif lote and url not in futuros_lote:
+                lote_pendiente.append(url)
+                if tam_lote and len(lote_pendiente) >= tam_lote:
+                    lanzar_lote()
+
+            if pool_cves and url not in reutilizados and isinstance(plugins, (dict, list)):
+                for tech in plugins:
+                    consulta = _consulta_cve_plugin(plugins, tech)
+                    if consulta and consulta not in consultas_enviadas and consulta not in cve_cache:
+                        consultas_enviadas.add(consulta)
+                        futuro = pool_cves.submit(buscar_cves_consulta, consulta, backend_cves)
+                        futuro.add_done_callback(lambda f, c=consulta: registrar_cves(c, f))
+
+        if lote and lote_pendiente:
+            lanzar_lote()
+        # tecnologias.json está completo: al reanudar no hace falta repetir
+        # AssetFinder ni WhatWeb
+        checkpoint.registrar("etapa", nombre="descubrimiento")
+        # Esperar escaneos de puertos y CVEs antes de consolidar
+        if pool_puertos:
+            pool_puertos.shutdown(wait=True)
+        if pool_cves:
+            pool_cves.shutdown(wait=True)
+    except BaseException:
+        for ejecutor in (pool, pool_puertos, pool_cves):
+            if ejecutor:
+                ejecutor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    # Segunda pasada: consolidar en el orden del archivo para que la salida
+    # sea idéntica con cualquier nivel de concurrencia
+    try:
+        for numero, url, plugins, sondeo in entradas:
+            if isinstance(sondeo, Exception):
+                error_msg = f"Error JSON en línea {numero}: {str(sondeo)[:100]}"
+                print(f"❌ {error_msg}")
+                errores.append(error_msg)
+                continue
+
             try:
-                lineas_procesadas += 1
-                data = json.loads(line)
-                url = data.get("target")
-                plugins = data.get("plugins", {})
-                
-                if not url:
-                    continue
-                    
-                print(f"🔍 Procesando {lineas_procesadas}: {url}")
-                
-                sistema_operativo = detectar_sistema_operativo(url)
-                
-                # Solo verificar TLS si la opción está habilitada
-                info_tls = verificar_tls(url) if opciones.get('tls', True) else "No verificado"
-                
-                # Solo escanear puertos si la opción está habilitada
+                print(f"🔍 Procesando {numero}: {url}")
+
+                if sondeo is None:
+                    sistema_operativo, info_tls, puertos = _sondear_host(url, opciones, not lote, cache)
+                    checkpoint.registrar_sondeo(url, (sistema_operativo, info_tls, puertos))
+                else:
+                    sistema_operativo, info_tls, puertos = sondeo.result()
+                if lote:
+                    puertos = futuros_lote[url].result()[url]
+                tecnologias_previas = reutilizados[url].get("tecnologias", {}) if url in reutilizados else {}
+                if url in reutilizados:
+                    print(f"♻️ {url} sin cambios: se reutilizan SO, TLS, puertos y CVEs del análisis anterior")
+                estado_hosts[url].update({"sistema_operativo": sistema_operativo, "tls": info_tls,
+                                          "puertos": puertos, "tecnologias": {}})
+
                 if opciones.get('puertos', True):
-                    print(f"🛡️ Iniciando escaneo de puertos para {url}")
-                    puertos = escanear_puertos_nmap(url)
-                    
                     # Contar puertos abiertos reales para estadísticas
-                    puertos_abiertos = [p for p in puertos if not any(x in p.lower() for x in 
-                                       ["dns no resuelve", "timeout", "error", "no hay puertos", "nmap no disponible"])]
+                    puertos_abiertos = _puertos_abiertos(puertos)
                     
                     if puertos_abiertos:
                         print(f"✅ {len(puertos_abiertos)} puertos abiertos detectados en {url}")
@@ -294,17 +1078,30 @@ def analizar_dominio(dominio, opciones=None):
                         hosts_con_puertos += 1
                     else:
                         print(f"🔒 Sin puertos abiertos detectados en {url}")
-                else:
-                    print(f"⏭️ Saltando escaneo de puertos para {url} (opción deshabilitada)")
-                    puertos = ["Escaneo de puertos deshabilitado"]
 
-                for tech in plugins:
+                # Plugins de WhatWeb y, con escaneo de versiones, los productos
+                # de los servicios detectados en los puertos abiertos
+                tecnologias_host = [(tech, _consulta_cve_plugin(plugins, tech)) for tech in plugins]
+                if opciones.get('puertos', True):
+                    tecnologias_host += [(producto, consulta) for producto, consulta in servicios_con_version(puertos)
+                                         if producto not in plugins]
+                tecnologias_host = _sin_cpe_repetidos(tecnologias_host)
+
+                for tech, consulta in tecnologias_host:
                     tipo_servicio = clasificar_servicio(tech, url)
                     
-                    # Solo buscar CVEs si la opción está habilitada
-                    if opciones.get('cves', True):
-                        print(f"⚠️ Buscando CVEs para tecnología {tech} (opción habilitada)")
-                        cves = buscar_cves(tech)
+                    # Solo buscar CVEs si la opción está habilitada y el plugin es un producto
+                    if tech in tecnologias_previas:
+                        ids_cves = tecnologias_previas[tech]["cves"]
+                        max_cvss = tecnologias_previas[tech]["cvss_max"]
+                    elif opciones.get('cves', True) and consulta is None:
+                        print(f"⏭️ {tech} es un plugin informativo, sin búsqueda de CVEs")
+                        ids_cves = []
+                        max_cvss = 0.0
+                    elif opciones.get('cves', True):
+                        print(f"⚠️ Buscando CVEs para tecnología {tech} ({consulta})")
+                        cves = buscar_cves_consulta(consulta, backend_cves)
+                        ids_cves = [cve["cve"]["id"] for cve in cves]
                         cvss_scores = [
                             cve["cve"]["metrics"]["cvssMetricV31"][0]["cvssData"]["baseScore"]
                             for cve in cves if "cvssMetricV31" in cve["cve"]["metrics"]
@@ -312,8 +1109,9 @@ def analizar_dominio(dominio, opciones=None):
                         max_cvss = max(cvss_scores) if cvss_scores else 0.0
                     else:
                         print(f"⏭️ Saltando búsqueda de CVEs para {tech} (opción deshabilitada)")
-                        cves = []
+                        ids_cves = []
                         max_cvss = 0.0
+                    estado_hosts[url]["tecnologias"][tech] = {"cves": ids_cves, "cvss_max": max_cvss}
 
                     va = 2.0
                     for a in activos:
@@ -343,43 +1141,58 @@ def analizar_dominio(dominio, opciones=None):
                         "vulnerabilidad": vul,
                         "riesgo": riesgo,
                         "criticidad": criticidad,
-                        "cves": [cve["cve"]["id"] for cve in cves]
+                        "cves": ids_cves
                     })
 
                     if url not in resumen:
-                        resumen[url] = {"tecnologias": set(), "cves": set(), "riesgos": []}
-                    resumen[url]["tecnologias"].add(tech)
-                    resumen[url]["cves"].update([cve["cve"]["id"] for cve in cves])
+                        # dict en lugar de set: conserva el orden de detección
+                        resumen[url] = {"tecnologias": {}, "cves": set(), "riesgos": []}
+                    resumen[url]["tecnologias"][tech] = None
+                    resumen[url]["cves"].update(ids_cves)
                     resumen[url]["riesgos"].append(riesgo)
 
-            except json.JSONDecodeError as e:
-                error_msg = f"Error JSON en línea {lineas_procesadas}: {str(e)[:100]}"
-                print(f"❌ {error_msg}")
-                errores.append(error_msg)
-                continue
             except Exception as e:
-                error_msg = f"Error procesando línea {lineas_procesadas} ({url}): {str(e)[:100]}"
+                error_msg = f"Error procesando registro {numero} ({url}): {str(e)[:100]}"
                 print(f"❌ {error_msg}")
                 errores.append(error_msg)
+                estado_hosts.pop(url, None)
                 continue
+    finally:
+        if pool:
+            pool.shutdown(wait=True)
+        # Conexiones, sesiones TLS y cabeceras solo valen para este análisis
+        sonda_http.cerrar()
 
     # Guardar resultados con metadatos adicionales
     metadata = {
         "dominio": dominio,
+        "fecha_inicio": datetime.fromtimestamp(inicio_analisis).isoformat(timespec="seconds"),
+        "fecha_fin": datetime.now().isoformat(timespec="seconds"),
         "total_resultados": len(resultados),
         "total_errores": len(errores),
         "opciones_utilizadas": opciones,
         "estadisticas_puertos": {
             "total_puertos_detectados": puertos_totales_detectados,
             "hosts_con_puertos": hosts_con_puertos,
-            "total_hosts_escaneados": lineas_procesadas
+            "total_hosts_escaneados": registros_procesados
         } if opciones.get('puertos', True) else "Escaneo de puertos deshabilitado"
     }
     
-    # Guardar archivo principal de resultados
+    # Guardar en el almacén de resultados y exportar desde él el archivo
+    # principal (riesgo.json) y su versión normalizada;
+    # los dominios analizados antes del almacén se importan una sola vez
     ruta_riesgo = os.path.join(carpeta, "riesgo.json")
-    with open(ruta_riesgo, "w") as f:
-        json.dump(resultados, f, indent=4, ensure_ascii=False)
+    almacen = AlmacenResultados(os.path.join(RESULTADOS_DIR, NOMBRE_BD))
+    try:
+        almacen.guardar_escaneo(dominio, resultados, metadata)
+        almacen.exportar_riesgo_json(dominio, ruta_riesgo)
+        almacen.importar_carpetas(RESULTADOS_DIR)
+    except sqlite3.Error as e:
+        print(f"⚠️ No se pudo guardar en el almacén de resultados: {e}")
+        guardar_resultados(ruta_riesgo, resultados)
+        guardar_normalizado(os.path.join(carpeta, RIESGO_NORMALIZADO), resultados)
+    finally:
+        almacen.cerrar()
     
     # Guardar metadatos del análisis
     ruta_metadata = os.path.join(carpeta, "metadata.json")
@@ -412,16 +1225,28 @@ def analizar_dominio(dominio, opciones=None):
     if opciones.get('puertos', True):
         print(f"🛡️ Estadísticas de puertos:")
         print(f"   • Total puertos abiertos: {puertos_totales_detectados}")
-        print(f"   • Hosts con puertos: {hosts_con_puertos}/{lineas_procesadas}")
+        print(f"   • Hosts con puertos: {hosts_con_puertos}/{registros_procesados}")
         if hosts_con_puertos > 0:
             promedio = puertos_totales_detectados / hosts_con_puertos
             print(f"   • Promedio puertos por host: {promedio:.1f}")
     
+    # Base del próximo análisis incremental: solo hosts consolidados sin error
+    guardar_estado(carpeta, opciones, estado_hosts)
+    if reutilizados:
+        print(f"♻️ Hosts sin cambios reutilizados: {len(reutilizados)}/{len(estado_hosts)}")
+
+    # Resultados completos en disco: el checkpoint ya no es necesario
+    checkpoint.eliminar()
+
     print(f"📁 Resultados guardados en: {ruta_riesgo}")
     return resultados
 
 def lanzar_analyzer_gui():
     """Interfaz moderna para análisis de dominios con configuración avanzada."""
+    # tkinter solo se importa con la interfaz: el análisis funciona sin pantalla
+    import tkinter as tk
+    from tkinter import ttk, messagebox, simpledialog
+
     ventana = tk.Toplevel()
     ventana.title("🔍 Análisis de Dominio - SECUREVAL")
     ventana.geometry("700x600")
@@ -620,6 +1445,73 @@ def lanzar_analyzer_gui():
                                   activeforeground='#2c3e50')
             check.grid(row=i//2, column=i%2, sticky='w', padx=(0, 20), pady=2)
         
+        # Nivel de concurrencia del sondeo de hosts
+        concurrencia_frame = tk.Frame(config_frame, bg='white')
+        concurrencia_frame.pack(fill='x', pady=(8, 0))
+        
+        tk.Label(concurrencia_frame, text="🧵 Hosts en paralelo:", 
+                font=("Helvetica", 10), 
+                bg='white', fg='#34495e').pack(side='left')
+        
+        var_concurrencia = tk.IntVar(value=CONCURRENCIA_HOSTS)
+        tk.Spinbox(concurrencia_frame, from_=1, to=32, width=4,
+                  textvariable=var_concurrencia,
+                  font=("Helvetica", 10)).pack(side='left', padx=(8, 0))
+        
+        var_cves_offline = tk.BooleanVar(value=BACKEND_CVES == "offline")
+        tk.Checkbutton(config_frame, text="📦 Usar espejo NVD local (sin conexión)",
+                      variable=var_cves_offline,
+                      font=("Helvetica", 10),
+                      bg='white', fg='#34495e',
+                      selectcolor='#e74c3c',
+                      activebackground='white',
+                      activeforeground='#2c3e50').pack(anchor='w', pady=(4, 0))
+        
+        var_streaming = tk.BooleanVar(value=MODO_STREAMING)
+        tk.Checkbutton(config_frame, text="⚡ Solapar descubrimiento y escaneo (streaming)",
+                      variable=var_streaming,
+                      font=("Helvetica", 10),
+                      bg='white', fg='#34495e',
+                      selectcolor='#e74c3c',
+                      activebackground='white',
+                      activeforeground='#2c3e50').pack(anchor='w', pady=(2, 0))
+        
+        var_reanudar = tk.BooleanVar(value=False)
+        tk.Checkbutton(config_frame, text="♻️ Reanudar análisis interrumpido",
+                      variable=var_reanudar,
+                      font=("Helvetica", 10),
+                      bg='white', fg='#34495e',
+                      selectcolor='#e74c3c',
+                      activebackground='white',
+                      activeforeground='#2c3e50').pack(anchor='w', pady=(2, 0))
+        
+        var_progresivo = tk.BooleanVar(value=ESCANEO_PROGRESIVO)
+        tk.Checkbutton(config_frame, text="🔬 Escaneo de puertos progresivo (versiones de servicios)",
+                      variable=var_progresivo,
+                      font=("Helvetica", 10),
+                      bg='white', fg='#34495e',
+                      selectcolor='#e74c3c',
+                      activebackground='white',
+                      activeforeground='#2c3e50').pack(anchor='w', pady=(2, 0))
+        
+        var_escaner_tcp = tk.BooleanVar(value=ESCANER_PUERTOS == "tcp")
+        tk.Checkbutton(config_frame, text="🔌 Escáner TCP integrado en lugar de nmap",
+                      variable=var_escaner_tcp,
+                      font=("Helvetica", 10),
+                      bg='white', fg='#34495e',
+                      selectcolor='#e74c3c',
+                      activebackground='white',
+                      activeforeground='#2c3e50').pack(anchor='w', pady=(2, 0))
+        
+        var_incremental = tk.BooleanVar(value=MODO_INCREMENTAL)
+        tk.Checkbutton(config_frame, text="🔁 Reescaneo incremental (reutilizar hosts sin cambios)",
+                      variable=var_incremental,
+                      font=("Helvetica", 10),
+                      bg='white', fg='#34495e',
+                      selectcolor='#e74c3c',
+                      activebackground='white',
+                      activeforeground='#2c3e50').pack(anchor='w', pady=(2, 0))
+        
         # Área de progreso y resultados
         progress_frame = tk.Frame(form_frame, bg='#2c3e50', relief='solid', borderwidth=1)
         progress_frame.pack(fill='both', expand=True, pady=(20, 0))
@@ -697,7 +1589,18 @@ def lanzar_analyzer_gui():
                     }
                     
                     # Ejecutar análisis real con las opciones seleccionadas
-                    resultados = analizar_dominio(dominio, opciones)
+                    try:
+                        concurrencia = max(1, var_concurrencia.get())
+                    except tk.TclError:
+                        concurrencia = CONCURRENCIA_HOSTS
+                    backend_cves = "offline" if var_cves_offline.get() else "online"
+                    resultados = analizar_dominio(dominio, opciones, concurrencia=concurrencia,
+                                                  backend_cves=backend_cves,
+                                                  streaming=var_streaming.get(),
+                                                  reanudar=var_reanudar.get(),
+                                                  incremental=var_incremental.get(),
+                                                  escaner_puertos="tcp" if var_escaner_tcp.get() else "nmap",
+                                                  progresivo=var_progresivo.get())
                     progress_var.set(100)
                     
                     log_mensaje(f"✅ Análisis completado exitosamente")
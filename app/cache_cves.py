@@ -0,0 +1,135 @@
+# app/cache_cves.py - Cache persistente de consultas CVE a la NVD
+# =====================================
+# Guarda en SQLite (resultados/cache_cves.sqlite) las respuestas de la API
+# de NVD para que sobrevivan entre ejecuciones:
+# - Clave = tecnología + parámetros de la consulta
+# - TTL configurable para resultados positivos
+# - Entradas negativas de vida corta para errores y respuestas vacías
+# - Expulsión por tamaño (las entradas menos usadas recientemente)
+# - Modo WAL + busy_timeout para varios procesos de escaneo a la vez
+# =====================================
+import os
+import json
+import time
+import sqlite3
+import threading
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
+CACHE_CVES_DB = os.path.join(RESULTADOS_DIR, "cache_cves.sqlite")
+
+# Vigencia de una respuesta con CVEs (7 días)
+TTL_CVES = 7 * 24 * 3600
+# Vigencia de errores y respuestas vacías (15 minutos)
+TTL_NEGATIVO = 15 * 60
+# Número máximo de entradas antes de expulsar las menos usadas
+MAX_ENTRADAS = 5000
+
+def clave_consulta(tecnologia, parametros=None):
+    """Construye la clave de cache a partir de la tecnología y los parámetros."""
+    return json.dumps({"tecnologia": tecnologia, "parametros": parametros or {}},
+                      sort_keys=True, ensure_ascii=False)
+
+class CacheCVEs:
+    """Cache de respuestas NVD en SQLite, compartible entre hilos y procesos."""
+
+    def __init__(self, ruta=CACHE_CVES_DB, ttl=TTL_CVES, ttl_negativo=TTL_NEGATIVO,
+                 max_entradas=MAX_ENTRADAS):
+        self.ruta = ruta
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        self._inicializada = False
+        self._lock = threading.Lock()
+
+    def _conexion(self):
+        """Devuelve la conexión del hilo actual, creando la base si hace falta."""
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            conexion = sqlite3.connect(self.ruta, timeout=30)
+            conexion.execute("PRAGMA busy_timeout = 30000")
+            with self._lock:
+                if not self._inicializada:
+                    conexion.execute("PRAGMA journal_mode = WAL")
+                    conexion.execute("""
+                        CREATE TABLE IF NOT EXISTS consultas (
+                            clave TEXT PRIMARY KEY,
+                            datos TEXT NOT NULL,
+                            negativo INTEGER NOT NULL,
+                            creado REAL NOT NULL,
+                            expira REAL NOT NULL,
+                            accedido REAL NOT NULL
+                        )""")
+                    conexion.execute("CREATE INDEX IF NOT EXISTS idx_consultas_accedido ON consultas(accedido)")
+                    conexion.commit()
+                    self._inicializada = True
+            self._local.conexion = conexion
+        return conexion
+
+    def obtener(self, clave):
+        """
+        Busca una consulta vigente.
+
+        Returns:
+            tuple: (encontrado, datos). Las entradas negativas devuelven
+                   (True, []) mientras no expiren.
+        """
+        try:
+            conexion = self._conexion()
+            ahora = time.time()
+            fila = conexion.execute(
+                "SELECT datos, expira FROM consultas WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                return False, None
+            datos, expira = fila
+            if expira <= ahora:
+                with conexion:
+                    conexion.execute("DELETE FROM consultas WHERE clave = ? AND expira <= ?", (clave, ahora))
+                return False, None
+            with conexion:
+                conexion.execute("UPDATE consultas SET accedido = ? WHERE clave = ?", (ahora, clave))
+            return True, json.loads(datos)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ Cache de CVEs no disponible: {e}")
+            return False, None
+
+    def guardar(self, clave, datos, negativo=False):
+        """Guarda una respuesta; las negativas usan ttl_negativo."""
+        try:
+            conexion = self._conexion()
+            ahora = time.time()
+            ttl = self.ttl_negativo if negativo else self.ttl
+            with conexion:
+                conexion.execute(
+                    "INSERT OR REPLACE INTO consultas (clave, datos, negativo, creado, expira, accedido) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (clave, json.dumps(datos, ensure_ascii=False), int(negativo), ahora, ahora + ttl, ahora))
+                self._expulsar(conexion, ahora)
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo guardar en la cache de CVEs: {e}")
+
+    def _expulsar(self, conexion, ahora):
+        """Elimina entradas vencidas y, si se supera el tamaño, las menos usadas."""
+        conexion.execute("DELETE FROM consultas WHERE expira <= ?", (ahora,))
+        total = conexion.execute("SELECT COUNT(*) FROM consultas").fetchone()[0]
+        exceso = total - self.max_entradas
+        if exceso > 0:
+            conexion.execute(
+                "DELETE FROM consultas WHERE clave IN "
+                "(SELECT clave FROM consultas ORDER BY accedido ASC LIMIT ?)", (exceso,))
+
+    def limpiar(self):
+        """Vacía la cache por completo."""
+        try:
+            with self._conexion() as conexion:
+                conexion.execute("DELETE FROM consultas")
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo limpiar la cache de CVEs: {e}")
+
+    def total(self):
+        """Número de entradas almacenadas (vigentes o no)."""
+        try:
+            return self._conexion().execute("SELECT COUNT(*) FROM consultas").fetchone()[0]
+        except sqlite3.Error:
+            return 0
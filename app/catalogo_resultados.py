@@ -0,0 +1,91 @@
+# app/catalogo_resultados.py - Catálogo de resultados
+# =====================================
+# Resume cada dominio analizado en una entrada pequeña (recuentos, riesgo y
+# CVSS máximos, fechas del análisis, artefactos presentes y metadatos),
+# para que las pantallas de selección listen dominios sin abrir sus
+# riesgo.json:
+# - Se leen las filas de escaneos del almacén de resultados, en solo
+#   lectura (AlmacenResultados.dominios), con los recuentos y máximos que
+#   se guardan al terminar cada análisis
+# - De cada carpeta solo se comprueba la huella de riesgo.json; los
+#   dominios que el almacén aún no ha importado (anteriores a él) o con
+#   riesgo.json sustituido se resumen desde sus JSON (abrir_dominio)
+# - Listar no escribe nada en disco
+# =====================================
+import os
+import sqlite3
+from datetime import datetime
+from .almacen_resultados import NOMBRE_BD, AlmacenResultados, abrir_dominio, huella_riesgo
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
+# Archivos de cada dominio que se informan como artefactos
+ARTEFACTOS = ("riesgo.json", "riesgo_normalizado.json", "resumen.json", "metadata.json", "tecnologias.json", "riesgo.pdf", "errores.log")
+
+def _artefactos(carpeta):
+    return [nombre for nombre in ARTEFACTOS if os.path.exists(os.path.join(carpeta, nombre))]
+
+def entrada_catalogo(fila, carpeta):
+    """Entrada del catálogo a partir de una fila de AlmacenResultados.dominios."""
+    metadata = fila["metadata"] if isinstance(fila["metadata"], dict) else {}
+    return {
+        "dominio": fila["dominio"],
+        "fecha_inicio": metadata.get("fecha_inicio"),
+        "fecha_fin": metadata.get("fecha_fin") or datetime.fromtimestamp(fila["fecha"]).isoformat(timespec="seconds"),
+        "total_hallazgos": fila["total_hallazgos"],
+        "total_subdominios": fila["total_subdominios"],
+        "riesgo_max": fila["riesgo_max"],
+        "cvss_max": fila["cvss_max"],
+        "artefactos": _artefactos(carpeta),
+        "metadata": metadata,
+    }
+
+def _almacenados(resultados_dir):
+    """Filas de AlmacenResultados.dominios por dominio ({} si no hay almacén)."""
+    almacen = AlmacenResultados(os.path.join(resultados_dir, NOMBRE_BD), solo_lectura=True)
+    try:
+        return {fila["dominio"]: fila for fila in almacen.dominios()}
+    except sqlite3.Error:
+        return {}
+    finally:
+        almacen.cerrar()
+
+def _fila_desde_archivos(dominio, resultados_dir):
+    try:
+        with abrir_dominio(dominio, resultados_dir) as almacen:
+            filas = almacen.dominios() if almacen else []
+    except sqlite3.Error:
+        return None
+    return filas[0] if filas else None
+
+def listar_catalogo(resultados_dir=None, artefacto="riesgo.json"):
+    """
+    Entradas del catálogo de los dominios que tienen el artefacto indicado,
+    ordenadas por dominio.
+
+    Returns:
+        list: entradas del catálogo, o None si no se pudo leer el directorio
+    """
+    resultados_dir = resultados_dir or RESULTADOS_DIR
+    try:
+        nombres = sorted(n for n in os.listdir(resultados_dir)
+                         if n != "__pycache__" and os.path.isdir(os.path.join(resultados_dir, n)))
+    except OSError as e:
+        print(f"⚠️ No se pudo leer el directorio de resultados: {e}")
+        return None
+
+    almacenados = _almacenados(resultados_dir)
+    entradas = []
+    for nombre in nombres:
+        carpeta = os.path.join(resultados_dir, nombre)
+        huella = huella_riesgo(carpeta)
+        if huella is None:
+            continue
+        fila = almacenados.get(nombre)
+        if fila is None or fila["huella"] != huella:
+            fila = _fila_desde_archivos(nombre, resultados_dir)
+            if fila is None:
+                continue
+        entrada = entrada_catalogo(fila, carpeta)
+        if artefacto is None or artefacto in entrada["artefactos"]:
+            entradas.append(entrada)
+    return entradas
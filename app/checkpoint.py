@@ -0,0 +1,88 @@
+# app/checkpoint.py - Puntos de control de analizar_dominio
+# =====================================
+# Registra en resultados/<dominio>/checkpoint.jsonl cada trabajo costoso
+# terminado (sondas de un host, lote de puertos, consulta de CVEs) para
+# poder reanudar un análisis interrumpido sin repetirlos.
+#
+# Cada línea es un objeto JSON independiente con un campo "tipo":
+#   inicio  -> opciones del análisis
+#   etapa   -> etapa completada ("descubrimiento")
+#   sondeo  -> url, sistema_operativo, tls, puertos
+#   puertos -> url, puertos (escaneo en lote)
+#   cves    -> consulta, datos
+# Una última línea truncada (cierre abrupto) se ignora al cargar.
+# =====================================
+import os
+import json
+import threading
+
+NOMBRE_CHECKPOINT = "checkpoint.jsonl"
+
+class Checkpoint:
+    """Registro de trabajo completado de un análisis, seguro entre hilos."""
+
+    def __init__(self, carpeta):
+        self.ruta = os.path.join(carpeta, NOMBRE_CHECKPOINT)
+        self._lock = threading.Lock()
+        self._activo = False
+        self.opciones = None
+        self.etapas = set()
+        self.sondeos = {}
+        self.puertos = {}
+        self.cves = {}
+
+    def existe(self):
+        return os.path.exists(self.ruta)
+
+    def cargar(self):
+        """Carga el trabajo registrado; devuelve el número de hosts sondeados."""
+        if not self.existe():
+            return 0
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue
+                tipo = registro.get("tipo")
+                if tipo == "inicio":
+                    self.opciones = registro.get("opciones")
+                elif tipo == "etapa":
+                    self.etapas.add(registro.get("nombre"))
+                elif tipo == "sondeo":
+                    self.sondeos[registro["url"]] = (
+                        registro["sistema_operativo"], registro["tls"], registro["puertos"])
+                elif tipo == "puertos":
+                    self.puertos[registro["url"]] = registro["puertos"]
+                elif tipo == "cves":
+                    self.cves[registro["consulta"]] = registro["datos"]
+        return len(self.sondeos)
+
+    def iniciar(self, opciones, reanudar=False):
+        """Prepara el checkpoint; sin reanudar descarta el anterior."""
+        self._activo = True
+        if not reanudar:
+            with self._lock:
+                open(self.ruta, "w").close()
+            self.registrar("inicio", opciones=opciones)
+
+    def registrar(self, tipo, **datos):
+        """Añade un registro; cada escritura abre y cierra el archivo para
+        que lo escrito sobreviva a una interrupción en cualquier momento."""
+        if not self._activo:
+            return
+        linea = json.dumps(dict(tipo=tipo, **datos), ensure_ascii=False)
+        with self._lock:
+            with open(self.ruta, "a", encoding="utf-8") as f:
+                f.write(linea + "\n")
+
+    def registrar_sondeo(self, url, resultado):
+        sistema_operativo, info_tls, puertos = resultado
+        self.registrar("sondeo", url=url, sistema_operativo=sistema_operativo, tls=info_tls, puertos=puertos)
+
+    def eliminar(self):
+        """Borra el checkpoint (el análisis terminó y sus resultados están guardados)."""
+        self._activo = False
+        with self._lock:
+            if self.existe():
+                os.remove(self.ruta)
@@ -0,0 +1,184 @@
+# app/cli.py - Modo de línea de comandos de SECUREVAL (sin interfaz gráfica)
+# =====================================
+# Analiza uno o varios dominios en servidores sin pantalla:
+# - Dominios como argumentos y/o en un archivo (uno por línea, '#' comenta)
+# - Varios dominios en paralelo con un pool de procesos; los procesos
+#   comparten la ventana de límite de tasa de la NVD, de modo que -j N no
+#   multiplica las peticiones permitidas
+# - Genera los mismos archivos en resultados/<dominio>/ que la GUI; la
+#   salida del análisis de cada dominio va a resultados/<dominio>/analisis.log
+# - Al terminar escribe en stdout un resumen JSON con el estado de cada
+#   dominio; el código de salida es 0 si todos terminaron bien y 1 si no
+#
+# No importa tkinter, matplotlib ni reportlab.
+#
+# Uso:
+#   python3 secureval.py ejemplo.com otro.org
+#   python3 secureval.py -f dominios.txt -j 3 --offline --resumen estado.json
+#   python3 secureval.py ejemplo.com --escaner tcp --progresivo
+# =====================================
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import analyzer
+
+def leer_dominios(dominios, archivo=None):
+    """Une los dominios de los argumentos y del archivo, sin repetidos y en orden."""
+    todos = list(dominios or [])
+    if archivo:
+        with open(archivo, "r", encoding="utf-8") as f:
+            todos.extend(linea.split("#", 1)[0] for linea in f)
+    return list(dict.fromkeys(d.strip().lower() for d in todos if d.strip()))
+
+def compartir_limite_nvd(marcas, lock):
+    """Inicializador de los procesos del pool: ventana NVD común a todos."""
+    analyzer.cliente_nvd.compartir_limite(marcas, lock)
+
+def analizar_en_proceso(dominio, opciones, parametros):
+    """
+    Analiza un dominio (en un proceso del pool) y devuelve su estado.
+
+    La salida de analizar_dominio se guarda en resultados/<dominio>/analisis.log
+    para no mezclarla con la de otros dominios ni con el resumen JSON.
+    """
+    carpeta = os.path.join(analyzer.RESULTADOS_DIR, dominio)
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_log = os.path.join(carpeta, "analisis.log")
+    ruta_riesgo = os.path.join(carpeta, "riesgo.json")
+    estado = {"dominio": dominio, "estado": "ok", "resultados": 0, "errores": 0,
+              "duracion_s": 0.0, "carpeta": carpeta, "log": ruta_log, "mensaje": None}
+    inicio = time.time()
+    try:
+        with open(ruta_log, "w", encoding="utf-8") as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            resultados = analyzer.analizar_dominio(dominio, opciones, **parametros)
+        estado["resultados"] = len(resultados)
+        if not os.path.exists(ruta_riesgo) or os.path.getmtime(ruta_riesgo) < inicio:
+            estado["estado"] = "sin_datos"
+            estado["mensaje"] = "No se pudo obtener información de tecnologías"
+        else:
+            with open(os.path.join(carpeta, "metadata.json"), "r", encoding="utf-8") as f:
+                estado["errores"] = json.load(f).get("total_errores", 0)
+    except Exception as e:
+        estado["estado"] = "error"
+        estado["mensaje"] = f"{type(e).__name__}: {str(e)[:200]}"
+    estado["duracion_s"] = round(time.time() - inicio, 1)
+    return estado
+
+def analizar_lote(dominios, opciones, parametros, paralelo=1):
+    """
+    Analiza varios dominios, hasta paralelo a la vez en procesos separados.
+
+    Returns:
+        list: estado de cada dominio, en el orden de entrada
+    """
+    estados = {}
+
+    def informar(estado):
+        icono = {"ok": "✅", "sin_datos": "⚠️"}.get(estado["estado"], "❌")
+        detalle = estado["mensaje"] or f"{estado['resultados']} resultados"
+        print(f"{icono} {estado['dominio']}: {detalle} ({estado['duracion_s']} s)", file=sys.stderr)
+
+    if paralelo <= 1 or len(dominios) <= 1:
+        for dominio in dominios:
+            print(f"🔍 Analizando {dominio}...", file=sys.stderr)
+            estados[dominio] = analizar_en_proceso(dominio, opciones, parametros)
+            informar(estados[dominio])
+    else:
+        print(f"🧵 Analizando {len(dominios)} dominios con {paralelo} procesos", file=sys.stderr)
+        with multiprocessing.Manager() as gestor, \
+                ProcessPoolExecutor(max_workers=paralelo, initializer=compartir_limite_nvd,
+                                    initargs=(gestor.list(), gestor.Lock())) as pool:
+            futuros = {pool.submit(analizar_en_proceso, dominio, opciones, parametros): dominio
+                       for dominio in dominios}
+            for futuro in as_completed(futuros):
+                dominio = futuros[futuro]
+                try:
+                    estados[dominio] = futuro.result()
+                except Exception as e:
+                    # El proceso murió (memoria, señal): el resto continúa
+                    estados[dominio] = {"dominio": dominio, "estado": "error", "resultados": 0,
+                                        "errores": 0, "duracion_s": 0.0,
+                                        "carpeta": os.path.join(analyzer.RESULTADOS_DIR, dominio),
+                                        "log": None, "mensaje": f"{type(e).__name__}: {str(e)[:200]}"}
+                informar(estados[dominio])
+    return [estados[dominio] for dominio in dominios]
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="secureval.py",
+        description="Análisis de seguridad de dominios sin interfaz gráfica")
+    parser.add_argument("dominios", nargs="*", help="Dominios a analizar")
+    parser.add_argument("-f", "--archivo", help="Archivo con un dominio por línea")
+    parser.add_argument("-j", "--paralelo", type=int, default=1,
+                        help="Dominios analizados en paralelo (procesos, por defecto 1)")
+    parser.add_argument("--hilos", type=int, default=analyzer.CONCURRENCIA_HOSTS,
+                        help=f"Hosts sondeados en paralelo por dominio (por defecto {analyzer.CONCURRENCIA_HOSTS})")
+    parser.add_argument("--sin-subdominios", action="store_true", help="No ejecutar AssetFinder")
+    parser.add_argument("--sin-puertos", action="store_true", help="No escanear puertos")
+    parser.add_argument("--sin-tls", action="store_true", help="No verificar TLS")
+    parser.add_argument("--sin-cves", action="store_true", help="No buscar CVEs")
+    parser.add_argument("--offline", action="store_true", help="Buscar CVEs en el espejo NVD local")
+    parser.add_argument("--escaner", choices=("nmap", "tcp"), default=analyzer.ESCANER_PUERTOS,
+                        help=f"Escáner de puertos (por defecto {analyzer.ESCANER_PUERTOS}; "
+                             "tcp: escáner TCP integrado, sin nmap)")
+    parser.add_argument("--progresivo", action="store_true",
+                        help="Segunda pasada de puertos con detección de versiones sobre los hosts con puertos abiertos")
+    parser.add_argument("--streaming", action="store_true", help="Solapar descubrimiento y escaneo")
+    parser.add_argument("--incremental", action="store_true", help="Reutilizar hosts sin cambios")
+    parser.add_argument("--reanudar", action="store_true", help="Reanudar análisis interrumpidos")
+    parser.add_argument("--resumen", help="Guardar también el resumen JSON en este archivo")
+    return parser
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    try:
+        dominios = leer_dominios(args.dominios, args.archivo)
+    except OSError as e:
+        parser.error(f"no se pudo leer {args.archivo}: {e}")
+    if not dominios:
+        parser.error("indique al menos un dominio (argumentos o --archivo)")
+
+    opciones = {
+        'subdominios': not args.sin_subdominios,
+        'tecnologias': True,
+        'puertos': not args.sin_puertos,
+        'tls': not args.sin_tls,
+        'cves': not args.sin_cves
+    }
+    parametros = {
+        "concurrencia": max(1, args.hilos),
+        "backend_cves": "offline" if args.offline else "online",
+        "streaming": args.streaming,
+        "incremental": args.incremental,
+        "reanudar": args.reanudar,
+        "escaner_puertos": args.escaner,
+        "progresivo": args.progresivo,
+    }
+
+    inicio = time.time()
+    estados = analizar_lote(dominios, opciones, parametros, max(1, args.paralelo))
+    correctos = sum(1 for e in estados if e["estado"] == "ok")
+    resumen = {
+        "total": len(estados),
+        "correctos": correctos,
+        "fallidos": len(estados) - correctos,
+        "duracion_s": round(time.time() - inicio, 1),
+        "dominios": estados,
+    }
+    texto = json.dumps(resumen, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.resumen:
+        with open(args.resumen, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    return 0 if correctos == len(estados) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
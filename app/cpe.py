@@ -0,0 +1,180 @@
+# app/cpe.py - Correspondencia entre tecnologías detectadas y nombres CPE
+# =====================================
+# - Diccionario local producto WhatWeb -> (vendor, producto) CPE 2.3,
+#   ampliado con los productos presentes en el espejo NVD local
+# - Construcción de nombres CPE con la versión detectada (sin versión no
+#   hay CPE: se busca por palabra clave)
+# - Comparación de versiones y evaluación de rangos de cpeMatch
+#   (versionStart/EndIncluding/Excluding)
+# =====================================
+import re
+import threading
+
+# Productos habituales en la salida de WhatWeb: nombre normalizado ->
+# (vendor, producto). Apache-Coyote no figura: su versión (1.1) es la del
+# conector, no la de Tomcat, así que no hay CPE utilizable y se busca por
+# palabra clave.
+DICCIONARIO_CPE = {
+    "apache": ("apache", "http_server"),
+    "tomcat": ("apache", "tomcat"),
+    "nginx": ("f5", "nginx"),
+    "openresty": ("openresty", "openresty"),
+    "microsoft_iis": ("microsoft", "internet_information_services"),
+    "iis": ("microsoft", "internet_information_services"),
+    "lighttpd": ("lighttpd", "lighttpd"),
+    "litespeed": ("litespeedtech", "litespeed_web_server"),
+    "php": ("php", "php"),
+    "openssl": ("openssl", "openssl"),
+    "wordpress": ("wordpress", "wordpress"),
+    "woocommerce": ("woocommerce", "woocommerce"),
+    "joomla": ("joomla", "joomla\\!"),
+    "drupal": ("drupal", "drupal"),
+    "jquery": ("jquery", "jquery"),
+    "jquery_ui": ("jquery", "jquery_ui"),
+    "bootstrap": ("getbootstrap", "bootstrap"),
+    "modernizr": ("modernizr", "modernizr"),
+    "codeigniter_php_framework": ("codeigniter", "codeigniter"),
+    "codeigniter": ("codeigniter", "codeigniter"),
+    "express": ("expressjs", "express"),
+    "django": ("djangoproject", "django"),
+    "roundcube": ("roundcube", "webmail"),
+    "phpmyadmin": ("phpmyadmin", "phpmyadmin"),
+    "mysql": ("oracle", "mysql"),
+    "mariadb": ("mariadb", "mariadb"),
+    "postgresql": ("postgresql", "postgresql"),
+    "openssh": ("openbsd", "openssh"),
+}
+
+_TROZOS_VERSION = re.compile(r"\d+|[a-z]+")
+
+def normalizar_nombre(nombre):
+    """Normaliza un nombre de producto al formato de los CPE (minúsculas, '_')."""
+    return re.sub(r"[^a-z0-9]+", "_", (nombre or "").lower()).strip("_")
+
+def normalizar_version(version):
+    """Limpia sufijos de distribución: '1.0.2k-fips' -> '1.0.2k'."""
+    if not version:
+        return None
+    version = version.strip().lstrip("vV")
+    return re.split(r"[-+~ ]", version, 1)[0] or None
+
+_PRELANZAMIENTO = {"alpha", "beta", "rc", "pre", "preview", "dev", "snapshot"}
+
+def clave_version(version):
+    """
+    Clave ordenable de una versión.
+
+    Los números se comparan como enteros; las etiquetas de prelanzamiento
+    (rc, beta...) van antes que la versión final y las letras de parche
+    (1.0.2k) después.
+    """
+    clave = []
+    for trozo in _TROZOS_VERSION.findall(version.lower()):
+        if trozo.isdigit():
+            clave.append((1, int(trozo), ""))
+        elif trozo in _PRELANZAMIENTO:
+            clave.append((0, 0, trozo))
+        else:
+            clave.append((2, 0, trozo))
+    return clave
+
+def comparar_versiones(a, b):
+    """Devuelve -1, 0 o 1 según a sea menor, igual o mayor que b."""
+    ca, cb = clave_version(a), clave_version(b)
+    # Rellenar con ceros: 1.0 == 1.0.0
+    largo = max(len(ca), len(cb))
+    ca += [(1, 0, "")] * (largo - len(ca))
+    cb += [(1, 0, "")] * (largo - len(cb))
+    return (ca > cb) - (ca < cb)
+
+def version_en_rango(version, version_cpe, inicio_incl=None, inicio_excl=None,
+                     fin_incl=None, fin_excl=None):
+    """
+    Indica si version está cubierta por un cpeMatch de la NVD.
+
+    version_cpe es el campo de versión del criteria ('*', '-' o concreta).
+    Si version es None no se puede descartar y se considera cubierta.
+    """
+    if not version:
+        return True
+    if version_cpe not in ("*", "-", "", None):
+        return comparar_versiones(version, version_cpe) == 0
+    if inicio_incl and comparar_versiones(version, inicio_incl) < 0:
+        return False
+    if inicio_excl and comparar_versiones(version, inicio_excl) <= 0:
+        return False
+    if fin_incl and comparar_versiones(version, fin_incl) > 0:
+        return False
+    if fin_excl and comparar_versiones(version, fin_excl) >= 0:
+        return False
+    return True
+
+class IndiceCPE:
+    """
+    Índice producto normalizado -> (vendor, producto).
+
+    Combina DICCIONARIO_CPE con los productos del espejo NVD local (si
+    existe). El índice se calcula una vez y se reutiliza.
+    """
+
+    def __init__(self, espejo=None):
+        self.espejo = espejo
+        self._indice = None
+        self._lock = threading.Lock()
+
+    def _construir(self):
+        vendors = {}
+        if self.espejo is not None and self.espejo.disponible():
+            for vendor, producto in self.espejo.productos_cpe():
+                vendors.setdefault((normalizar_nombre(producto), producto), set()).add(vendor)
+        # Solo productos con un único vendor: los nombres ambiguos no se adivinan
+        indice = {nombre: (next(iter(v)), producto)
+                  for (nombre, producto), v in vendors.items() if len(v) == 1}
+        indice.update(DICCIONARIO_CPE)
+        return indice
+
+    def indice(self):
+        with self._lock:
+            if self._indice is None:
+                self._indice = self._construir()
+            return self._indice
+
+    def buscar(self, producto):
+        return self.indice().get(normalizar_nombre(producto))
+
+    def cpe_para(self, producto, version=None):
+        """
+        Nombre CPE 2.3 (virtual match string) con versión de un producto
+        detectado, o None si el producto no está en el índice o no hay
+        versión utilizable. Un CPE sin versión casaría con todos los CVEs
+        del producto y se quedarían los más graves de su historia.
+        """
+        entrada = self.buscar(producto)
+        if entrada is None:
+            return None
+        vendor, nombre_cpe = entrada
+        version = normalizar_version(version)
+        if not version:
+            return None
+        return f"cpe:2.3:a:{vendor}:{nombre_cpe}:{version}"
+
+def partes_consulta_cpe(cpe):
+    """Separa un virtual match string en (vendor, producto, versión|None)."""
+    campos = cpe.split(":")
+    vendor = campos[3] if len(campos) > 3 else ""
+    producto = campos[4] if len(campos) > 4 else ""
+    version = campos[5] if len(campos) > 5 and campos[5] not in ("*", "-") else None
+    return vendor, producto, version
+
+def puntuacion_cvss(vulnerabilidad):
+    """baseScore CVSS v3.1 de un elemento de "vulnerabilities" (0.0 si no tiene)."""
+    metricas = vulnerabilidad.get("cve", {}).get("metrics", {})
+    if "cvssMetricV31" in metricas:
+        return metricas["cvssMetricV31"][0]["cvssData"]["baseScore"]
+    return 0.0
+
+def mas_graves(vulnerabilidades, limite):
+    """Los limite CVEs de mayor CVSS (a igualdad, los más recientes primero)."""
+    return sorted(vulnerabilidades,
+                  key=lambda v: (puntuacion_cvss(v), v.get("cve", {}).get("published", "")),
+                  reverse=True)[:limite]
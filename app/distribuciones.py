@@ -0,0 +1,87 @@
+# app/distribuciones.py - Distribuciones de riesgo y CVSS para el dashboard
+# =====================================
+# Calcula con NumPy, a partir de los hallazgos reales de un análisis:
+# - hallazgos por nivel de riesgo (umbrales de la metodología SECUREVAL)
+# - histograma del riesgo (0-125)
+# - hallazgos por severidad CVSS
+# - riesgo máximo y promedio por subdominio
+# Las columnas (riesgo, CVSS máximo y host) se leen del almacén de
+# resultados con una sola consulta y todos los agregados son operaciones
+# vectorizadas (searchsorted, bincount, histogram), de modo que dominios
+# con decenas de miles de hallazgos se siguen mostrando al momento. Se
+# consultan con AlmacenResultados.distribuciones (o consultar_dominio), que
+# las guarda en memoria por análisis: un análisis guardado no cambia y el
+# dashboard no las vuelve a calcular al redibujarse.
+# =====================================
+import numpy as np
+
+# Niveles de riesgo de analyzer (límites inferiores de Medio, Alto y Crítico)
+NIVELES_RIESGO = ("Bajo", "Medio", "Alto", "Crítico")
+BORDES_RIESGO = np.array([25.0, 50.0, 80.0])
+RIESGO_MAXIMO = 125
+INTERVALOS_HISTOGRAMA = 10
+# Severidad CVSS (límites inferiores de Bajo, Medio, Alto y Crítico)
+NIVELES_CVSS = ("Ninguno", "Bajo", "Medio", "Alto", "Crítico")
+BORDES_CVSS = np.array([0.1, 4.0, 7.0, 9.0])
+# Subdominios con más riesgo que se muestran
+TOP_SUBDOMINIOS = 10
+
+def columnas_escaneo(conexion, escaneo_id):
+    """
+    Columnas de los hallazgos de un análisis del almacén como arrays:
+    riesgo, CVSS máximo y código de subdominio (índice en la lista de
+    subdominios, ordenada por nombre).
+
+    Returns:
+        dict: riesgo, cvss, codigos y subdominios
+    """
+    hosts = conexion.execute("SELECT id, subdominio FROM hosts WHERE escaneo_id = ? ORDER BY subdominio",
+                             (escaneo_id,)).fetchall()
+    valores = np.array(conexion.execute("""
+        SELECT COALESCE(riesgo, 0), COALESCE(cvss_max, 0), host_id FROM hallazgos
+        WHERE escaneo_id = ? ORDER BY posicion""", (escaneo_id,)).fetchall(), dtype=np.float64).reshape(-1, 3)
+    ids = np.array([host_id for host_id, _ in hosts], dtype=np.int64)
+    orden = np.argsort(ids)
+    codigos = orden[np.searchsorted(ids, valores[:, 2].astype(np.int64), sorter=orden)]
+    return {"riesgo": np.nan_to_num(valores[:, 0]), "cvss": np.nan_to_num(valores[:, 1]),
+            "codigos": codigos, "subdominios": np.array([sub for _, sub in hosts], dtype=object)}
+
+def calcular_distribuciones(columnas, top=TOP_SUBDOMINIOS):
+    """
+    Distribuciones de un análisis a partir de sus columnas.
+
+    Returns:
+        dict: total, niveles_riesgo y niveles_cvss (nivel -> hallazgos),
+              histograma_riesgo (conteos y bordes), riesgo_promedio,
+              cvss_max y riesgo_por_subdominio (los `top` de mayor riesgo)
+    """
+    riesgo, cvss, codigos = columnas["riesgo"], columnas["cvss"], columnas["codigos"]
+    subdominios = columnas["subdominios"]
+
+    niveles = np.bincount(np.searchsorted(BORDES_RIESGO, riesgo, side="right"), minlength=len(NIVELES_RIESGO))
+    severidades = np.bincount(np.searchsorted(BORDES_CVSS, cvss, side="right"), minlength=len(NIVELES_CVSS))
+    conteos, bordes = np.histogram(np.clip(riesgo, 0, RIESGO_MAXIMO), bins=INTERVALOS_HISTOGRAMA,
+                                   range=(0, RIESGO_MAXIMO))
+
+    por_subdominio = []
+    if len(subdominios):
+        hallazgos = np.bincount(codigos, minlength=len(subdominios))
+        promedio = np.bincount(codigos, weights=riesgo, minlength=len(subdominios)) / hallazgos
+        # Máximo por grupo: ordenar por (subdominio, riesgo) y tomar el último de cada grupo
+        orden = np.lexsort((riesgo, codigos))
+        ultimos = np.append(np.flatnonzero(np.diff(codigos[orden])), len(orden) - 1)
+        maximo = riesgo[orden][ultimos]
+        for i in np.argsort(-maximo, kind="stable")[:top]:
+            por_subdominio.append({"subdominio": str(subdominios[i]), "riesgo_max": float(maximo[i]),
+                                   "riesgo_promedio": round(float(promedio[i]), 2),
+                                   "hallazgos": int(hallazgos[i])})
+
+    return {
+        "total": int(riesgo.size),
+        "niveles_riesgo": dict(zip(NIVELES_RIESGO, niveles.tolist())),
+        "niveles_cvss": dict(zip(NIVELES_CVSS, severidades.tolist())),
+        "histograma_riesgo": {"conteos": conteos.tolist(), "bordes": bordes.tolist()},
+        "riesgo_promedio": float(riesgo.mean()) if riesgo.size else 0.0,
+        "cvss_max": float(cvss.max()) if cvss.size else 0.0,
+        "riesgo_por_subdominio": por_subdominio,
+    }
@@ -0,0 +1,145 @@
+# app/escaner_tcp.py - Escáner de puertos TCP connect con asyncio
+# =====================================
+# Alternativa integrada a nmap (sin procesos externos ni privilegios):
+# - Mismos puertos que "nmap -F" (los 100 más frecuentes) y mismo formato
+#   de resultado ("80/tcp open http")
+# - Conexiones simultáneas limitadas globalmente y por host
+# - Timeout adaptativo por host a partir del RTT observado (como nmap:
+#   srtt + 4 * rttvar, acotado) y un reintento para puertos sin respuesta
+# - Límite de tiempo total por host, contado desde que el host empieza a
+#   escanearse: solo se admiten a la vez los hosts que caben en el límite
+#   global (como los grupos de hosts de nmap)
+# =====================================
+import time
+import asyncio
+
+# Puertos de "nmap -F" (top 100 de nmap-services) con su nombre de servicio
+PUERTOS_RAPIDOS = {
+    7: "echo", 9: "discard", 13: "daytime", 21: "ftp", 22: "ssh", 23: "telnet",
+    25: "smtp", 26: "rsftp", 37: "time", 53: "domain", 79: "finger", 80: "http",
+    81: "hosts2-ns", 88: "kerberos-sec", 106: "pop3pw", 110: "pop3", 111: "rpcbind",
+    113: "ident", 119: "nntp", 135: "msrpc", 139: "netbios-ssn", 143: "imap",
+    144: "news", 179: "bgp", 199: "smux", 389: "ldap", 427: "svrloc", 443: "https",
+    444: "snpp", 445: "microsoft-ds", 465: "smtps", 513: "login", 514: "shell",
+    515: "printer", 543: "klogin", 544: "kshell", 548: "afp", 554: "rtsp",
+    587: "submission", 631: "ipp", 646: "ldp", 873: "rsync", 990: "ftps",
+    993: "imaps", 995: "pop3s", 1025: "NFS-or-IIS", 1026: "LSA-or-nterm",
+    1027: "IIS", 1028: "unknown", 1029: "ms-lsa", 1110: "nfsd-status",
+    1433: "ms-sql-s", 1720: "h323q931", 1723: "pptp", 1755: "wms", 1900: "upnp",
+    2000: "cisco-sccp", 2001: "dc", 2049: "nfs", 2121: "ccproxy-ftp",
+    2717: "pn-requester", 3000: "ppp", 3128: "squid-http", 3306: "mysql",
+    3389: "ms-wbt-server", 3986: "mapper-ws_ethd", 4899: "radmin", 5000: "upnp",
+    5009: "airport-admin", 5051: "ida-agent", 5060: "sip", 5101: "admdog",
+    5190: "aol", 5357: "wsdapi", 5432: "postgresql", 5631: "pcanywheredata",
+    5666: "nrpe", 5800: "vnc-http", 5900: "vnc", 6000: "X11", 6001: "X11:1",
+    6646: "unknown", 7070: "realserver", 8000: "http-alt", 8008: "http",
+    8009: "ajp13", 8080: "http-proxy", 8081: "blackice-icecap", 8443: "https-alt",
+    8888: "sun-answerbook", 9100: "jetdirect", 9999: "abyss",
+    10000: "snet-sensor-mgmt", 32768: "filenet-tms", 49152: "unknown",
+    49153: "unknown", 49154: "unknown", 49155: "unknown", 49156: "unknown",
+    49157: "unknown",
+}
+
+# Conexiones abiertas a la vez en total y contra un mismo host
+CONEXIONES_GLOBALES = 256
+CONEXIONES_POR_HOST = 64
+# Timeout de conexión: inicial (sin RTT medido) y límites del adaptativo
+TIMEOUT_INICIAL = 1.0
+TIMEOUT_MINIMO = 0.1
+TIMEOUT_MAXIMO = 3.0
+# Reintentos para puertos que no responden (nmap --max-retries 1)
+REINTENTOS = 1
+# Tiempo máximo por host (segundos)
+TIMEOUT_HOST = 45
+
+class TiempoRespuesta:
+    """Timeout adaptativo de un host (estimador de RTT de nmap / TCP)."""
+
+    def __init__(self, inicial=TIMEOUT_INICIAL):
+        self.srtt = None
+        self.rttvar = None
+        self.inicial = inicial
+
+    def registrar(self, rtt):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def timeout(self):
+        if self.srtt is None:
+            return self.inicial
+        return min(max(self.srtt + 4 * self.rttvar, TIMEOUT_MINIMO), TIMEOUT_MAXIMO)
+
+async def _conectar(ip, puerto, tiempo, limite_global, limite_host):
+    """Estado del puerto: "open", "closed" o "filtered" (sin respuesta)."""
+    for _ in range(REINTENTOS + 1):
+        # Primero el límite del host: un host saturado no retiene plazas globales
+        async with limite_host, limite_global:
+            inicio = time.monotonic()
+            try:
+                _, escritor = await asyncio.wait_for(asyncio.open_connection(ip, puerto), tiempo.timeout)
+            except asyncio.TimeoutError:
+                continue
+            except ConnectionRefusedError:
+                # El RST también mide el RTT
+                tiempo.registrar(time.monotonic() - inicio)
+                return "closed"
+            except OSError:
+                return "filtered"
+            tiempo.registrar(time.monotonic() - inicio)
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except OSError:
+                pass
+            return "open"
+    return "filtered"
+
+async def _escanear_host(ip, puertos, limite_global, por_host):
+    limite_host = asyncio.Semaphore(por_host)
+    tiempo = TiempoRespuesta()
+    estados = await asyncio.gather(*(_conectar(ip, p, tiempo, limite_global, limite_host) for p in puertos))
+    return sorted(p for p, estado in zip(puertos, estados) if estado == "open")
+
+def hosts_simultaneos(conexiones, por_host, puertos):
+    """Hosts escaneados a la vez: los que llenan el límite global de conexiones."""
+    return max(1, conexiones // max(1, min(por_host, puertos)))
+
+async def _escanear(ips, puertos, conexiones, por_host, timeout_host):
+    limite_global = asyncio.Semaphore(conexiones)
+    admision = asyncio.Semaphore(hosts_simultaneos(conexiones, por_host, len(puertos)))
+
+    async def host_con_limite(ip):
+        # El plazo del host empieza al admitirlo, no mientras espera turno
+        async with admision:
+            try:
+                return await asyncio.wait_for(_escanear_host(ip, puertos, limite_global, por_host), timeout_host)
+            except asyncio.TimeoutError:
+                return None
+
+    return dict(zip(ips, await asyncio.gather(*(host_con_limite(ip) for ip in ips))))
+
+def lineas_puertos(abiertos, servicios=None):
+    """Puertos abiertos con el formato de escanear_puertos_nmap."""
+    if servicios is None:
+        servicios = PUERTOS_RAPIDOS
+    return [f"{p}/tcp open {servicios.get(p, 'unknown')}" for p in sorted(abiertos)]
+
+def escanear_tcp(ips, puertos=None, conexiones=CONEXIONES_GLOBALES, por_host=CONEXIONES_POR_HOST,
+                 timeout_host=TIMEOUT_HOST):
+    """
+    Escanea varias IPs con conexiones TCP completas.
+
+    Returns:
+        dict: IP -> lista ordenada de puertos abiertos, o None si el host
+              superó timeout_host
+    """
+    ips = list(dict.fromkeys(ips))
+    if puertos is None:
+        puertos = list(PUERTOS_RAPIDOS)
+    if not ips:
+        return {}
+    return asyncio.run(_escanear(ips, list(puertos), conexiones, por_host, timeout_host))
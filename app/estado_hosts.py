@@ -0,0 +1,61 @@
+# app/estado_hosts.py - Estado por host entre análisis (reescaneo incremental)
+# =====================================
+# Al final de cada análisis se guarda en resultados/<dominio>/estado_hosts.json
+# lo obtenido para cada host: huella de WhatWeb, SO, TLS, puertos (y si se
+# escanearon en modo progresivo) y CVEs por tecnología. En modo
+# incremental, los hosts cuya huella no ha cambiado, escaneados en el mismo
+# modo y con datos dentro de la ventana de vigencia se reutilizan sin
+# volver a sondearlos.
+# =====================================
+import os
+import json
+import time
+import hashlib
+
+NOMBRE_ESTADO = "estado_hosts.json"
+# Vigencia de los datos de un host reutilizable (segundos)
+VENTANA_INCREMENTAL = 24 * 3600
+
+def huella_whatweb(registro):
+    """
+    Huella de un registro de WhatWeb: plugins detectados (con sus versiones
+    y cadenas) y código HTTP. Cualquier cambio en ellos obliga a sondear.
+    """
+    contenido = json.dumps({
+        "plugins": registro.get("plugins", {}),
+        "http_status": registro.get("http_status"),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def cargar_estado(carpeta):
+    """Devuelve (opciones, hosts) del análisis anterior; ({}, {}) si no hay."""
+    ruta = os.path.join(carpeta, NOMBRE_ESTADO)
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}, {}
+    if not isinstance(estado, dict):
+        return {}, {}
+    return estado.get("opciones") or {}, estado.get("hosts") or {}
+
+def guardar_estado(carpeta, opciones, hosts):
+    """Escribe el estado de forma atómica (archivo temporal + os.replace)."""
+    ruta = os.path.join(carpeta, NOMBRE_ESTADO)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"opciones": opciones, "hosts": hosts}, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+def host_reutilizable(previo, huella, ventana=VENTANA_INCREMENTAL, ahora=None, progresivo=False):
+    """
+    True si el host no cambió, sus puertos se escanearon en el mismo modo
+    (progresivo o solo barrido rápido) y sus datos siguen vigentes.
+    """
+    if not previo or previo.get("huella") != huella:
+        return False
+    # Estados anteriores a registrar el modo: escaneo no progresivo
+    if previo.get("progresivo", False) != progresivo:
+        return False
+    ahora = time.time() if ahora is None else ahora
+    return ahora - previo.get("fecha", 0) <= ventana
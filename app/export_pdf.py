@@ -13,17 +13,24 @@ import os
 import json
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+from .almacen_resultados import consultar_dominio
+from .catalogo_resultados import listar_catalogo
+from .formato_resultados import cargar_resultados
 
-def calcular_kpis_para_pdf(data):
-    """Calcula los KPIs de riesgo para incluir en el PDF."""
-    if not data:
+def calcular_kpis_para_pdf(indicadores):
+    """
+    Calcula los KPIs de riesgo para incluir en el PDF a partir de los
+    indicadores comunes del análisis (agregados del almacén de resultados).
+    """
+    if not indicadores or not indicadores["total_hallazgos"]:
         return None
     
-    total = len(data)
-    bajos = sum(1 for r in data if r["riesgo"] < 10)
-    medios = sum(1 for r in data if 10 <= r["riesgo"] < 25)
-    mitigables = sum(1 for r in data if 25 <= r["riesgo"] < 80)
-    criticos = sum(1 for r in data if r["riesgo"] >= 80)
+    total = indicadores["total_hallazgos"]
+    bandas = indicadores["por_banda"]
+    bajos = bandas["bajo"]
+    medios = bandas["medio"]
+    mitigables = bandas["mitigable"]
+    criticos = bandas["critico"]
     
     return {
         "total_amenazas": total,
@@ -31,8 +38,8 @@ def calcular_kpis_para_pdf(data):
         "riesgo_medio": (medios, round(medios * 100 / total, 1) if total > 0 else 0),
         "riesgo_mitigable": (mitigables, round(mitigables * 100 / total, 1) if total > 0 else 0),
         "riesgo_critico": (criticos, round(criticos * 100 / total, 1) if total > 0 else 0),
-        "riesgo_promedio": round(sum(r["riesgo"] for r in data) / total, 2) if total > 0 else 0,
-        "riesgo_maximo": max(r["riesgo"] for r in data) if data else 0
+        "riesgo_promedio": round(indicadores["riesgo_promedio"], 2),
+        "riesgo_maximo": indicadores["riesgo_max"]
     }
 
 def determinar_tratamiento_para_pdf(riesgo):
@@ -300,16 +307,19 @@ def exportar_pdf(dominio):
     ruta_pdf = os.path.join("resultados", dominio, "riesgo.pdf")
     ruta_activos = os.path.join("resultados", "activos.json")
 
-    if not os.path.exists(ruta_resultado):
-        return False
-
-    with open(ruta_resultado, "r") as f:
-        data = json.load(f)
+    # Hallazgos y resumen del almacén de resultados; sin él, de los JSON
+    data = consultar_dominio(dominio, "hallazgos")
+    if data is None:
+        if not os.path.exists(ruta_resultado):
+            return False
+        data = cargar_resultados(ruta_resultado)
 
-    resumen_data = []
-    if os.path.exists(ruta_resumen):
-        with open(ruta_resumen, "r") as f:
-            resumen_data = json.load(f)
+    resumen_data = consultar_dominio(dominio, "resumen")
+    if resumen_data is None:
+        resumen_data = []
+        if os.path.exists(ruta_resumen):
+            with open(ruta_resumen, "r") as f:
+                resumen_data = json.load(f)
 
     activos = []
     if os.path.exists(ruta_activos):
@@ -330,7 +340,7 @@ def exportar_pdf(dominio):
     elementos = []
     
     # Calcular KPIs
-    kpis = calcular_kpis_para_pdf(data)
+    kpis = calcular_kpis_para_pdf(consultar_dominio(dominio, "indicadores"))
 
     # ============================
     # PORTADA PROFESIONAL
@@ -744,6 +754,19 @@ def exportar_pdf(dominio):
 
 def obtener_dominios_disponibles():
     """Obtiene la lista de dominios que tienen análisis completados."""
+    # Catálogo de resultados: recuentos y riesgo máximo sin abrir riesgo.json
+    catalogo = listar_catalogo()
+    if catalogo is not None:
+        dominios_disponibles = [{
+            'dominio': e['dominio'],
+            'fecha_analisis': e['fecha_fin'],
+            'total_amenazas': e['total_hallazgos'],
+            'riesgo_max': e['riesgo_max'],
+            'metadata': e['metadata']
+        } for e in catalogo]
+        dominios_disponibles.sort(key=lambda x: x['fecha_analisis'], reverse=True)
+        return dominios_disponibles
+
     dominios_disponibles = []
     ruta_resultados = "resultados"
     
@@ -770,10 +793,9 @@ def obtener_dominios_disponibles():
                 
                 # Contar amenazas
                 try:
-                    with open(ruta_riesgo, 'r') as f:
-                        data = json.load(f)
-                        total_amenazas = len(data)
-                        riesgo_max = max(r['riesgo'] for r in data) if data else 0
+                    data = cargar_resultados(ruta_riesgo)
+                    total_amenazas = len(data)
+                    riesgo_max = max(r['riesgo'] for r in data) if data else 0
                 except:
                     total_amenazas = 0
                     riesgo_max = 0
@@ -915,7 +937,6 @@ class SelectorExportacionPDF:
         """Muestra la vista previa del dominio seleccionado."""
         try:
             # Cargar datos del dominio
-            ruta_riesgo = os.path.join("resultados", dominio_info['dominio'], "riesgo.json")
             ruta_resumen = os.path.join("resultados", dominio_info['dominio'], "resumen.json")
             ruta_metadata = os.path.join("resultados", dominio_info['dominio'], "metadata.json")
             
@@ -946,16 +967,16 @@ class SelectorExportacionPDF:
                     info_text += f"🛠️  Herramientas: {', '.join(meta['herramientas_usadas'])}\n"
                 info_text += "\n"
             
-            # Cargar datos de riesgo para estadísticas
-            if os.path.exists(ruta_riesgo):
-                with open(ruta_riesgo, 'r') as f:
-                    data_riesgo = json.load(f)
+            # Estadísticas: indicadores comunes del análisis (sin leer los hallazgos)
+            indicadores = consultar_dominio(dominio_info['dominio'], "indicadores")
+            if indicadores is not None:
                 
-                # Calcular distribución de riesgos
-                criticos = sum(1 for r in data_riesgo if r['riesgo'] >= 80)
-                altos = sum(1 for r in data_riesgo if 25 <= r['riesgo'] < 80)
-                medios = sum(1 for r in data_riesgo if 10 <= r['riesgo'] < 25)
-                bajos = sum(1 for r in data_riesgo if r['riesgo'] < 10)
+                # Distribución de riesgos por bandas
+                bandas = indicadores['por_banda']
+                criticos = bandas['critico']
+                altos = bandas['mitigable']
+                medios = bandas['medio']
+                bajos = bandas['bajo']
                 
                 info_text += "📈 DISTRIBUCIÓN DE RIESGOS\n"
                 info_text += "-" * 30 + "\n"
@@ -964,11 +985,8 @@ class SelectorExportacionPDF:
                 info_text += f"🟡 Medios (10-24): {medios}\n"
                 info_text += f"🟢 Bajos (<10): {bajos}\n\n"
                 
-                # Mostrar algunas tecnologías detectadas
-                tecnologias = set()
-                for r in data_riesgo[:10]:  # Primeras 10 amenazas
-                    if r.get('tecnologia'):
-                        tecnologias.add(r['tecnologia'])
+                # Mostrar algunas tecnologías detectadas (las de mayor riesgo)
+                tecnologias = [tech for tech, _ in indicadores['top_tecnologias'] if tech]
                 
                 if tecnologias:
                     info_text += "🔧 TECNOLOGÍAS DETECTADAS (muestra)\n"
@@ -980,9 +998,11 @@ class SelectorExportacionPDF:
                     info_text += "\n"
             
             # Cargar resumen por subdominios si existe
-            if os.path.exists(ruta_resumen):
+            data_resumen = consultar_dominio(dominio_info['dominio'], "resumen")
+            if data_resumen is None and os.path.exists(ruta_resumen):
                 with open(ruta_resumen, 'r') as f:
                     data_resumen = json.load(f)
+            if data_resumen is not None:
                 
                 info_text += "🌐 SUBDOMINIOS ANALIZADOS\n"
                 info_text += "-" * 30 + "\n"
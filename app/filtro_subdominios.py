@@ -0,0 +1,142 @@
+# app/filtro_subdominios.py - Filtrado de la salida de AssetFinder
+# =====================================
+# Entre AssetFinder y WhatWeb:
+# - Normaliza cada línea (minúsculas, sin esquema, puerto, "*." ni punto
+#   final; IDN a punycode) y descarta las que no son nombres de host
+# - Elimina duplicados
+# - Aplica el alcance: solo el dominio analizado y sus subdominios, menos
+#   los patrones excluidos (ALCANCE_EXCLUIR y fuera_de_alcance.txt)
+# - Descarta los nombres que no resuelven
+# - Detecta DNS comodín (wildcard) resolviendo etiquetas aleatorias en la
+#   zona de cada host: los hosts que solo devuelven las direcciones del
+#   comodín se agrupan y pasa un único representante
+# =====================================
+import os
+import re
+import fnmatch
+import secrets
+import threading
+from concurrent.futures import Future
+
+# Patrones (fnmatch) de hosts fuera de alcance para todos los dominios
+ALCANCE_EXCLUIR = ()
+# Archivo opcional en resultados/<dominio>/ con un patrón por línea
+NOMBRE_EXCLUSIONES = "fuera_de_alcance.txt"
+# Etiquetas aleatorias resueltas por zona para detectar el comodín
+SONDAS_COMODIN = 2
+
+_HOSTNAME = re.compile(r"^(?!-)[a-z0-9_-]{1,63}(?<!-)(\.(?!-)[a-z0-9_-]{1,63}(?<!-))*$")
+
+def normalizar_subdominio(linea):
+    """Nombre de host normalizado de una línea de AssetFinder, o None si no es válido."""
+    host = linea.strip().lower()
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    host = host.split("/", 1)[0].split(":", 1)[0].rstrip(".")
+    while host.startswith("*."):
+        host = host[2:]
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    if len(host) > 253 or not _HOSTNAME.match(host):
+        return None
+    return host
+
+def cargar_exclusiones(carpeta):
+    """Patrones de fuera_de_alcance.txt (se ignoran líneas vacías y comentarios)."""
+    try:
+        with open(os.path.join(carpeta, NOMBRE_EXCLUSIONES), "r", encoding="utf-8") as f:
+            return [l.strip().lower() for l in f if l.strip() and not l.lstrip().startswith("#")]
+    except OSError:
+        return []
+
+def en_alcance(host, dominio, excluir=()):
+    """True si host es el dominio o un subdominio suyo y no está excluido."""
+    dominio = dominio.lower().rstrip(".")
+    if host != dominio and not host.endswith("." + dominio):
+        return False
+    return not any(fnmatch.fnmatchcase(host, patron) for patron in excluir)
+
+class FiltroSubdominios:
+    """
+    Decide qué subdominios pasan a WhatWeb.
+
+    direcciones(hostname) devuelve la lista de IPs del host ([] si no
+    resuelve); normalmente CacheEndpoints.direcciones, de modo que las
+    resoluciones se reutilizan en el resto del análisis. Es segura entre
+    hilos: admitir() puede llamarse desde el pool de resolución del modo
+    streaming.
+    """
+
+    def __init__(self, dominio, direcciones, excluir=()):
+        self.dominio = dominio.lower().rstrip(".")
+        self.direcciones = direcciones
+        self.excluir = [p.lower() for p in (*ALCANCE_EXCLUIR, *excluir)]
+        self._lock = threading.Lock()
+        self._vistos = set()
+        self._zonas = {}
+        self._representantes = {}
+        self.descartados = {"invalidos": 0, "duplicados": 0, "fuera_de_alcance": 0,
+                            "sin_dns": 0, "comodin": 0}
+
+    def _descartar(self, motivo):
+        with self._lock:
+            self.descartados[motivo] += 1
+        return None
+
+    def _sondear_zona(self, zona):
+        """Direcciones del comodín de la zona (frozenset vacío si no hay)."""
+        encontradas = set()
+        for _ in range(SONDAS_COMODIN):
+            encontradas.update(self.direcciones(f"secureval-{secrets.token_hex(6)}.{zona}"))
+        return frozenset(encontradas)
+
+    def comodin(self, zona):
+        """Direcciones del DNS comodín de la zona; se sondea una vez por zona."""
+        with self._lock:
+            futuro = self._zonas.get(zona)
+            propietario = futuro is None
+            if propietario:
+                futuro = Future()
+                self._zonas[zona] = futuro
+        if propietario:
+            try:
+                futuro.set_result(self._sondear_zona(zona))
+            except BaseException as e:
+                futuro.set_exception(e)
+        return futuro.result()
+
+    def admitir(self, linea):
+        """Host normalizado si debe analizarse, o None si se descarta."""
+        host = normalizar_subdominio(linea)
+        if host is None:
+            return self._descartar("invalidos")
+        with self._lock:
+            repetido = host in self._vistos
+            self._vistos.add(host)
+        if repetido:
+            return self._descartar("duplicados")
+        if not en_alcance(host, self.dominio, self.excluir):
+            return self._descartar("fuera_de_alcance")
+        ips = self.direcciones(host)
+        if not ips:
+            return self._descartar("sin_dns")
+        if host == self.dominio:
+            return host
+        zona = host.split(".", 1)[1]
+        comodin = self.comodin(zona)
+        if comodin and set(ips) <= comodin:
+            with self._lock:
+                representante = self._representantes.setdefault((zona, comodin), host)
+            if representante != host:
+                return self._descartar("comodin")
+        return host
+
+    def filtrar(self, lineas):
+        """Aplica admitir() a todas las líneas y conserva el orden de llegada."""
+        return [host for host in map(self.admitir, lineas) if host]
+
+    def resumen(self):
+        partes = [f"{n} {motivo.replace('_', ' ')}" for motivo, n in self.descartados.items() if n]
+        return ", ".join(partes) if partes else "ninguno"
@@ -0,0 +1,82 @@
+# app/formato_resultados.py - Formato normalizado de los resultados
+# =====================================
+# riesgo.json se sigue escribiendo como lista de filas (una por host y
+# tecnología) para los consumidores externos; la versión normalizada se
+# escribe aparte, en riesgo_normalizado.json. En ella los datos de cada host (sistema operativo, puertos, TLS) se guardan una
+# sola vez y los hallazgos (una fila por tecnología) los referencian por
+# su subdominio:
+#   {"formato": 2,
+#    "hosts": {"https://www.ejemplo.com": {"sistema_operativo": ..., "puertos": [...], "tls": {...}}},
+#    "hallazgos": [{"subdominio": "https://www.ejemplo.com", "tecnologia": ..., "riesgo": ..., "cves": [...]}]}
+# Si una fila tiene datos de host distintos de los del host (archivos
+# antiguos, con sondas por tecnología), el hallazgo los conserva.
+# expandir_resultados reconstruye la lista de filas (vista de
+# compatibilidad) y acepta también la lista tal cual.
+# =====================================
+import json
+
+FORMATO_RESULTADOS = 2
+# Archivo con la versión normalizada, junto a riesgo.json
+RIESGO_NORMALIZADO = "riesgo_normalizado.json"
+
+# Campos propios del host, repetidos en cada fila del formato anterior
+CAMPOS_HOST = ("sistema_operativo", "puertos", "tls")
+
+# Orden de las claves en las filas del formato anterior
+CAMPOS_FILA = ("subdominio", "tecnologia", "tipo_servicio", "sistema_operativo", "puertos", "tls",
+               "cvss_max", "valor_activo", "probabilidad", "vulnerabilidad", "riesgo", "criticidad", "cves")
+
+def normalizar_resultados(filas):
+    """Convierte las filas (una por host y tecnología) al formato normalizado."""
+    hosts, hallazgos = {}, []
+    for fila in filas:
+        subdominio = fila.get("subdominio", "")
+        host = hosts.setdefault(subdominio, {campo: fila.get(campo) for campo in CAMPOS_HOST})
+        hallazgos.append({clave: valor for clave, valor in fila.items()
+                          if clave not in CAMPOS_HOST or valor != host[clave]})
+    return {"formato": FORMATO_RESULTADOS, "hosts": hosts, "hallazgos": hallazgos}
+
+def expandir_resultados(datos):
+    """
+    Filas con el formato anterior a partir del formato normalizado. Una
+    lista (archivo antiguo) se devuelve tal cual.
+
+    Returns:
+        list: filas, o None si los datos no tienen ninguno de los dos formatos
+    """
+    if isinstance(datos, list):
+        return datos
+    if not isinstance(datos, dict) or not isinstance(datos.get("hallazgos"), list):
+        return None
+    hosts = datos.get("hosts") or {}
+    filas = []
+    for hallazgo in datos["hallazgos"]:
+        host = hosts.get(hallazgo.get("subdominio"), {})
+        fila = {campo: hallazgo[campo] if campo in hallazgo else host.get(campo)
+                for campo in CAMPOS_FILA if campo in CAMPOS_HOST or campo in hallazgo}
+        fila.update((clave, valor) for clave, valor in hallazgo.items() if clave not in fila)
+        filas.append(fila)
+    return filas
+
+def guardar_resultados(ruta, filas):
+    """Escribe riesgo.json como lista de filas (formato de siempre)."""
+    with open(ruta, "w") as f:
+        json.dump(filas, f, indent=4, ensure_ascii=False)
+
+def guardar_normalizado(ruta, filas):
+    """Escribe la versión normalizada de las filas (riesgo_normalizado.json)."""
+    with open(ruta, "w") as f:
+        json.dump(normalizar_resultados(filas), f, indent=4, ensure_ascii=False)
+
+def cargar_resultados(ruta):
+    """
+    Lee riesgo.json o riesgo_normalizado.json como lista de filas.
+
+    Raises:
+        OSError, ValueError: si el archivo no existe o no es JSON válido
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        filas = expandir_resultados(json.load(f))
+    if filas is None:
+        raise ValueError(f"Formato de resultados no reconocido: {ruta}")
+    return filas
@@ -0,0 +1,90 @@
+# app/indicadores.py - Indicadores (KPIs) de un dominio
+# =====================================
+# Un único cálculo de los indicadores que muestran el dashboard, el módulo
+# de tratamiento y el informe PDF, para que todos den las mismas cifras:
+# - Agregados por columnas en SQLite sobre el análisis del almacén de
+#   resultados (COUNT, AVG, MAX por subdominio, tecnología y banda), sin
+#   cargar los hallazgos en Python
+# - Se calculan al guardar cada análisis en el almacén y se guardan con él
+#   (escaneos.indicadores); se consultan con AlmacenResultados.indicadores
+#   (o consultar_dominio en las pantallas de solo lectura)
+# =====================================
+
+# Bandas de riesgo del informe (límite inferior incluido)
+BANDAS_RIESGO = (("bajo", 0), ("medio", 10), ("mitigable", 25), ("critico", 80))
+# Riesgo máximo a partir del cual un subdominio cuenta como de alto riesgo
+# (límite inferior de la banda "mitigable", la de riesgo alto del informe)
+UMBRAL_SUBDOMINIO_ALTO = dict(BANDAS_RIESGO)["mitigable"]
+TOP_TECNOLOGIAS = 10
+
+# Banda de cada hallazgo (de la más alta a la más baja)
+_BANDA_SQL = "CASE {} ELSE '{}' END".format(
+    " ".join(f"WHEN COALESCE(riesgo, 0) >= {minimo} THEN '{banda}'" for banda, minimo in reversed(BANDAS_RIESGO[1:])),
+    BANDAS_RIESGO[0][0])
+
+def por_subdominio(conexion, escaneo_id):
+    """
+    Agregados por subdominio de un análisis, en el orden en que aparecen
+    sus hallazgos.
+
+    Returns:
+        dict: subdominio -> total_hallazgos, total_tecnologias, total_cves,
+              riesgo_max, riesgo_promedio y cvss_max
+    """
+    subdominios = {}
+    for subdominio, total, tecnologias, riesgo_max, riesgo_promedio, cvss_max in conexion.execute("""
+            SELECT s.subdominio, COUNT(h.id), COUNT(DISTINCT COALESCE(h.tecnologia, 'Desconocida')),
+                   MAX(COALESCE(h.riesgo, 0)), AVG(COALESCE(h.riesgo, 0)), MAX(COALESCE(h.cvss_max, 0))
+            FROM hosts s JOIN hallazgos h ON h.host_id = s.id
+            WHERE s.escaneo_id = ? GROUP BY s.id ORDER BY MIN(h.posicion)""", (escaneo_id,)):
+        subdominios[subdominio] = {"total_hallazgos": total, "total_tecnologias": tecnologias, "total_cves": 0,
+                                   "riesgo_max": riesgo_max, "riesgo_promedio": round(riesgo_promedio, 2),
+                                   "cvss_max": cvss_max}
+    for subdominio, total_cves in conexion.execute("""
+            SELECT s.subdominio, COUNT(DISTINCT c.cve_id) FROM cves c
+            JOIN hallazgos h ON h.id = c.hallazgo_id JOIN hosts s ON s.id = h.host_id
+            WHERE h.escaneo_id = ? GROUP BY s.id""", (escaneo_id,)):
+        subdominios[subdominio]["total_cves"] = total_cves
+    return subdominios
+
+def calcular_indicadores(conexion, escaneo_id):
+    """
+    Indicadores de un análisis del almacén de resultados.
+
+    Returns:
+        dict: totales, riesgo promedio y máximo, CVSS máximo, hallazgos por
+              criticidad y por banda de riesgo, tecnologías más riesgosas
+              y agregados por subdominio
+    """
+    total, riesgo_promedio, riesgo_max, cvss_max = conexion.execute("""
+        SELECT COUNT(*), COALESCE(AVG(COALESCE(riesgo, 0)), 0), COALESCE(MAX(riesgo), 0), COALESCE(MAX(cvss_max), 0)
+        FROM hallazgos WHERE escaneo_id = ?""", (escaneo_id,)).fetchone()
+    por_criticidad = dict(conexion.execute("""
+        SELECT COALESCE(criticidad, 'Bajo'), COUNT(*) FROM hallazgos
+        WHERE escaneo_id = ? GROUP BY 1 ORDER BY MIN(posicion)""", (escaneo_id,)).fetchall())
+    por_banda = {banda: 0 for banda, _ in BANDAS_RIESGO}
+    por_banda.update(conexion.execute(f"""
+        SELECT {_BANDA_SQL}, COUNT(*) FROM hallazgos WHERE escaneo_id = ? GROUP BY 1""", (escaneo_id,)).fetchall())
+    top_tecnologias = [list(fila) for fila in conexion.execute("""
+        SELECT COALESCE(tecnologia, 'Desconocida'), AVG(COALESCE(riesgo, 0)) FROM hallazgos
+        WHERE escaneo_id = ? GROUP BY 1 ORDER BY 2 DESC, MIN(posicion) LIMIT ?""", (escaneo_id, TOP_TECNOLOGIAS))]
+    vulnerables, = conexion.execute("""
+        SELECT COUNT(DISTINCT COALESCE(h.tecnologia, 'Desconocida')) FROM hallazgos h
+        WHERE h.escaneo_id = ? AND EXISTS (SELECT 1 FROM cves c WHERE c.hallazgo_id = h.id)""",
+        (escaneo_id,)).fetchone()
+    subdominios = por_subdominio(conexion, escaneo_id)
+    return {
+        "total_hallazgos": total,
+        "total_subdominios": len(subdominios),
+        "total_tecnologias": sum(s["total_tecnologias"] for s in subdominios.values()),
+        "total_cves": sum(s["total_cves"] for s in subdominios.values()),
+        "tecnologias_vulnerables": vulnerables,
+        "subdominios_alto_riesgo": sum(1 for s in subdominios.values() if s["riesgo_max"] >= UMBRAL_SUBDOMINIO_ALTO),
+        "riesgo_promedio": riesgo_promedio,
+        "riesgo_max": riesgo_max,
+        "cvss_max": cvss_max,
+        "por_criticidad": por_criticidad,
+        "por_banda": por_banda,
+        "top_tecnologias": top_tecnologias,
+        "por_subdominio": subdominios,
+    }
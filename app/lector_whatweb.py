@@ -0,0 +1,132 @@
+# app/lector_whatweb.py - Lectura incremental de la salida JSON de WhatWeb
+# =====================================
+# WhatWeb (--log-json) escribe un array con un objeto por línea:
+#   [
+#   {"target": ...},
+#   ,
+#   {"target": ...}
+#   ]
+# Este lector entrega un registro cada vez, sin cargar el archivo entero:
+# - Acepta el formato array, JSON por líneas y objetos en varias líneas
+# - Ignora los separadores '[', ',' y ']' sin tratarlos como errores
+# - Puede seguir un archivo que WhatWeb todavía está escribiendo
+# - Los fragmentos corruptos se informan como error y la lectura continúa
+# =====================================
+import json
+import time
+
+# Límite de un registro pendiente antes de darlo por corrupto
+MAX_LINEAS_REGISTRO = 2000
+MAX_BYTES_REGISTRO = 16 * 1024 * 1024
+
+_decodificador = json.JSONDecoder()
+
+def _sin_separadores(texto):
+    return texto.strip().lstrip("[,").strip()
+
+def _decodificar(texto):
+    """
+    Decodifica todos los objetos JSON de un fragmento.
+
+    Returns:
+        tuple: (objetos, resto) donde resto es el texto no decodificable
+    """
+    objetos = []
+    texto = _sin_separadores(texto)
+    while texto:
+        try:
+            objeto, fin = _decodificador.raw_decode(texto)
+        except json.JSONDecodeError:
+            return objetos, texto
+        objetos.append(objeto)
+        texto = texto[fin:].strip().lstrip(",]").strip().lstrip("[,").strip()
+    return objetos, ""
+
+def _lineas(archivo, seguir, intervalo):
+    """Líneas completas del archivo; con seguir espera a que se escriban más."""
+    parcial = ""
+    while True:
+        linea = archivo.readline()
+        if linea:
+            parcial += linea
+            if parcial.endswith("\n"):
+                yield parcial
+                parcial = ""
+            continue
+        if seguir is not None and seguir():
+            time.sleep(intervalo)
+            continue
+        # Sin escritor activo: releer una vez por si terminó justo ahora
+        linea = archivo.readline()
+        if linea:
+            parcial += linea
+            continue
+        if parcial:
+            yield parcial
+        return
+
+def leer_registros(ruta, seguir=None, intervalo=0.2):
+    """
+    Genera los registros de un archivo de WhatWeb a medida que se leen.
+
+    Args:
+        ruta: archivo JSON de WhatWeb
+        seguir: función que devuelve True mientras WhatWeb siga escribiendo
+                (None = leer hasta el final actual del archivo)
+        intervalo: segundos de espera entre lecturas en modo seguimiento
+
+    Yields:
+        tuple: (numero_linea, registro, error). registro es el objeto
+               decodificado o None; error es un mensaje o None.
+    """
+    pendiente = ""
+    inicio_pendiente = 0
+    lineas_pendientes = 0
+    numero_linea = 0
+
+    with open(ruta, "r", encoding="utf-8", errors="replace") as archivo:
+        for linea in _lineas(archivo, seguir, intervalo):
+            numero_linea += 1
+            if not _sin_separadores(linea).strip("]").strip():
+                if not pendiente:
+                    continue
+
+            if pendiente and _sin_separadores(linea).startswith("{"):
+                # Una línea que empieza un objeto nuevo: si el pendiente no
+                # se completa con ella, el pendiente estaba truncado
+                objetos, resto = _decodificar(pendiente + linea)
+                if resto:
+                    objetos_linea, resto_linea = _decodificar(linea)
+                    if objetos_linea or not resto_linea:
+                        yield inicio_pendiente, None, f"registro incompleto: {pendiente.strip()[:80]}"
+                        objetos, resto = objetos_linea, resto_linea
+                        inicio_pendiente = numero_linea
+                        lineas_pendientes = 0
+            else:
+                if not pendiente:
+                    inicio_pendiente = numero_linea
+                objetos, resto = _decodificar(pendiente + linea)
+
+            for objeto in objetos:
+                yield inicio_pendiente, objeto, None
+
+            if not resto:
+                pendiente, lineas_pendientes = "", 0
+                continue
+
+            if not resto.startswith("{"):
+                yield numero_linea, None, f"contenido no JSON: {resto[:80]}"
+                pendiente, lineas_pendientes = "", 0
+                continue
+
+            if objetos:
+                inicio_pendiente = numero_linea
+                lineas_pendientes = 0
+            pendiente = resto
+            lineas_pendientes += 1
+            if lineas_pendientes > MAX_LINEAS_REGISTRO or len(pendiente) > MAX_BYTES_REGISTRO:
+                yield inicio_pendiente, None, f"registro demasiado grande o corrupto: {pendiente[:80]}"
+                pendiente, lineas_pendientes = "", 0
+
+    if pendiente.strip():
+        yield inicio_pendiente, None, f"registro incompleto: {pendiente.strip()[:80]}"
@@ -4,12 +4,8 @@ from tkinter import ttk, messagebox
 import sys
 import os
 
-# Importaciones locales con rutas relativas del paquete app
-from app.activos import registrar_activo_gui
-from app.analyzer import lanzar_analyzer_gui
-from app.export_pdf import abrir_selector_exportacion_pdf
-from app.monitoreo import mostrar_menu_monitoreo
-from app.tratamiento import lanzar_tratamiento_gui
+# Los módulos de cada funcionalidad se importan al abrirla: así matplotlib,
+# numpy y reportlab no retrasan la ventana de bienvenida
 
 # Variables globales
 root = None
@@ -31,30 +27,35 @@ def ejecutar_analisis():
     """Lanza el módulo de análisis"""
     print("🔍 Iniciando módulo de Análisis de Seguridad...")
     print("📋 Abriendo interfaz de configuración de análisis")
+    from app.analyzer import lanzar_analyzer_gui
     lanzar_analyzer_gui()
 
 def gestionar_activos():
     """Lanza el módulo de gestión de activos"""
     print("🎯 Iniciando módulo de Gestión de Activos")
     print("📝 Abriendo formulario de registro de activos")
+    from app.activos import registrar_activo_gui
     registrar_activo_gui()
 
 def mostrar_monitoreo():
     """Lanza el módulo de monitoreo"""
     print("📊 Iniciando módulo de Monitoreo")
     print("📈 Cargando dashboard de análisis")
+    from app.monitoreo import mostrar_menu_monitoreo
     mostrar_menu_monitoreo()
 
 def ejecutar_tratamiento():
     """Lanza el módulo de tratamiento de riesgos"""
     print("🛡️ Iniciando módulo de Tratamiento de Riesgos")
     print("📄 Preparando análisis textual de vulnerabilidades")
+    from app.tratamiento import lanzar_tratamiento_gui
     lanzar_tratamiento_gui()
 
 def exportar_pdf_integrado():
     """Exporta los resultados del análisis a PDF con selector de dominio"""
     print("📄 Iniciando módulo de Exportación PDF")
     print("📋 Abriendo selector de dominios disponibles")
+    from app.export_pdf import abrir_selector_exportacion_pdf
     abrir_selector_exportacion_pdf(root)
 
 def mostrar_info_modulos():
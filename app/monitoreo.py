@@ -33,6 +33,34 @@ except ImportError:
         """Función de respaldo si no se puede importar el módulo"""
         return []
 
+# Almacén de resultados (SQLite, consultas de solo lectura)
+try:
+    from .almacen_resultados import consultar_dominio
+except ImportError:
+    def consultar_dominio(dominio, metodo, resultados_dir=None, **kwargs):
+        """Función de respaldo si no se puede importar el módulo"""
+        return None
+
+# Catálogo global de resultados (listado de dominios sin recorrer carpetas)
+try:
+    from .catalogo_resultados import listar_catalogo
+except ImportError:
+    def listar_catalogo(resultados_dir=None, artefacto="riesgo.json"):
+        """Función de respaldo si no se puede importar el módulo"""
+        return None
+
+# Escala de riesgo de las distribuciones reales (NumPy) para los gráficos
+try:
+    from .distribuciones import RIESGO_MAXIMO
+except ImportError:
+    RIESGO_MAXIMO = 125
+
+# Umbral de subdominio de alto riesgo (mismas bandas que tratamiento y PDF)
+try:
+    from .indicadores import UMBRAL_SUBDOMINIO_ALTO
+except ImportError:
+    UMBRAL_SUBDOMINIO_ALTO = 25
+
 def leer_json_seguro(archivo_path):
     """Lee un archivo JSON de forma segura, manejando errores de formato"""
     try:
@@ -98,6 +126,13 @@ def listar_dominios():
             print(f"Directorio de resultados no encontrado: {resultados_dir}")
             return []
         
+        catalogo = listar_catalogo(str(resultados_dir), "resumen.json")
+        if catalogo is not None:
+            dominios = [entrada["dominio"] for entrada in catalogo]
+            for dominio in dominios:
+                print(f"Dominio encontrado: {dominio}")
+            return dominios
+        
         dominios = []
         for item in resultados_dir.iterdir():
             if item.is_dir() and (item / "resumen.json").exists():
@@ -109,8 +144,8 @@ def listar_dominios():
         print(f"Error listando dominios: {e}")
         return []
 
-def calcular_kpis(dominio):
-    """Calcula indicadores clave de rendimiento para un dominio"""
+def calcular_kpis(dominio, indicadores=None):
+    """Calcula indicadores clave de rendimiento para un dominio (indicadores: los ya consultados)"""
     try:
         # Buscar en el directorio resultados del nivel padre
         resultados_dir = current_dir.parent / "resultados" / dominio
@@ -129,69 +164,19 @@ def calcular_kpis(dominio):
             'cvss_max': 0.0
         }
         
-        # Leer resumen si existe
-        resumen_file = resultados_dir / "resumen.json"
-        if resumen_file.exists():
-            resumen = leer_json_seguro(resumen_file)
-            if not resumen:
-                print(f"No se pudo leer el archivo de resumen para {dominio}")
-                return None
-            
-            kpis['total_subdominios'] = len(resumen)
-            
-            riesgos = []
-            for subdominio, info in resumen.items():
-                kpis['total_tecnologias'] += info.get('total_tecnologias', 0)
-                kpis['total_cves'] += info.get('total_cves', 0)
-                
-                riesgo_max = info.get('riesgo_max', 0)
-                if riesgo_max >= 8.0:
-                    kpis['subdominios_alto_riesgo'] += 1
-                
-                riesgos.append(info.get('riesgo_promedio', 0))
-            
-            if riesgos:
-                kpis['riesgo_promedio'] = sum(riesgos) / len(riesgos)
-        
-        # Leer archivo de riesgos detallado para extraer CVSS máximo
-        riesgo_file = resultados_dir / "riesgo.json"
-        if riesgo_file.exists():
-            riesgo_data = leer_json_seguro(riesgo_file)
-            if riesgo_data and isinstance(riesgo_data, list):
-                cvss_scores = []
-                for item in riesgo_data:
-                    if isinstance(item, dict):
-                        cvss_max_item = item.get('cvss_max', 0)
-                        if cvss_max_item and cvss_max_item > 0:
-                            cvss_scores.append(cvss_max_item)
-                
-                if cvss_scores:
-                    kpis['cvss_max'] = max(cvss_scores)
-                    print(f"🔍 CVSS máximo extraído para {dominio}: {kpis['cvss_max']}")
-                else:
-                    print(f"⚠️ No se encontraron valores CVSS válidos en {dominio}")
-            else:
-                print(f"❌ No se pudo leer el archivo riesgo.json para {dominio}")
-        else:
+        # Indicadores comunes con tratamiento y PDF (instantánea del almacén)
+        if indicadores is None:
+            indicadores = consultar_dominio(dominio, "indicadores", str(resultados_dir.parent))
+        if indicadores is None:
             print(f"📄 Archivo riesgo.json no encontrado para {dominio}")
+            return kpis
         
-        # Leer tecnologías si existe
-        tecnologias_file = resultados_dir / "tecnologias.json"
-        if tecnologias_file.exists():
-            tecnologias = leer_json_seguro(tecnologias_file)
-            
-            # Verificar que tecnologias sea un diccionario
-            if isinstance(tecnologias, dict):
-                for tech_data in tecnologias.values():
-                    if isinstance(tech_data, dict) and tech_data.get('cves'):
-                        kpis['tecnologias_vulnerables'] += 1
-            elif isinstance(tecnologias, list):
-                # Si es una lista, iterar sobre los elementos
-                for tech_data in tecnologias:
-                    if isinstance(tech_data, dict) and tech_data.get('cves'):
-                        kpis['tecnologias_vulnerables'] += 1
-            else:
-                print(f"Formato inesperado en tecnologias.json para {dominio}: {type(tecnologias)}")
+        for clave in kpis:
+            kpis[clave] = indicadores[clave]
+        if kpis['cvss_max'] > 0:
+            print(f"🔍 CVSS máximo extraído para {dominio}: {kpis['cvss_max']}")
+        else:
+            print(f"⚠️ No se encontraron valores CVSS válidos en {dominio}")
         
         return kpis
         
@@ -213,7 +198,7 @@ def mostrar_kpis_en_gui(kpis, texto_widget):
     texto_widget.insert(tk.END, f"🚨 Total de CVEs encontrados: {kpis['total_cves']}\n")
     texto_widget.insert(tk.END, f"📈 Riesgo promedio general: {kpis['riesgo_promedio']:.2f}/10\n")
     texto_widget.insert(tk.END, f"⚡ CVSS máximo detectado: {kpis.get('cvss_max', 0):.1f}/10\n")
-    texto_widget.insert(tk.END, f"⚠️ Subdominios de alto riesgo (≥8.0): {kpis['subdominios_alto_riesgo']}\n")
+    texto_widget.insert(tk.END, f"⚠️ Subdominios de alto riesgo (≥{UMBRAL_SUBDOMINIO_ALTO}): {kpis['subdominios_alto_riesgo']}\n")
     texto_widget.insert(tk.END, f"🔓 Tecnologías con vulnerabilidades: {kpis['tecnologias_vulnerables']}\n\n")
     
     # Evaluación del nivel de riesgo
@@ -256,42 +241,25 @@ def mostrar_kpis_en_gui(kpis, texto_widget):
     texto_widget.insert(tk.END, f"⚡ NIVEL CVSS MÁXIMO: {criticidad_cvss} ({cvss_max:.1f}/10)\n")
     texto_widget.insert(tk.END, f"🚨 ALERTA: {alerta_cvss}\n\n")
 
-def mostrar_resumen(dominio, texto_widget):
-    """Muestra un resumen detallado del análisis"""
+def mostrar_resumen(dominio, texto_widget, indicadores=None):
+    """Muestra un resumen detallado del análisis (indicadores: los ya consultados)"""
     try:
         # Buscar en el directorio resultados del nivel padre
         resultados_dir = current_dir.parent / "resultados" / dominio
-        resumen_file = resultados_dir / "resumen.json"
-        riesgo_file = resultados_dir / "riesgo.json"
-        
-        # Crear diccionario de CVSS por subdominio
-        cvss_por_subdominio = {}
-        if riesgo_file.exists():
-            riesgo_data = leer_json_seguro(riesgo_file)
-            if riesgo_data and isinstance(riesgo_data, list):
-                for item in riesgo_data:
-                    if isinstance(item, dict):
-                        subdominio = item.get('subdominio', '')
-                        cvss_max = item.get('cvss_max', 0)
-                        if subdominio:
-                            if subdominio not in cvss_por_subdominio:
-                                cvss_por_subdominio[subdominio] = []
-                            cvss_por_subdominio[subdominio].append(cvss_max)
-                
-                # Calcular CVSS máximo por subdominio
-                for sub in cvss_por_subdominio:
-                    cvss_por_subdominio[sub] = max(cvss_por_subdominio[sub]) if cvss_por_subdominio[sub] else 0
         
-        if resumen_file.exists():
-            resumen = leer_json_seguro(resumen_file)
-            
+        # Agregados por subdominio de los indicadores comunes (almacén de resultados)
+        if indicadores is None:
+            indicadores = consultar_dominio(dominio, "indicadores", str(resultados_dir.parent))
+        resumen = indicadores['por_subdominio'] if indicadores is not None else None
+        
+        if resumen is not None:
             if resumen:
                 texto_widget.insert(tk.END, "📋 RESUMEN DETALLADO POR SUBDOMINIO\n")
                 texto_widget.insert(tk.END, "=" * 60 + "\n\n")
                 
                 # Mostrar solo los primeros 5 subdominios para no saturar
                 for i, (subdominio, info) in enumerate(list(resumen.items())[:5], 1):
-                    cvss_max_sub = cvss_por_subdominio.get(subdominio, 0)
+                    cvss_max_sub = info.get('cvss_max', 0)
                     
                     texto_widget.insert(tk.END, f"{i}. 🔹 {subdominio}\n")
                     texto_widget.insert(tk.END, f"   • Tecnologías: {info.get('total_tecnologias', 0)}\n")
@@ -352,53 +320,45 @@ def mostrar_activos(texto_widget):
     except Exception as e:
         texto_widget.insert(tk.END, f"❌ Error cargando activos: {str(e)}\n")
 
-def crear_grafico_kpis(kpis_data, frame_parent):
-    """Crea un gráfico de KPIs usando matplotlib con visualización completa e interactiva"""
+def crear_grafico_kpis(kpis_data, frame_parent, distribuciones=None):
+    """
+    Crea un gráfico de KPIs usando matplotlib con visualización completa e interactiva.
+    distribuciones: distribuciones del almacén de resultados para el dominio (niveles
+    de riesgo, histograma, severidad CVSS y riesgo por subdominio reales).
+    """
     try:
         # Limpiar cualquier gráfico anterior
         for widget in frame_parent.winfo_children():
             widget.destroy()
         
         # Usar un tamaño más manejable pero que se vea completo
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 10))
+        fig, ((ax1, ax2, ax3), (ax4, ax5, ax6)) = plt.subplots(2, 3, figsize=(18, 10))
         fig.patch.set_facecolor('#f8f9fa')
         
         # Ajustar márgenes para que se vea todo el contenido
-        plt.subplots_adjust(left=0.08, bottom=0.08, right=0.95, top=0.92, 
-                           hspace=0.35, wspace=0.25)
-        
-        # Gráfico 1: Distribución de riesgos
-        riesgos = ['Bajo (0-4)', 'Medio (4-6)', 'Alto (6-8)', 'Crítico (8-10)']
-        valores_riesgo = [0, 0, 0, 0]
-        
-        # Simular distribución basada en el riesgo promedio
-        riesgo_prom = kpis_data.get('riesgo_promedio', 0)
-        if riesgo_prom < 4:
-            valores_riesgo[0] = 70
-            valores_riesgo[1] = 20
-            valores_riesgo[2] = 8
-            valores_riesgo[3] = 2
-        elif riesgo_prom < 6:
-            valores_riesgo[0] = 40
-            valores_riesgo[1] = 35
-            valores_riesgo[2] = 20
-            valores_riesgo[3] = 5
-        elif riesgo_prom < 8:
-            valores_riesgo[0] = 20
-            valores_riesgo[1] = 30
-            valores_riesgo[2] = 35
-            valores_riesgo[3] = 15
+        plt.subplots_adjust(left=0.06, bottom=0.08, right=0.97, top=0.92, 
+                           hspace=0.4, wspace=0.35)
+        
+        # Distribuciones reales de los hallazgos del análisis (app/distribuciones.py)
+        distribuciones = distribuciones or {}
+        
+        def sin_datos(ax, titulo):
+            ax.text(0.5, 0.5, 'Sin hallazgos', ha='center', va='center', fontsize=11, color='#7f8c8d')
+            ax.set_axis_off()
+            ax.set_title(titulo, fontweight='bold', fontsize=12)
+        
+        # Gráfico 1: Distribución de niveles de riesgo
+        niveles = distribuciones.get('niveles_riesgo', {})
+        etiquetas = {'Bajo': 'Bajo (<25)', 'Medio': 'Medio (25-49)', 'Alto': 'Alto (50-79)', 'Crítico': 'Crítico (≥80)'}
+        colores_nivel = {'Bajo': '#2ecc71', 'Medio': '#f39c12', 'Alto': '#e67e22', 'Crítico': '#e74c3c'}
+        presentes = [nivel for nivel in etiquetas if niveles.get(nivel, 0) > 0]
+        if presentes:
+            ax1.pie([niveles[n] for n in presentes], labels=[etiquetas[n] for n in presentes],
+                    colors=[colores_nivel[n] for n in presentes],
+                    autopct='%1.1f%%', startangle=90, textprops={'fontsize': 10})
+            ax1.set_title('Distribución de Niveles de Riesgo', fontweight='bold', fontsize=12)
         else:
-            valores_riesgo[0] = 10
-            valores_riesgo[1] = 20
-            valores_riesgo[2] = 30
-            valores_riesgo[3] = 40
-        
-        colors = ['#2ecc71', '#f39c12', '#e67e22', '#e74c3c']
-        wedges, texts, autotexts = ax1.pie(valores_riesgo, labels=riesgos, colors=colors, 
-                                          autopct='%1.1f%%', startangle=90,
-                                          textprops={'fontsize': 10})
-        ax1.set_title('Distribución de Niveles de Riesgo', fontweight='bold', fontsize=12)
+            sin_datos(ax1, 'Distribución de Niveles de Riesgo')
         
         # Gráfico 2: Métricas principales
         metricas = ['Subdominios', 'Tecnologías', 'CVEs', 'Vulnerabilidades']
@@ -420,16 +380,17 @@ def crear_grafico_kpis(kpis_data, frame_parent):
             ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(valores_metricas)*0.02,
                     str(valor), ha='center', va='bottom', fontweight='bold', fontsize=9)
         
-        # Gráfico 3: Indicadores de riesgo y CVSS
+        # Gráfico 3: Indicadores de riesgo y CVSS (riesgo en la escala 0-125)
         riesgo = kpis_data.get('riesgo_promedio', 0)
         cvss_max = kpis_data.get('cvss_max', 0)
+        escala = RIESGO_MAXIMO
         
         # Subgráfico para riesgo promedio
-        colors_gauge = ['#2ecc71' if riesgo < 4 else '#f39c12' if riesgo < 6 else '#e67e22' if riesgo < 8 else '#e74c3c']
+        colors_gauge = ['#2ecc71' if riesgo < 25 else '#f39c12' if riesgo < 50 else '#e67e22' if riesgo < 80 else '#e74c3c']
         
-        wedges = ax3.pie([riesgo, 10-riesgo], colors=[colors_gauge[0], '#ecf0f1'], 
-                        startangle=90, counterclock=False, 
-                        wedgeprops=dict(width=0.3))
+        ax3.pie([min(riesgo, escala), escala - min(riesgo, escala)], colors=[colors_gauge[0], '#ecf0f1'], 
+                startangle=90, counterclock=False, 
+                wedgeprops=dict(width=0.3))
         
         # Texto del riesgo promedio
         ax3.text(0, 0.3, f'{riesgo:.1f}', ha='center', va='center', 
@@ -444,24 +405,50 @@ def crear_grafico_kpis(kpis_data, frame_parent):
         
         ax3.set_title('Indicadores de Seguridad', fontweight='bold', fontsize=12)
         
-        # Gráfico 4: Comparativa de seguridad
-        categorias = ['Tecnologías\nSeguras', 'Tecnologías\nVulnerables']
-        seguras = max(0, kpis_data.get('total_tecnologias', 0) - kpis_data.get('tecnologias_vulnerables', 0))
-        vulnerables = kpis_data.get('tecnologias_vulnerables', 0)
-        
-        valores_comp = [seguras, vulnerables]
-        colors_comp = ['#2ecc71', '#e74c3c']
-        
-        bars2 = ax4.bar(categorias, valores_comp, color=colors_comp)
-        ax4.set_title('Estado de Tecnologías', fontweight='bold', fontsize=12)
-        ax4.set_ylabel('Cantidad', fontsize=10)
-        ax4.tick_params(axis='x', labelsize=9)
-        ax4.tick_params(axis='y', labelsize=9)
-        
-        # Añadir valores en las barras
-        for bar, valor in zip(bars2, valores_comp):
-            ax4.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(valores_comp)*0.02,
-                    str(valor), ha='center', va='bottom', fontweight='bold', fontsize=9)
+        # Gráfico 4: Histograma del riesgo de los hallazgos
+        histograma = distribuciones.get('histograma_riesgo')
+        if distribuciones.get('total'):
+            bordes = histograma['bordes']
+            ax4.bar(bordes[:-1], histograma['conteos'], width=np.diff(bordes), align='edge',
+                    color='#3498db', edgecolor='white')
+            ax4.set_xlim(bordes[0], bordes[-1])
+            ax4.set_xlabel('Riesgo', fontsize=10)
+            ax4.set_ylabel('Hallazgos', fontsize=10)
+            ax4.tick_params(labelsize=9)
+            ax4.set_title('Histograma de Riesgo', fontweight='bold', fontsize=12)
+        else:
+            sin_datos(ax4, 'Histograma de Riesgo')
+        
+        # Gráfico 5: Hallazgos por severidad CVSS
+        severidades = distribuciones.get('niveles_cvss', {})
+        if distribuciones.get('total'):
+            colores_cvss = ['#95a5a6', '#2ecc71', '#f39c12', '#e67e22', '#e74c3c']
+            bars5 = ax5.bar(list(severidades), list(severidades.values()), color=colores_cvss)
+            for bar, valor in zip(bars5, severidades.values()):
+                ax5.text(bar.get_x() + bar.get_width()/2, bar.get_height(),
+                        str(valor), ha='center', va='bottom', fontweight='bold', fontsize=9)
+            ax5.set_ylabel('Hallazgos', fontsize=10)
+            ax5.tick_params(labelsize=9)
+            ax5.set_title('Distribución CVSS', fontweight='bold', fontsize=12)
+        else:
+            sin_datos(ax5, 'Distribución CVSS')
+        
+        # Gráfico 6: Riesgo por subdominio (los de mayor riesgo máximo)
+        por_subdominio = distribuciones.get('riesgo_por_subdominio', [])
+        if por_subdominio:
+            nombres = [s['subdominio'].split('://')[-1][:30] for s in por_subdominio][::-1]
+            maximos = [s['riesgo_max'] for s in por_subdominio][::-1]
+            promedios = [s['riesgo_promedio'] for s in por_subdominio][::-1]
+            posiciones = np.arange(len(nombres))
+            ax6.barh(posiciones, maximos, color='#e67e22', label='Máximo')
+            ax6.barh(posiciones, promedios, height=0.4, color='#2c3e50', label='Promedio')
+            ax6.set_yticks(posiciones)
+            ax6.set_yticklabels(nombres, fontsize=8)
+            ax6.set_xlabel('Riesgo', fontsize=10)
+            ax6.legend(fontsize=8, loc='lower right')
+            ax6.set_title('Riesgo por Subdominio', fontweight='bold', fontsize=12)
+        else:
+            sin_datos(ax6, 'Riesgo por Subdominio')
         
         # No usar tight_layout para evitar recortes
         # plt.tight_layout()
@@ -718,15 +705,19 @@ Este módulo le permite:
                 texto.insert(tk.END, f"🔍 Analizando dominio: {dominio}\n")
                 texto.insert(tk.END, "=" * 60 + "\n\n")
                 
-                kpis = calcular_kpis(dominio)
+                # Una sola consulta de indicadores para KPIs y resumen
+                indicadores = consultar_dominio(dominio, "indicadores", str(current_dir.parent / "resultados"))
+                kpis = calcular_kpis(dominio, indicadores)
                 if kpis:
                     mostrar_kpis_en_gui(kpis, texto)
-                    mostrar_resumen(dominio, texto)
+                    mostrar_resumen(dominio, texto, indicadores)
                     texto.insert(tk.END, "\n✅ Análisis completado exitosamente\n")
                     texto.insert(tk.END, f"📅 Generado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                     
                     # Crear gráficos
-                    crear_grafico_kpis(kpis, tab_graficos)
+                    crear_grafico_kpis(kpis, tab_graficos,
+                                       consultar_dominio(dominio, "distribuciones",
+                                                         str(current_dir.parent / "resultados")))
                 else:
                     texto.insert(tk.END, "❌ No se encontraron datos de análisis para este dominio\n")
                     texto.insert(tk.END, "💡 Ejecute primero un análisis de seguridad\n")
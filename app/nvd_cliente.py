@@ -0,0 +1,166 @@
+# app/nvd_cliente.py - Cliente HTTP para la API de NIST NVD
+# =====================================
+# - Sesión requests compartida con pool de conexiones (reutiliza TLS)
+# - Ventana deslizante con los límites publicados por NVD (como mucho N
+#   peticiones en cualquier intervalo de 30 s): 5 sin API key, 50 con API
+#   key (variable NVD_API_KEY)
+# - Reintentos ante 403/429/503 respetando Retry-After
+# - Consultas paginadas (startIndex/totalResults) para búsquedas por CPE
+# =====================================
+import os
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+NVD_API_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0"
+
+# Límites de la NVD por ventana de 30 segundos
+LIMITE_SIN_API_KEY = 5
+LIMITE_CON_API_KEY = 50
+VENTANA_LIMITE = 30.0
+
+# Peticiones simultáneas a la NVD
+CONCURRENCIA_NVD = 4
+TIMEOUT_NVD = 15
+MAX_REINTENTOS = 3
+# Espera base entre reintentos cuando el servidor no envía Retry-After
+ESPERA_REINTENTO = 6.0
+
+CODIGOS_LIMITE = (403, 429, 503)
+
+class LimiteVentana:
+    """
+    Limitador de tasa por ventana deslizante: como mucho `limite` peticiones
+    en cualquier intervalo de `periodo` segundos (la regla de la NVD).
+
+    marcas y lock permiten compartir la ventana entre procesos (una lista y
+    un Lock de multiprocessing.Manager); por defecto es local al proceso.
+    """
+
+    def __init__(self, limite, periodo, marcas=None, lock=None):
+        self.limite = limite
+        self.periodo = periodo
+        self.marcas = marcas if marcas is not None else []
+        self._lock = lock or threading.Lock()
+
+    def adquirir(self):
+        """Bloquea hasta que la petición quepa en la ventana y la registra."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                while len(self.marcas) and self.marcas[0] <= ahora - self.periodo:
+                    self.marcas.pop(0)
+                if len(self.marcas) < self.limite:
+                    self.marcas.append(ahora)
+                    return
+                espera = self.marcas[0] + self.periodo - ahora
+            time.sleep(espera)
+
+    def vaciar(self, espera=None):
+        """
+        Da la ventana por llena durante `espera` segundos desde ahora (por
+        defecto un periodo), tras un aviso de límite del servidor.
+        """
+        espera = self.periodo if espera is None else espera
+        with self._lock:
+            libre = time.monotonic() + espera - self.periodo
+            self.marcas[:] = [libre] * self.limite
+
+class ClienteNVD:
+    """Cliente de la API CVE 2.0 de la NVD con pool de conexiones y límite de tasa."""
+
+    def __init__(self, base_url=NVD_API_URL, api_key=None, limite=None, periodo=VENTANA_LIMITE,
+                 timeout=TIMEOUT_NVD, max_reintentos=MAX_REINTENTOS, espera_reintento=ESPERA_REINTENTO,
+                 concurrencia=CONCURRENCIA_NVD):
+        self.base_url = base_url
+        self.api_key = api_key if api_key is not None else os.environ.get("NVD_API_KEY")
+        if limite is None:
+            limite = LIMITE_CON_API_KEY if self.api_key else LIMITE_SIN_API_KEY
+        self.ventana = LimiteVentana(limite, periodo)
+        self.timeout = timeout
+        self.max_reintentos = max_reintentos
+        self.espera_reintento = espera_reintento
+        self.concurrencia = concurrencia
+
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrencia, 1))
+        self.sesion.mount("https://", adaptador)
+        self.sesion.mount("http://", adaptador)
+        if self.api_key:
+            self.sesion.headers["apiKey"] = self.api_key
+
+    def compartir_limite(self, marcas, lock):
+        """Pasa a usar una ventana compartida con otros procesos (ver LimiteVentana)."""
+        self.ventana = LimiteVentana(self.ventana.limite, self.ventana.periodo, marcas, lock)
+
+    def consultar(self, parametros):
+        """
+        Realiza una consulta respetando el límite de tasa.
+
+        Returns:
+            tuple: (ok, vulnerabilidades). ok es False si la consulta falló
+                   tras agotar los reintentos.
+        """
+        ok, cuerpo = self._pedir(parametros)
+        return ok, cuerpo.get("vulnerabilities", [])
+
+    def consultar_todo(self, parametros):
+        """
+        Consulta paginada: pide páginas de resultsPerPage resultados
+        (startIndex) hasta reunir los totalResults de la NVD.
+
+        Returns:
+            tuple: (ok, vulnerabilidades de todas las páginas). ok es False
+                   si falló alguna página.
+        """
+        vulnerabilidades = []
+        while True:
+            ok, cuerpo = self._pedir(dict(parametros, startIndex=len(vulnerabilidades)))
+            if not ok:
+                return False, []
+            pagina = cuerpo.get("vulnerabilities", [])
+            vulnerabilidades.extend(pagina)
+            if not pagina or len(vulnerabilidades) >= cuerpo.get("totalResults", 0):
+                return True, vulnerabilidades
+
+    def _pedir(self, parametros):
+        """Una petición con reintentos: (ok, cuerpo JSON de la respuesta)."""
+        for intento in range(self.max_reintentos + 1):
+            self.ventana.adquirir()
+            try:
+                response = self.sesion.get(self.base_url, params=parametros, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"❌ Error consultando NVD: {str(e)[:100]}")
+                return False, {}
+
+            if response.status_code == 200:
+                try:
+                    cuerpo = response.json()
+                except ValueError:
+                    return False, {}
+                return isinstance(cuerpo, dict), cuerpo if isinstance(cuerpo, dict) else {}
+
+            if response.status_code in CODIGOS_LIMITE and intento < self.max_reintentos:
+                # La espera se cumple en ventana.adquirir (para todos los hilos)
+                espera = self._espera(response, intento)
+                self.ventana.vaciar(espera)
+                print(f"⏳ NVD respondió {response.status_code}, reintentando en {espera:.1f}s")
+                continue
+
+            print(f"❌ NVD respondió {response.status_code}")
+            return False, {}
+        return False, {}
+
+    def _espera(self, response, intento):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return self.espera_reintento * (2 ** intento)
+
+    def cerrar(self):
+        self.sesion.close()
@@ -0,0 +1,234 @@
+# app/nvd_offline.py - Espejo local de la base NIST NVD
+# =====================================
+# Permite buscar CVEs sin conexión (equipos de escaneo aislados):
+# - Importa feeds NVD JSON 2.0 (.json o .json.gz) desde disco
+# - Guarda cada CVE en SQLite con un índice invertido de palabras de la
+#   descripción (equivalente a keywordSearch de la API)
+# - Guarda las coincidencias CPE de las configuraciones para búsquedas
+#   por producto y rango de versiones
+#
+# Uso:
+#   python3 -m app.nvd_offline nvdcve-2.0-2023.json.gz nvdcve-2.0-2024.json.gz
+# =====================================
+import os
+import re
+import sys
+import gzip
+import json
+import sqlite3
+import argparse
+import threading
+
+from .cpe import version_en_rango
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
+NVD_OFFLINE_DB = os.path.join(RESULTADOS_DIR, "nvd_offline.sqlite")
+
+_PATRON_TOKEN = re.compile(r"[a-z0-9][a-z0-9._+-]*[a-z0-9]|[a-z0-9]")
+
+def tokenizar(texto):
+    """Divide un texto en palabras en minúsculas para el índice invertido."""
+    return set(_PATRON_TOKEN.findall((texto or "").lower()))
+
+def descripcion_en(cve):
+    """Devuelve la descripción en inglés de un registro CVE de NVD 2.0."""
+    for descripcion in cve.get("descriptions", []):
+        if descripcion.get("lang") == "en":
+            return descripcion.get("value", "")
+    return ""
+
+def coincidencias_cpe(cve):
+    """Recorre las configuraciones de un CVE y devuelve sus cpeMatch."""
+    for configuracion in cve.get("configurations", []):
+        for nodo in configuracion.get("nodes", []):
+            for match in nodo.get("cpeMatch", []):
+                yield match
+
+def partes_cpe(criteria):
+    """Separa un nombre CPE 2.3 en (vendor, producto, versión)."""
+    campos = criteria.split(":")
+    if len(campos) < 6:
+        return "", "", ""
+    return campos[3], campos[4], campos[5]
+
+class EspejoNVD:
+    """Base local de CVEs indexada por palabras clave y por CPE."""
+
+    def __init__(self, ruta=NVD_OFFLINE_DB):
+        self.ruta = ruta
+        self._local = threading.local()
+
+    def disponible(self):
+        return os.path.exists(self.ruta)
+
+    def _conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            conexion = sqlite3.connect(self.ruta, timeout=30)
+            conexion.execute("PRAGMA busy_timeout = 30000")
+            self._local.conexion = conexion
+        return conexion
+
+    def crear_esquema(self):
+        conexion = self._conexion()
+        conexion.execute("PRAGMA journal_mode = WAL")
+        conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS cves (
+                id TEXT PRIMARY KEY,
+                publicado TEXT,
+                datos TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tokens (
+                token TEXT NOT NULL,
+                cve_id TEXT NOT NULL,
+                PRIMARY KEY (token, cve_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS cpes (
+                cve_id TEXT NOT NULL,
+                criteria TEXT NOT NULL,
+                vendor TEXT,
+                producto TEXT,
+                version TEXT,
+                version_inicio_incl TEXT,
+                version_inicio_excl TEXT,
+                version_fin_incl TEXT,
+                version_fin_excl TEXT,
+                vulnerable INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_cpes_producto ON cpes(producto, vendor);
+            CREATE INDEX IF NOT EXISTS idx_cpes_cve ON cpes(cve_id);
+        """)
+        conexion.commit()
+
+    def importar_feed(self, ruta_feed):
+        """
+        Importa un feed NVD JSON 2.0 (respuesta de la API o feed anual).
+
+        Returns:
+            int: número de CVEs importados o actualizados
+        """
+        abrir = gzip.open if ruta_feed.endswith(".gz") else open
+        with abrir(ruta_feed, "rt", encoding="utf-8") as f:
+            feed = json.load(f)
+
+        self.crear_esquema()
+        conexion = self._conexion()
+        total = 0
+        with conexion:
+            for vulnerabilidad in feed.get("vulnerabilities", []):
+                cve = vulnerabilidad.get("cve", {})
+                cve_id = cve.get("id")
+                if not cve_id:
+                    continue
+                conexion.execute("DELETE FROM tokens WHERE cve_id = ?", (cve_id,))
+                conexion.execute("DELETE FROM cpes WHERE cve_id = ?", (cve_id,))
+                conexion.execute(
+                    "INSERT OR REPLACE INTO cves (id, publicado, datos) VALUES (?, ?, ?)",
+                    (cve_id, cve.get("published", ""), json.dumps(cve, ensure_ascii=False)))
+                conexion.executemany(
+                    "INSERT OR IGNORE INTO tokens (token, cve_id) VALUES (?, ?)",
+                    [(token, cve_id) for token in tokenizar(descripcion_en(cve))])
+                filas_cpe = []
+                for match in coincidencias_cpe(cve):
+                    criteria = match.get("criteria", "")
+                    vendor, producto, version = partes_cpe(criteria)
+                    filas_cpe.append((
+                        cve_id, criteria, vendor, producto, version,
+                        match.get("versionStartIncluding"), match.get("versionStartExcluding"),
+                        match.get("versionEndIncluding"), match.get("versionEndExcluding"),
+                        int(bool(match.get("vulnerable", True)))))
+                conexion.executemany(
+                    "INSERT INTO cpes (cve_id, criteria, vendor, producto, version, version_inicio_incl, "
+                    "version_inicio_excl, version_fin_incl, version_fin_excl, vulnerable) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", filas_cpe)
+                total += 1
+        return total
+
+    def buscar_keyword(self, keyword, limite=3):
+        """
+        Equivalente local de keywordSearch: CVEs cuya descripción contiene
+        todas las palabras de keyword, en orden de publicación.
+
+        Returns:
+            list: elementos con el formato de "vulnerabilities" de la API
+        """
+        tokens = sorted(tokenizar(keyword))
+        if not tokens or not self.disponible():
+            return []
+        consulta = " INTERSECT ".join(["SELECT cve_id FROM tokens WHERE token = ?"] * len(tokens))
+        try:
+            filas = self._conexion().execute(
+                f"SELECT datos FROM cves WHERE id IN ({consulta}) ORDER BY publicado, id LIMIT ?",
+                (*tokens, limite)).fetchall()
+        except sqlite3.Error:
+            # Espejo sin importar (sin esquema) o dañado
+            return []
+        return [{"cve": json.loads(datos)} for (datos,) in filas]
+
+    def productos_cpe(self):
+        """Pares (vendor, producto) distintos presentes en las configuraciones."""
+        if not self.disponible():
+            return []
+        try:
+            return self._conexion().execute(
+                "SELECT DISTINCT vendor, producto FROM cpes WHERE producto != ''").fetchall()
+        except sqlite3.Error:
+            return []
+
+    def buscar_cpe(self, vendor, producto, version=None):
+        """
+        CVEs que afectan a vendor:producto en la versión indicada, evaluando
+        los rangos versionStart/End de cada cpeMatch vulnerable.
+
+        Returns:
+            list: elementos con el formato de "vulnerabilities" de la API
+        """
+        if not self.disponible():
+            return []
+        conexion = self._conexion()
+        try:
+            filas = conexion.execute(
+                "SELECT cve_id, version, version_inicio_incl, version_inicio_excl, "
+                "version_fin_incl, version_fin_excl FROM cpes "
+                "WHERE producto = ? AND vendor = ? AND vulnerable = 1", (producto, vendor)).fetchall()
+            ids = list(dict.fromkeys(
+                cve_id for cve_id, *rango in filas if version_en_rango(version, *rango)))
+            resultado = []
+            for inicio in range(0, len(ids), 500):
+                bloque = ids[inicio:inicio + 500]
+                marcas = ",".join("?" * len(bloque))
+                resultado.extend(
+                    {"cve": json.loads(datos)} for (datos,) in conexion.execute(
+                        f"SELECT datos FROM cves WHERE id IN ({marcas}) ORDER BY publicado, id", bloque))
+        except sqlite3.Error:
+            return []
+        return resultado
+
+    def total_cves(self):
+        if not self.disponible():
+            return 0
+        try:
+            return self._conexion().execute("SELECT COUNT(*) FROM cves").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa feeds NVD JSON 2.0 al espejo local de SECUREVAL")
+    parser.add_argument("feeds", nargs="+", help="Archivos .json o .json.gz de la NVD")
+    parser.add_argument("--db", default=NVD_OFFLINE_DB, help="Ruta de la base SQLite local")
+    args = parser.parse_args(argv)
+
+    espejo = EspejoNVD(args.db)
+    for ruta in args.feeds:
+        try:
+            total = espejo.importar_feed(ruta)
+            print(f"✅ {ruta}: {total} CVEs importados")
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"❌ Error importando {ruta}: {e}")
+            return 1
+    print(f"📁 Espejo NVD: {espejo.total_cves()} CVEs en {args.db}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
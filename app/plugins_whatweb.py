@@ -0,0 +1,86 @@
+# app/plugins_whatweb.py - Clasificación de plugins de WhatWeb
+# =====================================
+# WhatWeb informa como "plugin" tanto productos de software (Apache, PHP,
+# WordPress...) como datos informativos (Country, IP, Title, Cookies...).
+# Este registro separa ambos tipos para que solo los productos se envíen
+# a la búsqueda de CVEs, junto con la versión detectada.
+# =====================================
+import re
+
+PRODUCTO = "producto"
+INFORMATIVO = "informativo"
+CABECERA = "cabecera"
+
+# Plugins que no identifican un producto vulnerable
+PLUGINS_INFORMATIVOS = {
+    "Access-Control-Allow-Methods", "Allow", "Content-Language", "Cookies",
+    "Country", "Email", "Frame", "Google-Analytics", "HTML5", "HttpOnly",
+    "Index-Of", "IP", "Meta-Author", "Meta-Refresh-Redirect", "Object",
+    "Open-Graph-Protocol", "PasswordField", "RedirectLocation", "Script",
+    "Strict-Transport-Security", "Content-Security-Policy", "Title",
+    "UncommonHeaders", "Via-Proxy", "WWW-Authenticate", "X-Frame-Options",
+    "X-UA-Compatible", "X-XSS-Protection",
+}
+
+# Plugins cuyo campo "string" contiene el producto real (p. ej. "Apache-Coyote/1.1")
+PLUGINS_CABECERA = {"HTTPServer", "X-Powered-By", "MetaGenerator", "PoweredBy"}
+
+_PATRON_PRODUCTO_VERSION = re.compile(r"^\s*([A-Za-z][\w.\-]*(?: [A-Za-z][\w.\-]*)*?)[/ ]v?(\d[\w.\-]*)")
+
+def clasificar_plugin(nombre):
+    """Devuelve PRODUCTO, INFORMATIVO o CABECERA para un plugin de WhatWeb."""
+    if nombre in PLUGINS_INFORMATIVOS:
+        return INFORMATIVO
+    if nombre in PLUGINS_CABECERA:
+        return CABECERA
+    return PRODUCTO
+
+def _primer_valor(datos, campo):
+    if not isinstance(datos, dict):
+        return None
+    valores = datos.get(campo) or []
+    if isinstance(valores, str):
+        return valores
+    return str(valores[0]) if valores else None
+
+def version_plugin(datos):
+    """Primera versión informada por WhatWeb para un plugin, o None."""
+    return _primer_valor(datos, "version")
+
+def producto_desde_cadena(cadena):
+    """
+    Separa una cadena de cabecera en (producto, versión).
+
+    "Apache-Coyote/1.1" -> ("Apache-Coyote", "1.1")
+    "Apache/2.4.41 (Ubuntu)" -> ("Apache", "2.4.41")
+    "WordPress 6.8.1" -> ("WordPress", "6.8.1")
+    "Heroku" -> ("Heroku", None)
+    """
+    cadena = re.sub(r"\(.*?\)", "", cadena or "").strip()
+    coincidencia = _PATRON_PRODUCTO_VERSION.match(cadena)
+    if coincidencia:
+        return coincidencia.group(1).strip(), coincidencia.group(2)
+    return (cadena or None), None
+
+def producto_y_version(nombre, datos):
+    """
+    Producto y versión que representa un plugin, o (None, None) si es
+    informativo.
+    """
+    tipo = clasificar_plugin(nombre)
+    if tipo == INFORMATIVO:
+        return None, None
+    if tipo == CABECERA:
+        return producto_desde_cadena(_primer_valor(datos, "string"))
+    return nombre, version_plugin(datos)
+
+def consulta_cve(nombre, datos):
+    """
+    Texto de búsqueda de CVEs para un plugin, o None si no es un producto.
+
+    Incluye la versión detectada cuando WhatWeb la informa.
+    """
+    producto, version = producto_y_version(nombre, datos)
+    if not producto:
+        return None
+    return f"{producto} {version}" if version else producto
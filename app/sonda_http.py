@@ -0,0 +1,192 @@
+# app/sonda_http.py - Sonda HTTP HEAD en proceso con pool de conexiones
+# =====================================
+# Sustituye a "curl -sI" en la detección de sistema operativo:
+# - Sin crear procesos: http.client dentro del propio intérprete
+# - Conexiones keep-alive reutilizadas por (esquema, host, puerto)
+# - Segura entre hilos: la usan a la vez todos los hilos de sondeo
+# - En HTTPS reanuda la sesión TLS negociada por verificar_tls para el
+#   mismo host (sin repetir el handshake completo)
+# - sondear_https: handshake TLS (certificado, cifrado, versión) y HEAD /
+#   por una sola conexión; las cabeceras quedan guardadas por host para
+#   la detección de SO
+# =====================================
+import ssl
+import socket
+import threading
+import http.client
+
+TIMEOUT_HTTP = 10
+# Conexiones inactivas conservadas por host
+MAX_CONEXIONES_HOST = 2
+
+# Contexto TLS compartido: las sesiones TLS solo pueden reanudarse con el
+# contexto que las creó
+contexto_tls = ssl.create_default_context()
+
+def partes_url(url):
+    """Separa una URL (o un host) en (esquema, host, puerto, ruta)."""
+    esquema = "http"
+    if "://" in url:
+        esquema, url = url.split("://", 1)
+        esquema = esquema.lower()
+    anfitrion, _, ruta = url.partition("/")
+    host, _, puerto = anfitrion.partition(":")
+    puerto = int(puerto) if puerto.isdigit() else (443 if esquema == "https" else 80)
+    return esquema, host, puerto, "/" + ruta
+
+def cabeceras_como_texto(respuesta):
+    """Línea de estado y cabeceras con el formato de "curl -sI"."""
+    version = "HTTP/1.1" if respuesta.version == 11 else "HTTP/1.0"
+    lineas = [f"{version} {respuesta.status} {respuesta.reason}"]
+    lineas.extend(f"{nombre}: {valor}" for nombre, valor in respuesta.getheaders())
+    return "\r\n".join(lineas) + "\r\n"
+
+class _ConexionHTTPS(http.client.HTTPSConnection):
+    """HTTPSConnection que reanuda una sesión TLS y conecta a una IP concreta."""
+
+    def __init__(self, host, puerto, ip=None, sesion=None, timeout=TIMEOUT_HTTP):
+        super().__init__(host, puerto, timeout=timeout, context=contexto_tls)
+        self.ip = ip
+        self.sesion = sesion
+
+    def connect(self):
+        sock = socket.create_connection((self.ip or self.host, self.port), self.timeout)
+        try:
+            self.sock = contexto_tls.wrap_socket(sock, server_hostname=self.host, session=self.sesion)
+        except ssl.SSLError:
+            # Certificado o handshake fallidos (SSLCertVerificationError es
+            # también ValueError): repetirlo fallaría igual
+            sock.close()
+            raise
+        except ValueError:
+            # Sesión no reanudable con este contexto: handshake completo
+            sock.close()
+            sock = socket.create_connection((self.ip or self.host, self.port), self.timeout)
+            self.sock = contexto_tls.wrap_socket(sock, server_hostname=self.host)
+
+class _ConexionHTTP(http.client.HTTPConnection):
+    def __init__(self, host, puerto, ip=None, timeout=TIMEOUT_HTTP):
+        super().__init__(host, puerto, timeout=timeout)
+        self.ip = ip
+
+    def connect(self):
+        self.sock = socket.create_connection((self.ip or self.host, self.port), self.timeout)
+
+class SondaHTTP:
+    """Peticiones HEAD con conexiones persistentes compartidas entre hilos."""
+
+    def __init__(self, timeout=TIMEOUT_HTTP, max_conexiones_host=MAX_CONEXIONES_HOST):
+        self.timeout = timeout
+        self.max_conexiones_host = max_conexiones_host
+        self._lock = threading.Lock()
+        self._libres = {}
+        self._sesiones_tls = {}
+        self._cabeceras = {}
+        self.conexiones_creadas = 0
+
+    def guardar_sesion_tls(self, hostname, sesion):
+        """Registra la sesión TLS de un host para reanudarla en la sonda HTTPS."""
+        if sesion is not None:
+            with self._lock:
+                self._sesiones_tls[hostname] = sesion
+
+    def sesion_tls(self, hostname):
+        with self._lock:
+            return self._sesiones_tls.get(hostname)
+
+    def _tomar(self, clave):
+        with self._lock:
+            libres = self._libres.get(clave)
+            return libres.pop() if libres else None
+
+    def _devolver(self, clave, conexion):
+        with self._lock:
+            libres = self._libres.setdefault(clave, [])
+            if len(libres) < self.max_conexiones_host:
+                libres.append(conexion)
+                return
+        conexion.close()
+
+    def cabeceras_host(self, hostname):
+        """Cabeceras HTTPS obtenidas por sondear_https para el host ("" si no hay)."""
+        with self._lock:
+            return self._cabeceras.get(hostname, "")
+
+    def _nueva(self, esquema, host, puerto, ip, timeout=None):
+        with self._lock:
+            self.conexiones_creadas += 1
+        if esquema == "https":
+            return _ConexionHTTPS(host, puerto, ip, self.sesion_tls(host), timeout or self.timeout)
+        return _ConexionHTTP(host, puerto, ip, timeout or self.timeout)
+
+    def _enviar_head(self, conexion, clave, ruta):
+        """HEAD por una conexión; la devuelve al pool si sigue abierta. None si falla."""
+        try:
+            conexion.request("HEAD", ruta)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            texto = cabeceras_como_texto(respuesta)
+        except (OSError, http.client.HTTPException):
+            conexion.close()
+            return None
+        if respuesta.will_close:
+            conexion.close()
+        else:
+            self._devolver(clave, conexion)
+        return texto
+
+    def head(self, url, ip=None):
+        """
+        Envía HEAD a la URL y devuelve las cabeceras como texto (formato de
+        curl -sI), o "" si no hay respuesta.
+        """
+        esquema, host, puerto, ruta = partes_url(url)
+        if not host:
+            return ""
+        # Sin la IP en la clave: la conexión abierta por sondear_https hacia la
+        # IP resuelta sirve también a un HEAD posterior por nombre
+        clave = (esquema, host, puerto)
+        conexion = self._tomar(clave)
+        # Una conexión reutilizada puede haberla cerrado el servidor: un reintento
+        for reutilizada in ((True, False) if conexion else (False,)):
+            if not reutilizada:
+                conexion = self._nueva(esquema, host, puerto, ip)
+            texto = self._enviar_head(conexion, clave, ruta)
+            if texto is not None:
+                return texto
+        return ""
+
+    def sondear_https(self, host, puerto=443, ip=None, timeout=None):
+        """
+        Handshake TLS y HEAD / por la misma conexión.
+
+        Returns:
+            tuple: ((certificado, cifrado, versión), cabeceras). cabeceras es
+                   "" si el servidor no respondió a HTTP tras el handshake.
+        Raises:
+            OSError, ssl.SSLError: si falla la conexión o el handshake
+        """
+        conexion = self._nueva("https", host, puerto, ip, timeout)
+        try:
+            conexion.connect()
+        except BaseException:
+            conexion.close()
+            raise
+        ssock = conexion.sock
+        datos_tls = (ssock.getpeercert(), ssock.cipher(), ssock.version())
+        self.guardar_sesion_tls(host, ssock.session)
+        cabeceras = self._enviar_head(conexion, ("https", host, puerto), "/") or ""
+        if cabeceras:
+            with self._lock:
+                self._cabeceras[host] = cabeceras
+        return datos_tls, cabeceras
+
+    def cerrar(self):
+        """Cierra las conexiones y olvida sesiones y cabeceras (fin de un análisis)."""
+        with self._lock:
+            conexiones = [c for libres in self._libres.values() for c in libres]
+            self._libres.clear()
+            self._sesiones_tls.clear()
+            self._cabeceras.clear()
+        for conexion in conexiones:
+            conexion.close()
@@ -4,6 +4,9 @@ import json
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from .almacen_resultados import consultar_dominio
+from .formato_resultados import expandir_resultados
+from .catalogo_resultados import listar_catalogo
 
 # Usar ruta absoluta para resultados
 RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resultados")
@@ -26,11 +29,17 @@ def determinar_tratamiento(riesgo):
         return "Evitar"
 
 def listar_dominios():
-    """Retorna la lista de dominios escaneados con resultados."""
+    """Retorna la lista de dominios escaneados con resultados (catálogo de resultados)."""
     if not os.path.exists(RESULTADOS_DIR):
         print(f"Directorio de resultados no encontrado: {RESULTADOS_DIR}")
         return []
     
+    catalogo = listar_catalogo(RESULTADOS_DIR, "riesgo.json")
+    if catalogo is not None:
+        dominios = [entrada["dominio"] for entrada in catalogo]
+        print(f"Dominios encontrados: {dominios}")
+        return dominios
+
     try:
         dominios = [d for d in os.listdir(RESULTADOS_DIR) 
                    if os.path.isdir(os.path.join(RESULTADOS_DIR, d)) and 
@@ -42,7 +51,12 @@ def listar_dominios():
         return []
 
 def cargar_riesgos(dominio):
-    """Carga los riesgos del análisis de un dominio."""
+    """Carga los riesgos del análisis de un dominio (almacén de resultados o riesgo.json)."""
+    datos = consultar_dominio(dominio, "hallazgos", RESULTADOS_DIR)
+    if datos is not None:
+        print(f"Cargados {len(datos)} riesgos del dominio {dominio}")
+        return datos
+
     ruta = os.path.join(RESULTADOS_DIR, dominio, "riesgo.json")
     if not os.path.exists(ruta):
         print(f"Archivo no encontrado: {ruta}")
@@ -50,11 +64,11 @@ def cargar_riesgos(dominio):
     
     try:
         with open(ruta, "r", encoding='utf-8') as f:
-            datos = json.load(f)
+            datos = expandir_resultados(json.load(f))
         
-        # Verificar que sea una lista
-        if not isinstance(datos, list):
-            print(f"Formato incorrecto en {ruta}: se esperaba una lista")
+        # Verificar el formato (normalizado o lista de filas)
+        if datos is None:
+            print(f"Formato incorrecto en {ruta}: se esperaba una lista o hosts y hallazgos")
             return []
         
         print(f"Cargados {len(datos)} riesgos del dominio {dominio}")
@@ -255,36 +269,31 @@ def lanzar_tratamiento_gui():
             texto.delete(1.0, tk.END)
             texto.insert(tk.END, f"📊 RESUMEN DEL DOMINIO: {dominio}\n")
             texto.insert(tk.END, "=" * 50 + "\n\n")
-            texto.insert(tk.END, f"🔍 Total de riesgos detectados: {len(datos)}\n")
+            
+            # Indicadores comunes con el dashboard y el PDF (agregados del almacén)
+            indicadores = consultar_dominio(dominio, "indicadores", RESULTADOS_DIR)
+            if indicadores is None:
+                texto.insert(tk.END, "⚠️ Indicadores no disponibles: almacén de resultados no accesible\n")
+                return
+            total = indicadores['total_hallazgos']
+            texto.insert(tk.END, f"🔍 Total de riesgos detectados: {total}\n")
             
             # Estadísticas por criticidad
-            criticidades = {}
-            for item in datos:
-                crit = item.get('criticidad', 'Bajo')
-                criticidades[crit] = criticidades.get(crit, 0) + 1
+            criticidades = indicadores['por_criticidad']
             
             texto.insert(tk.END, "\n📈 Distribución por criticidad:\n")
             for crit in ['Bajo', 'Medio', 'Alto', 'Crítico']:
                 count = criticidades.get(crit, 0)
                 if count > 0:
                     emoji = {"Bajo": "🟢", "Medio": "🟡", "Alto": "🟠", "Crítico": "🔴"}.get(crit, "⚪")
-                    porcentaje = (count / len(datos)) * 100
+                    porcentaje = (count / total) * 100
                     texto.insert(tk.END, f"   {emoji} {crit}: {count} ({porcentaje:.1f}%)\n")
             
-            riesgo_promedio = sum(item.get('riesgo', 0) for item in datos) / len(datos)
+            riesgo_promedio = indicadores['riesgo_promedio']
             texto.insert(tk.END, f"\n⚖️ Riesgo promedio del dominio: {riesgo_promedio:.2f}\n")
             
             # Mostrar tecnologías más riesgosas
-            tech_riesgo = {}
-            for item in datos:
-                tech = item.get('tecnologia', 'Desconocida')
-                riesgo = item.get('riesgo', 0)
-                if tech not in tech_riesgo:
-                    tech_riesgo[tech] = []
-                tech_riesgo[tech].append(riesgo)
-            
-            tech_promedio = {tech: sum(riesgos)/len(riesgos) for tech, riesgos in tech_riesgo.items()}
-            top_tech = sorted(tech_promedio.items(), key=lambda x: x[1], reverse=True)[:3]
+            top_tech = indicadores['top_tecnologias'][:3]
             
             if top_tech:
                 texto.insert(tk.END, "\n🔥 Top 3 tecnologías más riesgosas:\n")
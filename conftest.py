@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Fixtures comunes de los tests.
+
+analyzer_simulado sustituye en app/analyzer.py las sondas de red, la
+consulta de CVEs y los activos por funciones deterministas (con
+monkeypatch, que las restaura al terminar cada test), para ejecutar
+analizar_dominio sin nmap, curl ni conexión a Internet.
+"""
+
+import os
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+
+def _ip_falsa(hostname):
+    """IP estable por nombre (distinta para cada host)."""
+    return ["10.%d.%d.%d" % tuple(zlib.crc32(hostname.encode()).to_bytes(4, "big")[1:])]
+
+
+SIMULACIONES = {
+    "detectar_sistema_operativo": lambda url: "Linux",
+    "verificar_tls": lambda url, ip=None: {"tls_version": "TLSv1.3", "cifrado": "AES", "valido_hasta": "-"},
+    "escanear_puertos_nmap": lambda url, ip=None, escaner=None, progresivo=None: ["80/tcp open http"],
+    "escanear_puertos_nmap_lote": lambda urls, cache=None, escaner=None, progresivo=None: {u: ["80/tcp open http"] for u in urls},
+    "buscar_cves_consulta": lambda consulta, backend=None: [],
+    "obtener_activos": lambda: [],
+    "_resolver_direcciones": _ip_falsa,
+}
+
+
+@pytest.fixture
+def analyzer_simulado(monkeypatch, tmp_path):
+    """
+    analyzer con SIMULACIONES y RESULTADOS_DIR en tmp_path/resultados.
+
+    Returns:
+        function: simular(**atributos) sustituye más atributos de analyzer
+                  (ejecutar_whatweb, RESULTADOS_DIR...) hasta el final del test
+    """
+    def simular(**atributos):
+        for nombre, valor in atributos.items():
+            monkeypatch.setattr(analyzer, nombre, valor)
+
+    simular(RESULTADOS_DIR=str(tmp_path / "resultados"), **SIMULACIONES)
+    return simular
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# medir_arranque.py - Tiempo de arranque de SECUREVAL con cache fría y caliente
+"""
+Mide cuánto tarda en importarse la aplicación antes de mostrar la ventana
+de bienvenida y lo compara con la carga anticipada de todos los módulos
+(el comportamiento anterior de app/main.py).
+
+- Cache fría: directorio de bytecode (PYTHONPYCACHEPREFIX) vacío, por lo que
+  Python compila todos los módulos.
+- Cache caliente: mismo directorio ya poblado por una ejecución anterior.
+
+La cache de disco del sistema operativo no se vacía (requiere root); cada
+medición se repite y se informa la mediana.
+
+Uso:
+    python3 medir_arranque.py [--repeticiones N]
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+ESCENARIOS = {
+    "Arranque actual (app.main)": ["app.main"],
+    "Carga anticipada (todos los módulos)": [
+        "app.main", "app.activos", "app.analyzer", "app.export_pdf", "app.monitoreo", "app.tratamiento"],
+}
+
+CODIGO = """
+import sys, time
+inicio = time.perf_counter()
+for modulo in sys.argv[1:]:
+    __import__(modulo)
+print(time.perf_counter() - inicio)
+"""
+
+def medir(modulos, prefijo_cache):
+    """Segundos de importación en un proceso nuevo, o None si falta una dependencia."""
+    entorno = dict(os.environ, PYTHONPYCACHEPREFIX=prefijo_cache)
+    proceso = subprocess.run([sys.executable, "-c", CODIGO, *modulos], cwd=RAIZ, env=entorno,
+                             capture_output=True, text=True)
+    if proceso.returncode != 0:
+        return None
+    return float(proceso.stdout.strip().splitlines()[-1])
+
+def medir_escenario(modulos, repeticiones):
+    frio, caliente = [], []
+    for _ in range(repeticiones):
+        prefijo = tempfile.mkdtemp(prefix="secureval_pyc_")
+        try:
+            frio.append(medir(modulos, prefijo))
+            caliente.append(medir(modulos, prefijo))
+        finally:
+            shutil.rmtree(prefijo, ignore_errors=True)
+    if None in frio or None in caliente:
+        return None, None
+    return statistics.median(frio), statistics.median(caliente)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de SECUREVAL")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("⏱️ TIEMPO DE ARRANQUE DE SECUREVAL")
+    print("=" * 70)
+    print(f"{'Escenario':<40}{'Cache fría':>14}{'Cache caliente':>16}")
+    for nombre, modulos in ESCENARIOS.items():
+        frio, caliente = medir_escenario(modulos, max(1, args.repeticiones))
+        if frio is None:
+            print(f"{nombre:<40}{'dependencias no instaladas':>30}")
+        else:
+            print(f"{nombre:<40}{frio * 1000:>12.0f}ms{caliente * 1000:>14.0f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,11 @@ Uso:
     o
     python3 -m secureval
 
+Modo sin interfaz gráfica (servidores de escaneo):
+    python3 secureval.py ejemplo.com otro.org
+    python3 secureval.py -f dominios.txt -j 3 --resumen estado.json
+    python3 secureval.py --help
+
 Autor: SECUREVAL Team
 """
 
@@ -21,6 +26,11 @@ sys.path.insert(0, project_root)
 
 # Importar y ejecutar la aplicación principal
 if __name__ == "__main__":
+    # Con argumentos: modo línea de comandos, sin importar tkinter
+    if len(sys.argv) > 1:
+        from app.cli import main as main_cli
+        sys.exit(main_cli(sys.argv[1:]))
+
     try:
         from app.main import main
         main()
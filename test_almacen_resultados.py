@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test del almacén de resultados en SQLite (app/almacen_resultados.py).
+
+Comprueba que riesgo.json generado desde el almacén es idéntico al que se
+genera desde los resultados en memoria, los agregados calculados por SQLite y
+que las consultas de las pantallas no escriben en disco (análisis anteriores
+al almacén y riesgo.json sustituidos se leen de sus JSON, una vez por
+versión del archivo).
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import almacen_resultados, tratamiento
+from app.almacen_resultados import AlmacenResultados, consultar_dominio, huella_riesgo
+from app.formato_resultados import cargar_resultados, normalizar_resultados
+
+TLS = {"tls_version": "TLSv1.3", "cifrado": "TLS_AES_256_GCM_SHA384", "valido_hasta": "Jan  1 00:00:00 2030 GMT"}
+
+RESULTADOS = [
+    {"subdominio": "https://www.ejemplo.com", "tecnologia": "nginx", "tipo_servicio": "Web",
+     "sistema_operativo": "Linux", "puertos": ["80/tcp open http", "443/tcp open https"], "tls": TLS,
+     "cvss_max": 7.5, "valor_activo": 4, "probabilidad": 3, "vulnerabilidad": 4, "riesgo": 48,
+     "criticidad": "Alto", "cves": ["CVE-2021-23017", "CVE-2019-20372"]},
+    {"subdominio": "https://www.ejemplo.com", "tecnologia": "PHP", "tipo_servicio": "Lenguaje",
+     "sistema_operativo": "Linux", "puertos": ["80/tcp open http", "443/tcp open https"], "tls": TLS,
+     "cvss_max": 9.8, "valor_activo": 4, "probabilidad": 5, "vulnerabilidad": 5, "riesgo": 100,
+     "criticidad": "Crítico", "cves": ["CVE-2024-4577"]},
+    {"subdominio": "https://api.ejemplo.com", "tecnologia": "Express", "tipo_servicio": "Web",
+     "sistema_operativo": "Desconocido", "puertos": ["No hay puertos abiertos"], "tls": "Error: timeout",
+     "cvss_max": 0.0, "valor_activo": 3, "probabilidad": 1, "vulnerabilidad": 1, "riesgo": 3,
+     "criticidad": "Bajo", "cves": []},
+]
+
+
+def test_riesgo_json_identico():
+    """riesgo.json exportado desde el almacén coincide byte a byte con el de los resultados en memoria."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        almacen = AlmacenResultados(os.path.join(carpeta, "resultados.sqlite"))
+        almacen.guardar_escaneo("ejemplo.com", RESULTADOS, {"fecha_fin": "2025-01-01T00:00:00"})
+        ruta = os.path.join(carpeta, "riesgo.json")
+        almacen.exportar_riesgo_json("ejemplo.com", ruta)
+        with open(ruta, "r") as f:
+            exportado = f.read()
+        assert exportado == json.dumps(RESULTADOS, indent=4, ensure_ascii=False)
+        with open(os.path.join(carpeta, "riesgo_normalizado.json"), "r") as f:
+            assert f.read() == json.dumps(normalizar_resultados(RESULTADOS), indent=4, ensure_ascii=False)
+        assert cargar_resultados(os.path.join(carpeta, "riesgo_normalizado.json")) == RESULTADOS
+        assert [h["tecnologia"] for h in almacen.hallazgos("ejemplo.com", "Crítico")] == ["PHP"]
+        assert almacen.hallazgos("otro.com") is None
+        almacen.cerrar()
+        print("✅ riesgo.json idéntico desde el almacén")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_agregados_y_nuevo_analisis():
+    """Indicadores y resumen por SQLite; un nuevo análisis reemplaza al anterior."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        almacen = AlmacenResultados(os.path.join(carpeta, "resultados.sqlite"))
+        almacen.guardar_escaneo("ejemplo.com", RESULTADOS[:1])
+        almacen.guardar_escaneo("ejemplo.com", RESULTADOS)
+        indicadores = almacen.indicadores("ejemplo.com")
+        assert indicadores["total_hallazgos"] == 3
+        assert indicadores["cvss_max"] == 9.8 and indicadores["riesgo_max"] == 100
+        assert indicadores["por_criticidad"] == {"Alto": 1, "Crítico": 1, "Bajo": 1}
+        assert {s: i["cvss_max"] for s, i in indicadores["por_subdominio"].items()} == {
+            "https://www.ejemplo.com": 9.8, "https://api.ejemplo.com": 0.0}
+
+        resumen = almacen.resumen("ejemplo.com")
+        assert resumen["https://www.ejemplo.com"] == {"tecnologias": ["nginx", "PHP"], "total_tecnologias": 2,
+                                                      "total_cves": 3, "riesgo_max": 100, "riesgo_promedio": 74.0}
+        assert resumen["https://api.ejemplo.com"]["total_cves"] == 0
+
+        dominios = almacen.dominios()
+        assert [(d["dominio"], d["total_hallazgos"], d["total_subdominios"], d["riesgo_max"], d["cvss_max"])
+                for d in dominios] == [("ejemplo.com", 3, 2, 100, 9.8)]
+        almacen.cerrar()
+        print("✅ Agregados del almacén de resultados")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_importa_analisis_anteriores():
+    """Los dominios con solo riesgo.json se leen de sus JSON sin crear el almacén."""
+    carpeta = tempfile.mkdtemp()
+    original = tratamiento.RESULTADOS_DIR
+    try:
+        os.makedirs(os.path.join(carpeta, "antiguo.com"))
+        with open(os.path.join(carpeta, "antiguo.com", "riesgo.json"), "w") as f:
+            json.dump(RESULTADOS, f, indent=4)
+        with open(os.path.join(carpeta, "antiguo.com", "metadata.json"), "w") as f:
+            json.dump({"fecha_fin": "2024-06-01T12:00:00"}, f)
+
+        assert consultar_dominio("antiguo.com", "hallazgos", carpeta) == RESULTADOS
+        assert consultar_dominio("antiguo.com", "ultimo_escaneo", carpeta)["metadata"] == {
+            "fecha_fin": "2024-06-01T12:00:00"}
+        assert consultar_dominio("sin_analisis.com", "hallazgos", carpeta) is None
+
+        tratamiento.RESULTADOS_DIR = carpeta
+        assert tratamiento.cargar_riesgos("antiguo.com") == RESULTADOS
+        assert sorted(os.listdir(carpeta)) == ["antiguo.com"]
+        print("✅ Análisis anteriores al almacén leídos sin escribir en disco")
+    finally:
+        tratamiento.RESULTADOS_DIR = original
+        shutil.rmtree(carpeta)
+
+
+def test_importa_una_vez_por_huella():
+    """Un dominio anterior al almacén se lee de sus JSON una vez hasta que cambia riesgo.json."""
+    carpeta = tempfile.mkdtemp()
+    original = almacen_resultados.cargar_resultados
+    lecturas = []
+
+    def contar(ruta):
+        lecturas.append(ruta)
+        return original(ruta)
+    try:
+        os.makedirs(os.path.join(carpeta, "antiguo.com"))
+        ruta = os.path.join(carpeta, "antiguo.com", "riesgo.json")
+        with open(ruta, "w") as f:
+            json.dump(RESULTADOS, f, indent=4)
+        almacen_resultados.cargar_resultados = contar
+
+        # Una exportación PDF: hallazgos, resumen e indicadores
+        assert consultar_dominio("antiguo.com", "hallazgos", carpeta) == RESULTADOS
+        assert consultar_dominio("antiguo.com", "resumen", carpeta)["https://api.ejemplo.com"]["total_cves"] == 0
+        assert consultar_dominio("antiguo.com", "indicadores", carpeta)["total_hallazgos"] == 3
+        # Desde otro hilo se consulta la misma copia en memoria
+        en_hilo = []
+        hilo = threading.Thread(target=lambda: en_hilo.append(consultar_dominio("antiguo.com", "hallazgos", carpeta)))
+        hilo.start()
+        hilo.join()
+        assert en_hilo == [RESULTADOS]
+        assert len(lecturas) == 1
+
+        with open(ruta, "w") as f:
+            json.dump(RESULTADOS[:1], f)
+        assert consultar_dominio("antiguo.com", "hallazgos", carpeta) == RESULTADOS[:1]
+        assert consultar_dominio("antiguo.com", "indicadores", carpeta)["total_hallazgos"] == 1
+        assert len(lecturas) == 2
+        assert sorted(os.listdir(carpeta)) == ["antiguo.com"]
+        print("✅ Análisis anteriores al almacén importados una vez por versión de riesgo.json")
+    finally:
+        almacen_resultados.cargar_resultados = original
+        shutil.rmtree(carpeta)
+
+
+def test_huella_de_riesgo_json():
+    """Un riesgo.json sustituido tras el análisis se lee del archivo aunque tenga la misma fecha."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(carpeta, "ejemplo.com"))
+        ruta_bd = os.path.join(carpeta, "resultados.sqlite")
+        ruta = os.path.join(carpeta, "ejemplo.com", "riesgo.json")
+        almacen = AlmacenResultados(ruta_bd)
+        almacen.guardar_escaneo("ejemplo.com", RESULTADOS)
+        almacen.exportar_riesgo_json("ejemplo.com", ruta)
+        assert almacen.ultimo_escaneo("ejemplo.com")["huella"] == huella_riesgo(os.path.dirname(ruta))
+        almacen.cerrar()
+        assert consultar_dominio("ejemplo.com", "hallazgos", carpeta) == RESULTADOS
+
+        # Mismo segundo que el análisis: la comparación por fecha no lo detectaba
+        marca = os.stat(ruta).st_mtime_ns
+        with open(ruta, "w") as f:
+            json.dump(RESULTADOS[:1], f)
+        os.utime(ruta, ns=(marca, marca + 1000))
+        with open(ruta_bd, "rb") as f:
+            base = f.read()
+
+        assert consultar_dominio("ejemplo.com", "hallazgos", carpeta) == RESULTADOS[:1]
+        with open(ruta_bd, "rb") as f:
+            assert f.read() == base
+        assert sorted(os.listdir(os.path.join(carpeta, "ejemplo.com"))) == ["riesgo.json", "riesgo_normalizado.json"]
+        print("✅ Huella de riesgo.json en lugar de la fecha del análisis")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_riesgo_json_identico()
+    test_agregados_y_nuevo_analisis()
+    test_importa_analisis_anteriores()
+    test_importa_una_vez_por_huella()
+    test_huella_de_riesgo_json()
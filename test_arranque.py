@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test del arranque de SECUREVAL.
+
+Verifica que importar app.main no cargue matplotlib, numpy ni reportlab
+(se importan al abrir cada funcionalidad) y que importar los módulos del
+análisis no cree directorios ni escriba archivos.
+"""
+
+import os
+import sys
+import subprocess
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+def _ejecutar(codigo):
+    return subprocess.check_output([sys.executable, "-c", codigo], cwd=RAIZ, text=True).strip()
+
+
+def test_main_sin_dependencias_pesadas():
+    """app.main no importa las dependencias de monitoreo ni de exportación PDF."""
+    salida = _ejecutar(
+        "import sys; import app.main; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('matplotlib', 'numpy', 'reportlab', 'requests')))")
+    assert salida == "[]"
+    print("✅ app.main arranca sin matplotlib, numpy ni reportlab")
+
+
+def test_importar_sin_efectos_en_disco():
+    """Importar activos, analyzer y cli no crea directorios ni escribe archivos."""
+    salida = _ejecutar(
+        "import os, builtins\n"
+        "escrituras = []\n"
+        "abrir = builtins.open\n"
+        "def open_vigilado(ruta, modo='r', *a, **k):\n"
+        "    if any(c in modo for c in 'wax+'):\n"
+        "        escrituras.append(str(ruta))\n"
+        "    return abrir(ruta, modo, *a, **k)\n"
+        "builtins.open = open_vigilado\n"
+        "os.makedirs = lambda *a, **k: escrituras.append(str(a[0]))\n"
+        "import app.activos, app.analyzer, app.cli\n"
+        "print(escrituras)")
+    assert salida == "[]"
+    print("✅ Importar los módulos de análisis no modifica el disco")
+
+
+if __name__ == "__main__":
+    test_main_sin_dependencias_pesadas()
+    test_importar_sin_efectos_en_disco()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test de la cache persistente de consultas CVE (app/cache_cves.py).
+
+Usa una base SQLite temporal; no realiza consultas a la NVD.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.cache_cves import CacheCVEs, clave_consulta
+
+CVE_EJEMPLO = {"cve": {"id": "CVE-2021-0001", "metrics": {}}}
+
+
+def test_persistencia_y_ttl():
+    """Las entradas sobreviven a una nueva instancia y caducan según su TTL."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(carpeta, "cache.sqlite")
+        clave = clave_consulta("Apache", {"keywordSearch": "Apache", "resultsPerPage": 3})
+        CacheCVEs(ruta).guardar(clave, [CVE_EJEMPLO])
+
+        assert CacheCVEs(ruta).obtener(clave) == (True, [CVE_EJEMPLO])
+
+        caducada = CacheCVEs(ruta, ttl=-1)
+        caducada.guardar(clave, [CVE_EJEMPLO])
+        assert caducada.obtener(clave) == (False, None)
+        print("✅ Persistencia y TTL correctos")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_entradas_negativas():
+    """Errores y respuestas vacías se cachean con su propio TTL corto."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(carpeta, "cache.sqlite")
+        cache = CacheCVEs(ruta, ttl_negativo=60)
+        cache.guardar("nginx", [], negativo=True)
+        assert cache.obtener("nginx") == (True, [])
+
+        sin_negativos = CacheCVEs(ruta, ttl_negativo=-1)
+        sin_negativos.guardar("nginx", [], negativo=True)
+        assert sin_negativos.obtener("nginx") == (False, None)
+        print("✅ Entradas negativas correctas")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_expulsion_y_concurrencia():
+    """El tamaño se mantiene acotado con escrituras desde varios hilos."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        cache = CacheCVEs(os.path.join(carpeta, "cache.sqlite"), max_entradas=10)
+
+        def escribir(inicio):
+            for i in range(inicio, inicio + 20):
+                cache.guardar(f"tech-{i}", [CVE_EJEMPLO])
+
+        hilos = [threading.Thread(target=escribir, args=(n * 100,)) for n in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert cache.total() == 10
+        print("✅ Expulsión por tamaño con escrituras concurrentes")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_persistencia_y_ttl()
+    test_entradas_negativas()
+    test_expulsion_y_concurrencia()
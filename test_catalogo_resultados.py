@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test del catálogo global de resultados (app/catalogo_resultados.py).
+
+Comprueba que el catálogo se sirve desde el almacén de resultados sin abrir
+los riesgo.json de los análisis almacenados (ni de los dominios antiguos,
+importados al terminar un análisis), que los dominios aún no importados o
+con riesgo.json modificado se resumen desde sus JSON y que listar no
+escribe nada en disco.
+"""
+
+import os
+import sys
+import json
+import shutil
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import almacen_resultados, analyzer, tratamiento
+from app.catalogo_resultados import listar_catalogo
+
+FILA = {"subdominio": "https://www.antiguo.com", "tecnologia": "nginx", "tipo_servicio": "Web",
+        "sistema_operativo": "Linux", "puertos": ["80/tcp open http"], "tls": "-", "cvss_max": 7.5,
+        "valor_activo": 4, "probabilidad": 3, "vulnerabilidad": 4, "riesgo": 48, "criticidad": "Alto",
+        "cves": ["CVE-2021-23017"]}
+
+
+def _sin_leer_riesgo(ruta):
+    raise AssertionError(f"riesgo.json leído: {ruta}")
+
+
+def _archivos(carpeta):
+    """Contenido de los archivos bajo carpeta (sin los -wal/-shm de SQLite)."""
+    archivos = {}
+    for raiz, _, nombres in os.walk(carpeta):
+        for nombre in nombres:
+            if not nombre.endswith(("-wal", "-shm")):
+                with open(os.path.join(raiz, nombre), "rb") as f:
+                    archivos[os.path.join(raiz, nombre)] = f.read()
+    return archivos
+
+
+def test_analisis_registrado_en_catalogo(analyzer_simulado, monkeypatch, tmp_path):
+    """Al terminar el análisis el dominio queda catalogado con sus recuentos y artefactos."""
+    whatweb = os.path.join(tmp_path, "tecnologias.json")
+    with open(whatweb, "w") as f:
+        for host in ("a", "b"):
+            f.write(json.dumps({"target": f"http://{host}.ejemplo.com",
+                                "plugins": {"nginx": {"version": ["1.18.0"]}, "PHP": {}}}) + "\n")
+    analyzer_simulado(ejecutar_whatweb=lambda subdominios, dominio: whatweb)
+    # Dominio analizado antes del almacén: se importa al terminar el análisis
+    antiguo = os.path.join(analyzer.RESULTADOS_DIR, "antiguo.com")
+    os.makedirs(antiguo)
+    with open(os.path.join(antiguo, "riesgo.json"), "w") as f:
+        json.dump([FILA], f, indent=4)
+
+    opciones = {"subdominios": False, "tecnologias": True, "puertos": True, "tls": True, "cves": True}
+    resultados = analyzer.analizar_dominio("ejemplo.com", opciones, concurrencia=1)
+    antes = _archivos(analyzer.RESULTADOS_DIR)
+
+    # Listado desde el almacén, sin volver a leer riesgo.json
+    with monkeypatch.context() as parche:
+        parche.setattr(almacen_resultados, "cargar_resultados", _sin_leer_riesgo)
+        viejo, entrada = listar_catalogo(analyzer.RESULTADOS_DIR)
+    assert (viejo["dominio"], viejo["total_hallazgos"], viejo["riesgo_max"]) == ("antiguo.com", 1, 48)
+    assert entrada["dominio"] == "ejemplo.com"
+    assert entrada["total_hallazgos"] == len(resultados) == 4
+    assert entrada["total_subdominios"] == 2
+    assert entrada["riesgo_max"] == max(r["riesgo"] for r in resultados)
+    assert {"riesgo.json", "resumen.json", "metadata.json"} <= set(entrada["artefactos"])
+    assert entrada["fecha_inicio"] <= entrada["fecha_fin"]
+    assert entrada["metadata"]["total_resultados"] == 4
+    assert _archivos(analyzer.RESULTADOS_DIR) == antes
+
+    # riesgo.json sustituido tras el análisis: se resume desde el archivo
+    ruta_riesgo = os.path.join(analyzer.RESULTADOS_DIR, "ejemplo.com", "riesgo.json")
+    with open(ruta_riesgo, "w") as f:
+        json.dump([dict(FILA, subdominio="https://a.ejemplo.com")], f)
+    _, entrada = listar_catalogo(analyzer.RESULTADOS_DIR)
+    assert (entrada["total_hallazgos"], entrada["riesgo_max"]) == (1, 48)
+    print("✅ Catálogo servido desde el almacén de resultados")
+
+
+def test_sincronizacion_con_carpetas(monkeypatch, tmp_path):
+    """Dominios antiguos se listan desde sus JSON, sin crear archivos; eliminados salen."""
+    carpeta = str(tmp_path)
+    antiguo = os.path.join(carpeta, "antiguo.com")
+    os.makedirs(antiguo)
+    os.makedirs(os.path.join(carpeta, "sin_resultados"))
+    ruta_riesgo = os.path.join(antiguo, "riesgo.json")
+    with open(ruta_riesgo, "w") as f:
+        json.dump([FILA, dict(FILA, tecnologia="PHP", riesgo=100, criticidad="Crítico")], f, indent=4)
+    antes = _archivos(carpeta)
+
+    monkeypatch.setattr(tratamiento, "RESULTADOS_DIR", carpeta)
+    assert tratamiento.listar_dominios() == ["antiguo.com"]
+    entrada, = listar_catalogo(carpeta)
+    assert (entrada["total_hallazgos"], entrada["riesgo_max"]) == (2, 100)
+    assert entrada["fecha_inicio"] is None and entrada["fecha_fin"]
+    assert listar_catalogo(carpeta, "resumen.json") == []
+
+    # riesgo.json modificado: se vuelve a resumir
+    with open(ruta_riesgo, "w") as f:
+        json.dump([FILA], f)
+    assert listar_catalogo(carpeta)[0]["total_hallazgos"] == 1
+
+    # PDF exportado
+    open(os.path.join(antiguo, "riesgo.pdf"), "w").close()
+    assert "riesgo.pdf" in listar_catalogo(carpeta)[0]["artefactos"]
+    assert set(_archivos(carpeta)) == set(antes) | {os.path.join(antiguo, "riesgo.pdf")}
+
+    shutil.rmtree(antiguo)
+    assert listar_catalogo(carpeta) == []
+    assert os.listdir(carpeta) == ["sin_resultados"]
+    print("✅ Catálogo sincronizado con las carpetas de resultados")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
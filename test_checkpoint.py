@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test de los puntos de control de analizar_dominio.
+
+Interrumpe un análisis a mitad, lo reanuda y verifica que solo se sondean
+los hosts pendientes, que no se repite WhatWeb y que los archivos
+generados son idénticos a los de un análisis sin interrupciones.
+Las sondas de red se sustituyen por funciones deterministas.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+from app.checkpoint import Checkpoint
+
+TECNOLOGIAS = [
+    {"target": "http://a.ejemplo.com", "plugins": {"Apache": {}}},
+    {"target": "http://b.ejemplo.com", "plugins": {"nginx": {}}},
+    {"target": "http://c.ejemplo.com", "plugins": {"WordPress": {}}},
+    {"target": "http://d.ejemplo.com", "plugins": {"IIS": {}}},
+]
+
+OPCIONES = {"subdominios": False, "tecnologias": True, "puertos": True, "tls": True, "cves": True}
+
+
+class Interrupcion(BaseException):
+    """Simula el cierre abrupto del análisis (Ctrl+C, ventana cerrada)."""
+
+
+def _analizar(simular, carpeta_base, nombre, reanudar=False, interrumpir_en=None):
+    """Ejecuta analizar_dominio con sondas simuladas; devuelve (archivos, llamadas)."""
+    llamadas = {"whatweb": 0, "sondas": []}
+    carpeta = os.path.join(carpeta_base, nombre, "ejemplo.com")
+
+    def whatweb(subdominios, dominio):
+        llamadas["whatweb"] += 1
+        ruta = os.path.join(carpeta, "tecnologias.json")
+        with open(ruta, "w") as f:
+            f.write("[\n" + "\n,\n".join(json.dumps(t) for t in TECNOLOGIAS) + "\n]\n")
+        return ruta
+
+    def sistema_operativo(url):
+        if url == interrumpir_en:
+            raise Interrupcion()
+        llamadas["sondas"].append(url)
+        return "Linux"
+
+    simular(RESULTADOS_DIR=os.path.join(carpeta_base, nombre), ejecutar_whatweb=whatweb,
+            detectar_sistema_operativo=sistema_operativo)
+    try:
+        analyzer.analizar_dominio("ejemplo.com", dict(OPCIONES), concurrencia=1,
+                                  puertos_en_lote=False, reanudar=reanudar)
+    except Interrupcion:
+        pass
+    archivos = {}
+    for nombre_archivo in ("riesgo.json", "resumen.json", "metadata.json"):
+        ruta = os.path.join(carpeta, nombre_archivo)
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                archivos[nombre_archivo] = f.read()
+    if "metadata.json" in archivos:
+        # Idéntico salvo las fechas del análisis
+        metadata = json.loads(archivos["metadata.json"])
+        assert metadata.pop("fecha_inicio") <= metadata.pop("fecha_fin")
+        archivos["metadata.json"] = metadata
+    return archivos, llamadas
+
+
+def test_reanudar_analisis_interrumpido(analyzer_simulado, tmp_path):
+    """Al reanudar solo se sondean los hosts pendientes y la salida es la misma."""
+    carpeta_base = str(tmp_path)
+    completo, _ = _analizar(analyzer_simulado, carpeta_base, "completo")
+
+    parcial, llamadas = _analizar(analyzer_simulado, carpeta_base, "interrumpido",
+                                  interrumpir_en="http://c.ejemplo.com")
+    assert parcial == {}
+    assert llamadas["sondas"] == ["http://a.ejemplo.com", "http://b.ejemplo.com"]
+    checkpoint = Checkpoint(os.path.join(carpeta_base, "interrumpido", "ejemplo.com"))
+    assert checkpoint.cargar() == 2
+    assert "descubrimiento" in checkpoint.etapas
+
+    reanudado, llamadas = _analizar(analyzer_simulado, carpeta_base, "interrumpido", reanudar=True)
+    assert llamadas["whatweb"] == 0
+    assert llamadas["sondas"] == ["http://c.ejemplo.com", "http://d.ejemplo.com"]
+    assert reanudado == completo
+    assert not checkpoint.existe()
+    print("✅ Análisis reanudado sin repetir hosts, salida idéntica")
+
+
+def test_reanudar_sin_checkpoint(analyzer_simulado, tmp_path):
+    """Sin checkpoint, reanudar equivale a un análisis completo."""
+    archivos, llamadas = _analizar(analyzer_simulado, str(tmp_path), "nuevo", reanudar=True)
+    assert llamadas["whatweb"] == 1
+    assert len(llamadas["sondas"]) == 4
+    assert "riesgo.json" in archivos
+    print("✅ Reanudar sin checkpoint analiza desde el principio")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test del modo línea de comandos (app/cli.py).
+
+Analiza varios dominios en paralelo con assetfinder y whatweb sustituidos
+por scripts locales y comprueba el resumen JSON, los archivos generados y
+el código de salida. También verifica que el modo CLI no importe tkinter,
+matplotlib ni reportlab.
+"""
+
+import io
+import os
+import sys
+import json
+import stat
+import time
+import shutil
+import tempfile
+import subprocess
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer, cli
+from app.nvd_cliente import ClienteNVD
+
+ASSETFINDER = """#!/bin/sh
+echo "www.$2"
+"""
+
+WHATWEB = """#!/usr/bin/env python3
+import json, sys
+args = sys.argv[1:]
+entrada = args[args.index("-i") + 1]
+salida = args[args.index("--log-json") + 1]
+if "caido.ejemplo" in salida:
+    sys.exit(1)
+with open(entrada) as fin, open(salida, "w") as fout:
+    registros = [{"target": "http://" + l.strip(), "plugins": {"Apache": {}}} for l in fin if l.strip()]
+    fout.write("[\\n" + "\\n,\\n".join(json.dumps(r) for r in registros) + "\\n]\\n")
+"""
+
+
+def _script(carpeta, nombre, contenido):
+    ruta = os.path.join(carpeta, nombre)
+    with open(ruta, "w") as f:
+        f.write(contenido)
+    os.chmod(ruta, os.stat(ruta).st_mode | stat.S_IEXEC)
+
+
+def test_leer_dominios():
+    """Los dominios de argumentos y archivo se unen sin repetidos ni comentarios."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(carpeta, "dominios.txt")
+        with open(ruta, "w") as f:
+            f.write("# clientes\nuno.ejemplo\n\nDOS.ejemplo  # producción\nuno.ejemplo\n")
+        assert cli.leer_dominios(["tres.ejemplo", "uno.ejemplo"], ruta) == [
+            "tres.ejemplo", "uno.ejemplo", "dos.ejemplo"]
+        print("✅ Lista de dominios normalizada")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_cli_lote_paralelo(analyzer_simulado, monkeypatch, tmp_path):
+    """Varios dominios en paralelo: artefactos por dominio y resumen JSON."""
+    bin_dir = os.path.join(tmp_path, "bin")
+    os.makedirs(bin_dir)
+    _script(bin_dir, "assetfinder", ASSETFINDER)
+    _script(bin_dir, "whatweb", WHATWEB)
+    monkeypatch.setenv("PATH", bin_dir + os.pathsep + os.environ["PATH"])
+
+    ruta_resumen = os.path.join(tmp_path, "estado.json")
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida), contextlib.redirect_stderr(io.StringIO()):
+        codigo = cli.main(["uno.ejemplo", "dos.ejemplo", "caido.ejemplo", "-j", "2",
+                           "--sin-puertos", "--sin-tls", "--sin-cves", "--resumen", ruta_resumen])
+
+    resumen = json.loads(salida.getvalue())
+    with open(ruta_resumen) as f:
+        assert json.load(f) == resumen
+    assert codigo == 1
+    assert (resumen["total"], resumen["correctos"], resumen["fallidos"]) == (3, 2, 1)
+    estados = {e["dominio"]: e for e in resumen["dominios"]}
+    assert [e["dominio"] for e in resumen["dominios"]] == ["uno.ejemplo", "dos.ejemplo", "caido.ejemplo"]
+    assert estados["caido.ejemplo"]["estado"] == "error"
+    for dominio in ("uno.ejemplo", "dos.ejemplo"):
+        assert estados[dominio]["estado"] == "ok"
+        assert estados[dominio]["resultados"] == 1
+        with open(os.path.join(analyzer.RESULTADOS_DIR, dominio, "riesgo.json")) as f:
+            assert json.load(f)[0]["subdominio"] == f"http://www.{dominio}"
+        assert os.path.getsize(estados[dominio]["log"]) > 0
+    print("✅ Lote de dominios analizado en paralelo con resumen JSON")
+
+
+def test_cli_opciones_de_escaneo(monkeypatch):
+    """--escaner y --progresivo llegan a analizar_dominio como el resto de modos."""
+    recibidos = []
+    monkeypatch.setattr(cli, "analizar_lote",
+                        lambda dominios, opciones, parametros, paralelo: recibidos.append(parametros) or [])
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.main(["ejemplo.com"])
+        cli.main(["ejemplo.com", "--escaner", "tcp", "--progresivo"])
+    assert [(p["escaner_puertos"], p["progresivo"]) for p in recibidos] == [
+        (analyzer.ESCANER_PUERTOS, False), ("tcp", True)]
+    with pytest.raises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+        cli.main(["ejemplo.com", "--escaner", "masscan"])
+    print("✅ Escáner y escaneo progresivo elegidos desde la línea de comandos")
+
+
+class ServidorNVDRegistro(BaseHTTPRequestHandler):
+    """Responde siempre 200 y anota la hora de llegada de cada petición."""
+
+    protocol_version = "HTTP/1.1"
+    llegadas = []
+
+    def do_GET(self):
+        self.llegadas.append(time.monotonic())
+        datos = b'{"vulnerabilities": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_cli_limite_nvd_compartido(monkeypatch, tmp_path):
+    """Con -j 2 el total de peticiones a la NVD respeta un único límite."""
+    limite, periodo = 2, 0.5
+    ServidorNVDRegistro.llegadas = []
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorNVDRegistro)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    def analizar_consultando_nvd(dominio, opciones, **parametros):
+        for i in range(3):
+            analyzer.cliente_nvd.consultar({"keywordSearch": f"{dominio}-{i}"})
+        return []
+
+    monkeypatch.setattr(analyzer, "RESULTADOS_DIR", str(tmp_path))
+    monkeypatch.setattr(analyzer, "cliente_nvd", ClienteNVD(f"http://127.0.0.1:{servidor.server_port}/",
+                                                            api_key="", limite=limite, periodo=periodo))
+    monkeypatch.setattr(analyzer, "analizar_dominio", analizar_consultando_nvd)
+    try:
+        with contextlib.redirect_stderr(io.StringIO()):
+            cli.analizar_lote(["uno.ejemplo", "dos.ejemplo"], {}, {}, paralelo=2)
+        llegadas = sorted(ServidorNVDRegistro.llegadas)
+        assert len(llegadas) == 6
+        # Margen por la latencia entre adquirir la ventana y llegar al servidor
+        assert all(llegadas[i] - llegadas[i - limite] >= periodo - 0.05 for i in range(limite, len(llegadas)))
+        print(f"✅ {len(llegadas)} peticiones de 2 procesos dentro de {limite} cada {periodo}s")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_cli_sin_interfaz_grafica():
+    """Importar el modo CLI no carga tkinter, matplotlib ni reportlab."""
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    codigo = ("import sys; import app.cli; "
+              "print(sorted(m for m in sys.modules if m.split('.')[0] in "
+              "('tkinter', '_tkinter', 'matplotlib', 'reportlab')))")
+    salida = subprocess.check_output([sys.executable, "-c", codigo], cwd=raiz, text=True)
+    assert salida.strip() == "[]"
+    print("✅ El modo CLI no importa módulos gráficos")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
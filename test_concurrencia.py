@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test del sondeo concurrente de hosts en analizar_dominio.
+
+Verifica que el modo con pool de hilos genere exactamente los mismos
+archivos (riesgo.json, resumen.json, metadata.json) que el modo secuencial.
+Las sondas de red se sustituyen por funciones deterministas, por lo que
+el test no necesita nmap, curl ni conexión a Internet.
+"""
+
+import os
+import sys
+import json
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+TECNOLOGIAS = [
+    {"target": "http://a.ejemplo.com", "plugins": {"Apache": {}, "PHP": {}, "Title": {}}},
+    {"target": "http://b.ejemplo.com", "plugins": {"nginx": {}}},
+    {"target": "http://c.ejemplo.com", "plugins": {"WordPress": {}, "MySQL": {}}},
+    {"target": "http://d.ejemplo.com", "plugins": {"IIS": {}}},
+]
+
+
+def _escribir_whatweb(ruta):
+    """Escribe un tecnologias.json con el formato de array de WhatWeb."""
+    with open(ruta, "w") as f:
+        f.write("[\n")
+        f.write("\n,\n".join(json.dumps(t) for t in TECNOLOGIAS))
+        f.write("\n]\n")
+
+
+def _puertos_falsos(url, ip=None, escaner=None, progresivo=None):
+    time.sleep(0.05)
+    if "b." in url:
+        return ["No hay puertos abiertos"]
+    return ["80/tcp open http", "443/tcp open https"]
+
+
+def _analizar(simular, carpeta_base, concurrencia):
+    """Ejecuta analizar_dominio con sondas simuladas y devuelve los archivos generados."""
+    whatweb = os.path.join(carpeta_base, "tecnologias.json")
+    _escribir_whatweb(whatweb)
+    simular(RESULTADOS_DIR=os.path.join(carpeta_base, f"resultados_{concurrencia}"),
+            ejecutar_whatweb=lambda subdominios, dominio: whatweb,
+            escanear_puertos_nmap=_puertos_falsos,
+            obtener_activos=lambda: [{"nombre": "c.ejemplo.com", "valor": 4.0}])
+
+    opciones = {"subdominios": False, "tecnologias": True, "puertos": True, "tls": True, "cves": True}
+    analyzer.analizar_dominio("ejemplo.com", opciones, concurrencia=concurrencia,
+                              puertos_en_lote=False)
+    carpeta = os.path.join(analyzer.RESULTADOS_DIR, "ejemplo.com")
+    archivos = {}
+    for nombre in ("riesgo.json", "resumen.json", "metadata.json", "errores.log"):
+        ruta = os.path.join(carpeta, nombre)
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                archivos[nombre] = f.read()
+    if "metadata.json" in archivos:
+        # Idéntico salvo las fechas del análisis
+        metadata = json.loads(archivos["metadata.json"])
+        assert metadata.pop("fecha_inicio") <= metadata.pop("fecha_fin")
+        archivos["metadata.json"] = metadata
+    return archivos
+
+
+def test_concurrencia_salida_identica(analyzer_simulado, tmp_path):
+    """El modo concurrente produce archivos byte a byte idénticos al secuencial."""
+    secuencial = _analizar(analyzer_simulado, str(tmp_path), 1)
+    concurrente = _analizar(analyzer_simulado, str(tmp_path), 4)
+    assert secuencial.keys() == concurrente.keys()
+    for nombre in secuencial:
+        assert secuencial[nombre] == concurrente[nombre], f"{nombre} difiere"
+
+    metadata = concurrente["metadata.json"]
+    assert metadata["estadisticas_puertos"]["total_puertos_detectados"] == 6
+    assert metadata["estadisticas_puertos"]["hosts_con_puertos"] == 3
+    assert metadata["estadisticas_puertos"]["total_hosts_escaneados"] == 4
+    print("✅ Salida idéntica en modo secuencial y concurrente")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test de la correspondencia tecnología -> CPE y de los rangos de versiones
+(app/cpe.py) sobre un espejo NVD local temporal.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+from app.cpe import IndiceCPE, comparar_versiones, version_en_rango, mas_graves
+from app.nvd_offline import EspejoNVD
+
+
+def _cve(cve_id, score, criteria, **rango):
+    match = {"vulnerable": True, "criteria": criteria}
+    match.update(rango)
+    return {"cve": {
+        "id": cve_id,
+        "published": "2020-01-01T00:00:00",
+        "descriptions": [{"lang": "en", "value": "PHP issue."}],
+        "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": score}}]},
+        "configurations": [{"nodes": [{"cpeMatch": [match]}]}],
+    }}
+
+FEED = {"vulnerabilities": [
+    _cve("CVE-A", 9.8, "cpe:2.3:a:php:php:*:*:*:*:*:*:*:*", versionStartIncluding="8.2.0", versionEndExcluding="8.2.29"),
+    _cve("CVE-B", 7.5, "cpe:2.3:a:php:php:*:*:*:*:*:*:*:*", versionEndIncluding="7.4.33"),
+    _cve("CVE-C", 5.3, "cpe:2.3:a:php:php:8.2.28:*:*:*:*:*:*:*"),
+    _cve("CVE-D", 6.1, "cpe:2.3:a:acme:portal:*:*:*:*:*:*:*:*"),
+]}
+
+
+def test_comparar_versiones():
+    """Comparación numérica, letras de parche y prelanzamientos."""
+    assert comparar_versiones("8.2.10", "8.2.9") == 1
+    assert comparar_versiones("1.0", "1.0.0") == 0
+    assert comparar_versiones("1.0.2k", "1.0.2") == 1
+    assert comparar_versiones("2.0.0-rc1", "2.0.0") == -1
+    assert version_en_rango("8.2.28", "*", inicio_incl="8.2.0", fin_excl="8.2.29")
+    assert not version_en_rango("8.2.29", "*", inicio_incl="8.2.0", fin_excl="8.2.29")
+    assert version_en_rango(None, "*", fin_incl="1.0")
+    print("✅ Comparación de versiones correcta")
+
+
+def test_cpe_por_version():
+    """Solo se devuelven los CVEs cuyo rango cubre la versión detectada."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        feed = os.path.join(carpeta, "feed.json")
+        with open(feed, "w") as f:
+            json.dump(FEED, f)
+        espejo = EspejoNVD(os.path.join(carpeta, "nvd.sqlite"))
+        espejo.importar_feed(feed)
+
+        indice = IndiceCPE(espejo)
+        assert indice.cpe_para("PHP", "8.2.28") == "cpe:2.3:a:php:php:8.2.28"
+        assert indice.cpe_para("OpenSSL", "1.0.2k-fips") == "cpe:2.3:a:openssl:openssl:1.0.2k"
+        # La versión de Apache-Coyote es la del conector, no la de Tomcat:
+        # sin versión utilizable no hay CPE (se busca por palabra clave)
+        assert indice.buscar("Apache-Coyote") is None
+        assert indice.cpe_para("Apache-Coyote", "1.1") is None
+        assert indice.cpe_para("PHP") is None
+        # Productos aprendidos del espejo local
+        assert indice.cpe_para("Portal", "2.0") == "cpe:2.3:a:acme:portal:2.0"
+        assert indice.cpe_para("Title") is None
+
+        ids = [v["cve"]["id"] for v in espejo.buscar_cpe("php", "php", "8.2.28")]
+        assert sorted(ids) == ["CVE-A", "CVE-C"]
+        ids = [v["cve"]["id"] for v in espejo.buscar_cpe("php", "php", "7.4.0")]
+        assert ids == ["CVE-B"]
+        graves = mas_graves(espejo.buscar_cpe("php", "php"), 2)
+        assert [v["cve"]["id"] for v in graves] == ["CVE-A", "CVE-B"]
+        print("✅ CVEs filtrados por CPE y versión")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_consultas_de_plugins():
+    """Sin versión se busca por palabra clave; un CPE repetido en un host cuenta una vez."""
+    plugins = {"PHP": {}, "X-Powered-By": {"string": ["PHP/8.1.2"]}, "Apache": {"version": ["2.4.41"]}}
+    assert analyzer._consulta_cve_plugin(plugins, "PHP") == "PHP"
+    assert analyzer._consulta_cve_plugin(plugins, "X-Powered-By") == "cpe:2.3:a:php:php:8.1.2"
+
+    plugins["PHP"] = {"version": ["8.1.2"]}
+    tecnologias = [(tech, analyzer._consulta_cve_plugin(plugins, tech)) for tech in plugins]
+    assert analyzer._sin_cpe_repetidos(tecnologias) == [
+        ("PHP", "cpe:2.3:a:php:php:8.1.2"), ("Apache", "cpe:2.3:a:apache:http_server:2.4.41")]
+    print("✅ Consultas de CVEs por plugin sin CPE sin versión ni repetidos")
+
+
+if __name__ == "__main__":
+    test_comparar_versiones()
+    test_cpe_por_version()
+    test_consultas_de_plugins()
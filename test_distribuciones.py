@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test de las distribuciones del dashboard (app/distribuciones.py).
+
+Compara los agregados vectorizados con NumPy sobre las columnas del almacén
+de resultados con un recuento directo de los hallazgos de ejemplo, y
+comprueba un dominio con decenas de miles de hallazgos, la cache por
+análisis y la consulta de solo lectura del dashboard.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import distribuciones
+from app.almacen_resultados import AlmacenResultados, consultar_dominio
+from app.distribuciones import calcular_distribuciones, columnas_escaneo
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+MUESTRA = os.path.join(RAIZ, "resultados", "marfishecuador.com")
+
+
+def _almacen(filas):
+    """Almacén en memoria con un análisis de las filas dadas."""
+    almacen = AlmacenResultados(":memory:")
+    return almacen, almacen.guardar_escaneo("ejemplo.com", filas)
+
+
+def _esperado(filas):
+    """Recuento directo, hallazgo por hallazgo."""
+    niveles = {"Bajo": 0, "Medio": 0, "Alto": 0, "Crítico": 0}
+    severidades = {"Ninguno": 0, "Bajo": 0, "Medio": 0, "Alto": 0, "Crítico": 0}
+    histograma = [0] * 10
+    subdominios = {}
+    for fila in filas:
+        riesgo, cvss = fila["riesgo"], fila["cvss_max"]
+        niveles["Crítico" if riesgo >= 80 else "Alto" if riesgo >= 50 else "Medio" if riesgo >= 25 else "Bajo"] += 1
+        severidades["Crítico" if cvss >= 9 else "Alto" if cvss >= 7 else "Medio" if cvss >= 4
+                    else "Bajo" if cvss >= 0.1 else "Ninguno"] += 1
+        histograma[min(int(riesgo // 12.5), 9)] += 1
+        subdominios.setdefault(fila["subdominio"], []).append(riesgo)
+    por_subdominio = {s: (max(r), round(sum(r) / len(r), 2), len(r)) for s, r in subdominios.items()}
+    return niveles, severidades, histograma, por_subdominio
+
+
+def test_distribuciones_reales():
+    """Niveles, severidades, histograma y riesgo por subdominio coinciden con el recuento directo."""
+    with open(os.path.join(MUESTRA, "riesgo.json")) as f:
+        filas = json.load(f)
+    almacen, escaneo_id = _almacen(filas)
+    resultado = calcular_distribuciones(columnas_escaneo(almacen._conexion(), escaneo_id), top=1000)
+    niveles, severidades, histograma, por_subdominio = _esperado(filas)
+
+    assert resultado["total"] == len(filas)
+    assert resultado["niveles_riesgo"] == niveles
+    assert resultado["niveles_cvss"] == severidades
+    assert resultado["histograma_riesgo"]["conteos"] == histograma
+    assert resultado["histograma_riesgo"]["bordes"][-1] == 125
+    assert {s["subdominio"]: (s["riesgo_max"], s["riesgo_promedio"], s["hallazgos"])
+            for s in resultado["riesgo_por_subdominio"]} == por_subdominio
+    maximos = [s["riesgo_max"] for s in resultado["riesgo_por_subdominio"]]
+    assert maximos == sorted(maximos, reverse=True)
+    vacio = almacen.guardar_escaneo("vacio.com", [])
+    assert calcular_distribuciones(columnas_escaneo(almacen._conexion(), vacio))["riesgo_por_subdominio"] == []
+    almacen.cerrar()
+    print(f"✅ Distribuciones reales de {len(filas)} hallazgos")
+
+
+def test_muchos_hallazgos():
+    """50.000 hallazgos en 2.000 subdominios se agregan de forma interactiva."""
+    aleatorio = random.Random(7)
+    filas = [{"subdominio": f"https://h{aleatorio.randrange(2000)}.ejemplo.com",
+              "riesgo": aleatorio.choice([2, 8, 18, 32, 48, 64, 80, 100, 125]),
+              "cvss_max": round(aleatorio.uniform(0, 10), 1)} for _ in range(50000)]
+    almacen, escaneo_id = _almacen(filas)
+    inicio = time.perf_counter()
+    resultado = calcular_distribuciones(columnas_escaneo(almacen._conexion(), escaneo_id))
+    duracion = time.perf_counter() - inicio
+    almacen.cerrar()
+
+    niveles, severidades, _, por_subdominio = _esperado(filas)
+    assert resultado["niveles_riesgo"] == niveles and resultado["niveles_cvss"] == severidades
+    assert len(resultado["riesgo_por_subdominio"]) == distribuciones.TOP_SUBDOMINIOS
+    for s in resultado["riesgo_por_subdominio"]:
+        assert (s["riesgo_max"], s["riesgo_promedio"], s["hallazgos"]) == por_subdominio[s["subdominio"]]
+    assert duracion < 2.0
+    print(f"✅ 50.000 hallazgos agregados en {duracion * 1000:.0f} ms")
+
+
+def test_cache_por_analisis():
+    """Cada análisis se calcula una vez aunque se abra el almacén de nuevo; uno nuevo se recalcula."""
+    carpeta = tempfile.mkdtemp()
+    original = distribuciones.columnas_escaneo
+    calculos = []
+
+    def contar(conexion, escaneo_id):
+        calculos.append(escaneo_id)
+        return original(conexion, escaneo_id)
+    try:
+        with open(os.path.join(MUESTRA, "riesgo.json")) as f:
+            filas = json.load(f)
+        ruta = os.path.join(carpeta, "resultados.sqlite")
+        escritura = AlmacenResultados(ruta)
+        primero = escritura.guardar_escaneo("ejemplo.com", filas)
+        distribuciones.columnas_escaneo = contar
+        for _ in range(3):
+            lectura = AlmacenResultados(ruta, solo_lectura=True)
+            assert lectura.distribuciones("ejemplo.com")["total"] == len(filas)
+            lectura.cerrar()
+        segundo = escritura.guardar_escaneo("ejemplo.com", filas[:5])
+        assert escritura.distribuciones("ejemplo.com")["total"] == 5
+        escritura.cerrar()
+        assert calculos == [primero, segundo]
+        print("✅ Distribuciones calculadas una vez por análisis")
+    finally:
+        distribuciones.columnas_escaneo = original
+        shutil.rmtree(carpeta)
+
+
+def test_consulta_del_dashboard():
+    """El dashboard consulta las distribuciones sin escribir en disco y ve los cambios de riesgo.json."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        dominio = os.path.join(carpeta, "ejemplo.com")
+        shutil.copytree(MUESTRA, dominio)
+        antes = sorted(os.listdir(dominio))
+        assert consultar_dominio("no_existe.com", "distribuciones", carpeta) is None
+
+        with open(os.path.join(MUESTRA, "riesgo.json")) as f:
+            filas = json.load(f)
+        assert consultar_dominio("ejemplo.com", "distribuciones", carpeta)["total"] == len(filas)
+        with open(os.path.join(dominio, "riesgo.json"), "w") as f:
+            json.dump(filas[:5], f)
+        assert consultar_dominio("ejemplo.com", "distribuciones", carpeta)["total"] == 5
+        assert sorted(os.listdir(dominio)) == antes
+        assert sorted(os.listdir(carpeta)) == ["ejemplo.com"]
+        print("✅ Distribuciones consultadas sin escribir en disco")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_distribuciones_reales()
+    test_muchos_hallazgos()
+    test_cache_por_analisis()
+    test_consulta_del_dashboard()
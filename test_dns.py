@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test de la resolución DNS previa del análisis.
+
+Comprueba que los subdominios se resuelven en paralelo una sola vez
+(también los que no resuelven), que los que no resuelven no llegan a
+WhatWeb y que analizar_dominio no lanza sondas sobre hosts sin DNS.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+SIN_DNS = {"nx.ejemplo.com", "viejo.ejemplo.com"}
+
+
+def _resolver_lento(consultas):
+    """Resolución simulada de 0.1s; registra cada consulta."""
+    lock = threading.Lock()
+
+    def resolver(hostname):
+        with lock:
+            consultas.append(hostname)
+        time.sleep(0.1)
+        return [] if hostname in SIN_DNS else ["192.0.2.%d" % (len(hostname) % 250 + 1)]
+    return resolver
+
+
+def test_resolucion_en_lote_con_cache(monkeypatch):
+    """20 hosts se resuelven en paralelo y cada uno (también NXDOMAIN) una sola vez."""
+    consultas = []
+    monkeypatch.setattr(analyzer, "_resolver_direcciones", _resolver_lento(consultas))
+    cache = analyzer.CacheEndpoints()
+    hosts = [f"h{i}.ejemplo.com" for i in range(18)] + sorted(SIN_DNS)
+    inicio = time.monotonic()
+    direcciones = cache.resolver_lote(hosts + hosts[:5])
+    duracion = time.monotonic() - inicio
+
+    assert duracion < 1.0, f"resolución secuencial ({duracion:.2f}s)"
+    assert sorted(consultas) == sorted(hosts)
+    assert direcciones["nx.ejemplo.com"] == []
+    assert not cache.resoluble("nx.ejemplo.com")
+    assert cache.resolver("h1.ejemplo.com") is not None
+    assert len(consultas) == len(hosts)
+    print(f"✅ {len(hosts)} hosts resueltos en {duracion:.2f}s, negativos incluidos en cache")
+
+
+def test_filtrar_subdominios_resolubles(monkeypatch, tmp_path):
+    """Solo los subdominios que resuelven pasan a la entrada de WhatWeb."""
+    monkeypatch.setattr(analyzer, "_resolver_direcciones", _resolver_lento([]))
+    ruta = os.path.join(tmp_path, "subdominios.txt")
+    with open(ruta, "w") as f:
+        f.write("www.ejemplo.com\nnx.ejemplo.com\n\napi.ejemplo.com\nwww.ejemplo.com\n")
+    salida = analyzer.filtrar_subdominios(ruta, "ejemplo.com", analyzer.CacheEndpoints())
+    with open(salida) as f:
+        assert f.read().split() == ["www.ejemplo.com", "api.ejemplo.com"]
+    print("✅ Subdominios sin DNS descartados antes de WhatWeb")
+
+
+def test_sin_sondas_para_hosts_sin_dns(analyzer_simulado, tmp_path):
+    """Un host sin DNS no se sondea y conserva el resultado "DNS no resuelve"."""
+    sondeados = []
+    whatweb = os.path.join(tmp_path, "tecnologias.json")
+    with open(whatweb, "w") as f:
+        f.write(json.dumps({"target": "http://www.ejemplo.com", "plugins": {"nginx": {}}}) + "\n")
+        f.write(json.dumps({"target": "http://nx.ejemplo.com", "plugins": {"Apache": {}}}) + "\n")
+    analyzer_simulado(ejecutar_whatweb=lambda subdominios, dominio: whatweb,
+                      detectar_sistema_operativo=lambda url: sondeados.append(url) or "Linux",
+                      _resolver_direcciones=_resolver_lento([]))
+
+    opciones = {"subdominios": False, "tecnologias": True, "puertos": True, "tls": True, "cves": True}
+    resultados = analyzer.analizar_dominio("ejemplo.com", opciones, concurrencia=2,
+                                           puertos_en_lote=False)
+    assert sondeados == ["http://www.ejemplo.com"]
+    por_url = {r["subdominio"]: r for r in resultados}
+    assert por_url["http://nx.ejemplo.com"]["puertos"] == ["DNS no resuelve: nx.ejemplo.com"]
+    assert por_url["http://nx.ejemplo.com"]["sistema_operativo"] == "Desconocido"
+    assert por_url["http://www.ejemplo.com"]["puertos"] == ["80/tcp open http"]
+    print("✅ Hosts sin DNS omitidos en las sondas")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test del escaneo de puertos progresivo (barrido rápido + pasada profunda).
+
+Sustituye la ejecución de nmap por salidas XML de ejemplo: comprueba que
+la pasada con detección de versiones solo se lanza sobre los hosts con
+puertos abiertos y que los productos detectados se buscan como CVEs.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+XML_BARRIDO = """<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap">
+<host><status state="up"/><address addr="10.0.0.1" addrtype="ipv4"/>
+<ports><port protocol="tcp" portid="22"><state state="open"/><service name="ssh" method="table" conf="3"/></port>
+<port protocol="tcp" portid="80"><state state="open"/><service name="http" method="table" conf="3"/></port></ports></host>
+<host><status state="up"/><address addr="10.0.0.2" addrtype="ipv4"/>
+<ports><extraports state="closed" count="100"/></ports></host>
+</nmaprun>
+"""
+
+XML_PROFUNDO = """<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap">
+<host><status state="up"/><address addr="10.0.0.1" addrtype="ipv4"/>
+<ports><port protocol="tcp" portid="22"><state state="open"/>
+<service name="ssh" product="OpenSSH" version="8.2p1" extrainfo="Ubuntu" method="probed" conf="10"/></port>
+<port protocol="tcp" portid="80"><state state="open"/>
+<service name="http" product="nginx" version="1.18.0" method="probed" conf="10"/></port>
+<port protocol="tcp" portid="5432"><state state="open"/>
+<service name="postgresql" product="PostgreSQL DB" method="probed" conf="10"/></port></ports></host>
+</nmaprun>
+"""
+
+IPS = {"a.ejemplo.com": ["10.0.0.1"], "b.ejemplo.com": ["10.0.0.2"]}
+
+
+def _nmap_falso(llamadas):
+    def check_output(cmd, **kwargs):
+        llamadas.append(cmd)
+        return (XML_PROFUNDO if "-sV" in cmd else XML_BARRIDO).encode()
+    return check_output
+
+
+def test_pasada_profunda_solo_con_puertos_abiertos(monkeypatch):
+    """-sV solo sobre la IP con puertos abiertos; el resto conserva el barrido."""
+    llamadas = []
+    monkeypatch.setattr(analyzer.subprocess, "check_output", _nmap_falso(llamadas))
+    monkeypatch.setattr(analyzer, "_resolver_direcciones", lambda hostname: IPS.get(hostname, []))
+    monkeypatch.setattr(analyzer, "ESCANEO_PROGRESIVO", True)
+    resultado = analyzer.escanear_puertos_nmap_lote(["http://a.ejemplo.com", "http://b.ejemplo.com"])
+
+    assert len(llamadas) == 2
+    assert "-F" in llamadas[0] and llamadas[0][-2:] == ["10.0.0.1", "10.0.0.2"]
+    assert "-sV" in llamadas[1] and llamadas[1][-1] == "10.0.0.1" and "10.0.0.2" not in llamadas[1]
+    assert resultado["http://a.ejemplo.com"] == ["22/tcp open ssh OpenSSH 8.2p1", "80/tcp open http nginx 1.18.0",
+                                                 "5432/tcp open postgresql PostgreSQL DB"]
+    assert resultado["http://b.ejemplo.com"] == ["No hay puertos abiertos"]
+    assert analyzer.servicios_con_version(resultado["http://a.ejemplo.com"])[0] == ("OpenSSH", "cpe:2.3:a:openbsd:openssh:8.2p1")
+    print("✅ Detección de versiones solo en hosts con puertos abiertos")
+
+
+def test_versiones_de_servicios_en_cves(analyzer_simulado, tmp_path):
+    """Los productos de los puertos se analizan como tecnologías con su consulta de CVEs."""
+    consultas = []
+    whatweb = os.path.join(tmp_path, "tecnologias.json")
+    with open(whatweb, "w") as f:
+        f.write(json.dumps({"target": "http://a.ejemplo.com", "plugins": {"nginx": {"version": ["1.18.0"]}}}) + "\n")
+    analyzer_simulado(
+        ejecutar_whatweb=lambda subdominios, dominio: whatweb,
+        escanear_puertos_nmap_lote=lambda urls, cache=None, escaner=None, progresivo=None: {
+            u: ["22/tcp open ssh OpenSSH 8.2p1", "80/tcp open http nginx 1.18.0"] for u in urls},
+        buscar_cves_consulta=lambda consulta, backend=None: consultas.append(consulta) or [],
+        _resolver_direcciones=lambda hostname: IPS.get(hostname, []))
+
+    opciones = {"subdominios": False, "tecnologias": True, "puertos": True, "tls": True, "cves": True}
+    resultados = analyzer.analizar_dominio("ejemplo.com", opciones, concurrencia=1)
+    assert [r["tecnologia"] for r in resultados] == ["nginx", "OpenSSH"]
+    assert any("openssh" in c.lower() and "8.2p1" in c for c in consultas)
+    print("✅ Versiones de servicios incluidas en la búsqueda de CVEs")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test del escáner TCP connect integrado (app/escaner_tcp.py).
+
+Abre sockets en escucha en 127.0.0.1 y comprueba que solo esos puertos se
+informan como abiertos, con el formato de nmap, que el timeout se adapta
+al RTT medido y que analyzer lo usa cuando nmap no está instalado.
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer, escaner_tcp
+from app.escaner_tcp import TiempoRespuesta, escanear_tcp, lineas_puertos
+
+
+def _escuchar(n):
+    """n sockets en escucha y un puerto libre (cerrado)."""
+    sockets = []
+    for _ in range(n):
+        s = socket.socket()
+        s.bind(("127.0.0.1", 0))
+        s.listen(16)
+        sockets.append(s)
+    with socket.socket() as libre:
+        libre.bind(("127.0.0.1", 0))
+        cerrado = libre.getsockname()[1]
+    return sockets, [s.getsockname()[1] for s in sockets], cerrado
+
+
+def test_escaneo_sockets_locales():
+    """Solo los puertos en escucha aparecen abiertos, con el formato de nmap."""
+    sockets, abiertos, cerrado = _escuchar(3)
+    try:
+        resultado = escanear_tcp(["127.0.0.1"], puertos=abiertos + [cerrado], por_host=2)
+        assert resultado == {"127.0.0.1": sorted(abiertos)}
+        assert lineas_puertos([443, 22, 12345]) == ["22/tcp open ssh", "443/tcp open https",
+                                                    "12345/tcp open unknown"]
+        assert len(escaner_tcp.PUERTOS_RAPIDOS) == 100
+        print(f"✅ Puertos abiertos detectados: {sorted(abiertos)}")
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def test_timeout_adaptativo():
+    """El timeout parte del inicial y converge al RTT medido, acotado."""
+    tiempo = TiempoRespuesta()
+    assert tiempo.timeout == escaner_tcp.TIMEOUT_INICIAL
+    for _ in range(20):
+        tiempo.registrar(0.001)
+    assert tiempo.timeout == escaner_tcp.TIMEOUT_MINIMO
+    for _ in range(20):
+        tiempo.registrar(10)
+    assert tiempo.timeout == escaner_tcp.TIMEOUT_MAXIMO
+    print("✅ Timeout adaptativo acotado")
+
+
+def test_analyzer_sin_nmap():
+    """Sin nmap en PATH el escaneo usa el escáner integrado (individual y en lote)."""
+    sockets, abiertos, _ = _escuchar(1)
+    puertos_originales = escaner_tcp.PUERTOS_RAPIDOS
+    path_original = os.environ["PATH"]
+    escaner_tcp.PUERTOS_RAPIDOS = {abiertos[0]: "http"}
+    try:
+        os.environ["PATH"] = tempfile.gettempdir()
+        esperado = [f"{abiertos[0]}/tcp open http"]
+        assert analyzer.escanear_puertos_nmap("http://localhost", ip="127.0.0.1") == esperado
+        cache = analyzer.CacheEndpoints()
+        cache.obtener(("dns", "localhost"), lambda: ["127.0.0.1"])
+        assert analyzer.escanear_puertos_nmap_lote(["http://localhost"], cache) == {"http://localhost": esperado}
+        print("✅ Escáner TCP integrado como alternativa a nmap")
+    finally:
+        os.environ["PATH"] = path_original
+        escaner_tcp.PUERTOS_RAPIDOS = puertos_originales
+        for s in sockets:
+            s.close()
+
+
+class _EscritorFalso:
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+def test_muchos_hosts_con_limite_global():
+    """
+    Con más hosts de los que caben en el límite global, el plazo de cada
+    host no corre mientras espera turno: ninguno expira.
+    """
+    conexiones_abiertas = []
+
+    async def conexion_lenta(ip, puerto):
+        conexiones_abiertas.append(ip)
+        await asyncio.sleep(0.3)
+        return None, _EscritorFalso()
+
+    ips = [f"10.0.0.{i}" for i in range(1, 7)]
+    puertos = list(range(1000, 1020))
+    original = escaner_tcp.asyncio.open_connection
+    escaner_tcp.asyncio.open_connection = conexion_lenta
+    try:
+        inicio = time.monotonic()
+        resultado = escanear_tcp(ips, puertos=puertos, conexiones=10, timeout_host=1.5)
+        duracion = time.monotonic() - inicio
+    finally:
+        escaner_tcp.asyncio.open_connection = original
+    assert resultado == {ip: puertos for ip in ips}
+    assert len(conexiones_abiertas) == len(ips) * len(puertos)
+    assert escaner_tcp.hosts_simultaneos(10, 64, 20) == 1
+    assert escaner_tcp.hosts_simultaneos(256, 64, 100) == 4
+    print(f"✅ {len(ips)} hosts sin timeout con 10 conexiones globales ({duracion:.1f}s)")
+
+
+if __name__ == "__main__":
+    test_escaneo_sockets_locales()
+    test_timeout_adaptativo()
+    test_analyzer_sin_nmap()
+    test_muchos_hosts_con_limite_global()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test del filtrado de subdominios entre AssetFinder y WhatWeb
+(app/filtro_subdominios.py).
+
+Usa un DNS simulado con una zona comodín (*.dev.ejemplo.com) para
+comprobar normalización, deduplicación, alcance, exclusiones y la
+agrupación de hosts comodín en un único representante.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.filtro_subdominios import FiltroSubdominios, cargar_exclusiones, normalizar_subdominio
+
+REGISTROS = {
+    "ejemplo.com": ["203.0.113.1"],
+    "www.ejemplo.com": ["203.0.113.1"],
+    "api.ejemplo.com": ["203.0.113.2"],
+    "admin.ejemplo.com": ["203.0.113.3"],
+    # Registro real dentro de la zona comodín
+    "app.dev.ejemplo.com": ["203.0.113.9"],
+}
+COMODIN = {"dev.ejemplo.com": ["198.51.100.7", "198.51.100.8"]}
+
+
+def dns_falso(consultas):
+    def direcciones(hostname):
+        consultas.append(hostname)
+        if hostname in REGISTROS:
+            return REGISTROS[hostname]
+        zona = hostname.split(".", 1)[1] if "." in hostname else ""
+        return COMODIN.get(zona, [])
+    return direcciones
+
+
+def test_normalizar_subdominio():
+    """Esquema, puerto, ruta, "*.", mayúsculas y punto final se eliminan."""
+    assert normalizar_subdominio("  WWW.Ejemplo.COM.\n") == "www.ejemplo.com"
+    assert normalizar_subdominio("https://api.ejemplo.com:8443/login") == "api.ejemplo.com"
+    assert normalizar_subdominio("*.dev.ejemplo.com") == "dev.ejemplo.com"
+    assert normalizar_subdominio("café.ejemplo.com") == "xn--caf-dma.ejemplo.com"
+    assert normalizar_subdominio("no válido con espacios") is None
+    assert normalizar_subdominio("-malo.ejemplo.com") is None
+    print("✅ Normalización de la salida de AssetFinder")
+
+
+def test_filtro_alcance_y_comodin():
+    """Solo hosts en alcance, con DNS, sin duplicados y un representante por comodín."""
+    consultas = []
+    filtro = FiltroSubdominios("ejemplo.com", dns_falso(consultas), excluir=["admin.*"])
+    lineas = [
+        "www.ejemplo.com", "WWW.ejemplo.com.", "ejemplo.com",
+        "api.ejemplo.com", "admin.ejemplo.com",
+        "ejemplo.com.evil.net", "otro.org", "%%%",
+        "nx.ejemplo.com",
+        "a.dev.ejemplo.com", "b.dev.ejemplo.com", "c.dev.ejemplo.com",
+        "app.dev.ejemplo.com",
+    ]
+    admitidos = filtro.filtrar(lineas)
+
+    assert admitidos == ["www.ejemplo.com", "ejemplo.com", "api.ejemplo.com",
+                         "a.dev.ejemplo.com", "app.dev.ejemplo.com"]
+    assert filtro.descartados == {"invalidos": 1, "duplicados": 1, "fuera_de_alcance": 3,
+                                  "sin_dns": 1, "comodin": 2}
+    # Zonas sondeadas una sola vez cada una
+    sondas = [c for c in consultas if c.startswith("secureval-")]
+    assert len(sondas) == 2 * len({c.split(".", 1)[1] for c in sondas})
+    print(f"✅ Filtro de subdominios (descartados: {filtro.resumen()})")
+
+
+def test_exclusiones_por_dominio():
+    """fuera_de_alcance.txt añade patrones; se ignoran comentarios."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(carpeta, "fuera_de_alcance.txt"), "w") as f:
+            f.write("# terceros\nAPI.ejemplo.com\n\n*.dev.ejemplo.com\n")
+        excluir = cargar_exclusiones(carpeta)
+        assert excluir == ["api.ejemplo.com", "*.dev.ejemplo.com"]
+        filtro = FiltroSubdominios("ejemplo.com", dns_falso([]), excluir)
+        assert filtro.filtrar(["api.ejemplo.com", "app.dev.ejemplo.com", "www.ejemplo.com"]) == ["www.ejemplo.com"]
+        assert cargar_exclusiones(os.path.join(carpeta, "no_existe")) == []
+        print("✅ Exclusiones de alcance por dominio")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_normalizar_subdominio()
+    test_filtro_alcance_y_comodin()
+    test_exclusiones_por_dominio()
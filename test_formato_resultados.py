@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test del formato normalizado de los resultados (app/formato_resultados.py).
+
+Comprueba que los datos de cada host se guardan una sola vez, que la vista
+de compatibilidad reproduce exactamente las filas, que riesgo.json sigue
+siendo una lista de filas y que se leen ambos formatos.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.formato_resultados import (cargar_resultados, expandir_resultados, guardar_normalizado, guardar_resultados,
+                                    normalizar_resultados)
+
+PUERTOS = ["22/tcp open ssh", "80/tcp open http", "443/tcp open https"]
+TLS = {"tls_version": "TLSv1.3", "cifrado": "TLS_AES_256_GCM_SHA384", "valido_hasta": "Jan  1 00:00:00 2030 GMT"}
+
+
+def _fila(subdominio, tecnologia, puertos=PUERTOS, riesgo=12):
+    return {"subdominio": subdominio, "tecnologia": tecnologia, "tipo_servicio": "Web",
+            "sistema_operativo": "Linux", "puertos": puertos, "tls": TLS,
+            "cvss_max": 5.3, "valor_activo": 4, "probabilidad": 3, "vulnerabilidad": 1,
+            "riesgo": riesgo, "criticidad": "Medio", "cves": ["CVE-2023-0001"]}
+
+
+def test_datos_de_host_una_sola_vez():
+    """Ocho tecnologías de un host guardan sus puertos y TLS una vez."""
+    filas = [_fila("https://www.ejemplo.com", f"tec{i}") for i in range(8)] + [_fila("https://api.ejemplo.com", "nginx")]
+    normalizado = normalizar_resultados(filas)
+    assert list(normalizado["hosts"]) == ["https://www.ejemplo.com", "https://api.ejemplo.com"]
+    assert normalizado["hosts"]["https://api.ejemplo.com"] == {"sistema_operativo": "Linux", "puertos": PUERTOS, "tls": TLS}
+    assert all("puertos" not in h and "tls" not in h for h in normalizado["hallazgos"])
+
+    expandido = expandir_resultados(json.loads(json.dumps(normalizado)))
+    assert json.dumps(expandido) == json.dumps(filas)
+    assert len(json.dumps(normalizado, indent=4)) < len(json.dumps(filas, indent=4)) * 3 / 4
+    print("✅ Datos de host guardados una sola vez")
+
+
+def test_filas_con_datos_de_host_distintos():
+    """Si una fila difiere de su host (archivos antiguos) se conserva en el hallazgo."""
+    filas = [_fila("https://www.ejemplo.com", "nginx"),
+             _fila("https://www.ejemplo.com", "PHP", puertos=PUERTOS[:1])]
+    normalizado = normalizar_resultados(filas)
+    assert normalizado["hallazgos"][1]["puertos"] == PUERTOS[:1]
+    assert expandir_resultados(normalizado) == filas
+    assert expandir_resultados(filas) is filas
+    assert expandir_resultados({"otro": 1}) is None
+    print("✅ Vista de compatibilidad sin pérdidas")
+
+
+def test_archivos_nuevos_y_antiguos():
+    """riesgo.json sigue siendo una lista; cargar_resultados lee ambos formatos y rechaza los desconocidos."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        filas = [_fila("https://www.ejemplo.com", "nginx")]
+        nuevo = os.path.join(carpeta, "riesgo_normalizado.json")
+        guardar_normalizado(nuevo, filas)
+        antiguo = os.path.join(carpeta, "riesgo.json")
+        guardar_resultados(antiguo, filas)
+        with open(antiguo) as f:
+            assert json.load(f) == filas
+        desconocido = os.path.join(carpeta, "desconocido.json")
+        with open(desconocido, "w") as f:
+            json.dump({"hosts": {}}, f)
+
+        assert cargar_resultados(nuevo) == filas
+        assert cargar_resultados(antiguo) == filas
+        try:
+            cargar_resultados(desconocido)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+        print("✅ Lectura de riesgo.json en ambos formatos")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_datos_de_host_una_sola_vez()
+    test_filas_con_datos_de_host_distintos()
+    test_archivos_nuevos_y_antiguos()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test del reescaneo incremental de analizar_dominio.
+
+Un segundo análisis con la misma salida de WhatWeb no debe sondear ningún
+host ni consultar CVEs; si cambia la huella de un host solo se sondea ese
+host, y el resultado es idéntico al de un análisis completo. Los hosts
+escaneados en otro modo de puertos (progresivo o no) se vuelven a sondear.
+Las sondas de red se sustituyen por funciones deterministas.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+TECNOLOGIAS = [
+    {"target": "http://a.ejemplo.com", "http_status": 200, "plugins": {"Apache": {"version": ["2.4.1"]}}},
+    {"target": "http://b.ejemplo.com", "http_status": 200, "plugins": {"nginx": {"version": ["1.18.0"]}}},
+    {"target": "http://c.ejemplo.com", "http_status": 200, "plugins": {"WordPress": {}}},
+]
+
+OPCIONES = {"subdominios": False, "tecnologias": True, "puertos": True, "tls": True, "cves": True}
+
+
+def _cve_falso(consulta):
+    return {"cve": {"id": f"CVE-2024-{len(consulta)}", "metrics": {
+        "cvssMetricV31": [{"cvssData": {"baseScore": 7.5}}]}}}
+
+
+def _analizar(simular, carpeta_base, nombre, tecnologias, **kwargs):
+    """Ejecuta analizar_dominio con sondas simuladas; devuelve (riesgo.json, llamadas)."""
+    llamadas = {"sondas": [], "cves": []}
+    carpeta = os.path.join(carpeta_base, nombre, "ejemplo.com")
+
+    def whatweb(subdominios, dominio):
+        ruta = os.path.join(carpeta, "tecnologias.json")
+        with open(ruta, "w") as f:
+            f.write("[\n" + "\n,\n".join(json.dumps(t) for t in tecnologias) + "\n]\n")
+        return ruta
+
+    def sistema_operativo(url):
+        llamadas["sondas"].append(url)
+        return "Linux"
+
+    def cves(consulta, backend=None):
+        llamadas["cves"].append(consulta)
+        return [_cve_falso(consulta)]
+
+    simular(RESULTADOS_DIR=os.path.join(carpeta_base, nombre), ejecutar_whatweb=whatweb,
+            detectar_sistema_operativo=sistema_operativo, buscar_cves_consulta=cves)
+    analyzer.analizar_dominio("ejemplo.com", dict(OPCIONES), concurrencia=1,
+                              puertos_en_lote=False, **kwargs)
+    with open(os.path.join(carpeta, "riesgo.json"), "rb") as f:
+        return f.read(), llamadas
+
+
+def test_reescaneo_sin_cambios(analyzer_simulado, tmp_path):
+    """Sin cambios en WhatWeb no se sondea ningún host ni se consultan CVEs."""
+    primero, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True)
+    assert len(llamadas["sondas"]) == 3
+
+    segundo, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True)
+    assert llamadas == {"sondas": [], "cves": []}
+    assert segundo == primero
+    print("✅ Reescaneo sin cambios: ningún host sondeado")
+
+
+def test_reescaneo_host_modificado(analyzer_simulado, tmp_path):
+    """Solo se sondea el host cuya huella cambió; la salida coincide con un análisis completo."""
+    _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True)
+    modificadas = [dict(t) for t in TECNOLOGIAS]
+    modificadas[1] = dict(modificadas[1], plugins={"nginx": {"version": ["1.25.3"]}})
+
+    incremental, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", modificadas, incremental=True)
+    assert llamadas["sondas"] == ["http://b.ejemplo.com"]
+    assert set(llamadas["cves"]) == {"cpe:2.3:a:f5:nginx:1.25.3"}
+
+    completo, _ = _analizar(analyzer_simulado, str(tmp_path), "completo", modificadas)
+    assert incremental == completo
+    print("✅ Solo el host modificado se vuelve a sondear")
+
+
+def test_reescaneo_fuera_de_ventana(analyzer_simulado, tmp_path):
+    """Los datos más antiguos que la ventana de vigencia no se reutilizan."""
+    _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True)
+    _, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True,
+                            ventana_incremental=-1)
+    assert len(llamadas["sondas"]) == 3
+    print("✅ Hosts fuera de la ventana de vigencia sondeados de nuevo")
+
+
+def test_reescaneo_otro_modo_de_puertos(analyzer_simulado, tmp_path):
+    """Los puertos de un análisis no progresivo no se reutilizan en uno progresivo, ni al revés."""
+    modos = []
+    analyzer_simulado(escanear_puertos_nmap=lambda url, ip=None, escaner=None, progresivo=None:
+                      modos.append(progresivo) or ["80/tcp open http"])
+    _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True)
+    _, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True, progresivo=True)
+    assert len(llamadas["sondas"]) == 3
+    _, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True, progresivo=True)
+    assert llamadas == {"sondas": [], "cves": []}
+    _, llamadas = _analizar(analyzer_simulado, str(tmp_path), "r", TECNOLOGIAS, incremental=True)
+    assert len(llamadas["sondas"]) == 3
+    assert modos == [False] * 3 + [True] * 3 + [False] * 3
+    print("✅ Hosts escaneados en otro modo de puertos sondeados de nuevo")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test de los indicadores comunes de un dominio (app/indicadores.py).
+
+Comprueba que los agregados por SQLite dan las mismas cifras que
+calculaban por su cuenta el dashboard, el módulo de tratamiento y el PDF,
+que se guardan con el análisis y no se vuelven a calcular al consultarlos,
+y que las pantallas los consultan sin escribir nada en disco.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import almacen_resultados
+from app.almacen_resultados import AlmacenResultados, consultar_dominio
+from app.indicadores import BANDAS_RIESGO, UMBRAL_SUBDOMINIO_ALTO
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+MUESTRA = os.path.join(RAIZ, "resultados", "marfishecuador.com")
+
+
+def _filas_muestra():
+    with open(os.path.join(MUESTRA, "riesgo.json")) as f:
+        return json.load(f)
+
+
+def test_mismas_cifras_que_los_calculos_anteriores():
+    """Bandas del PDF, criticidades y top de tecnologías de tratamiento, resumen por subdominio."""
+    datos = _filas_muestra()
+    almacen = AlmacenResultados(":memory:")
+    try:
+        assert almacen.indicadores("marfishecuador.com") is None
+        assert almacen.importar_json("marfishecuador.com", MUESTRA)
+        kpis = almacen.indicadores("marfishecuador.com")
+        almacen.guardar_escaneo("vacio.com", [])
+        assert almacen.indicadores("vacio.com")["riesgo_promedio"] == 0
+    finally:
+        almacen.cerrar()
+
+    assert kpis["total_hallazgos"] == len(datos)
+    assert kpis["por_banda"] == {
+        "bajo": sum(1 for r in datos if r["riesgo"] < 10),
+        "medio": sum(1 for r in datos if 10 <= r["riesgo"] < 25),
+        "mitigable": sum(1 for r in datos if 25 <= r["riesgo"] < 80),
+        "critico": sum(1 for r in datos if r["riesgo"] >= 80)}
+    assert abs(kpis["riesgo_promedio"] - sum(r["riesgo"] for r in datos) / len(datos)) < 1e-9
+    assert kpis["riesgo_max"] == max(r["riesgo"] for r in datos)
+    assert kpis["cvss_max"] == max(r["cvss_max"] for r in datos)
+
+    criticidades = {}
+    tech_riesgo = {}
+    for item in datos:
+        criticidades[item.get("criticidad", "Bajo")] = criticidades.get(item.get("criticidad", "Bajo"), 0) + 1
+        tech_riesgo.setdefault(item.get("tecnologia", "Desconocida"), []).append(item.get("riesgo", 0))
+    tech_promedio = {tech: sum(r) / len(r) for tech, r in tech_riesgo.items()}
+    assert kpis["por_criticidad"] == criticidades
+    esperado = sorted(tech_promedio.items(), key=lambda x: x[1], reverse=True)[:3]
+    assert [t[0] for t in kpis["top_tecnologias"][:3]] == [t[0] for t in esperado]
+    assert all(abs(t[1] - e[1]) < 1e-9 for t, e in zip(kpis["top_tecnologias"], esperado))
+
+    with open(os.path.join(MUESTRA, "resumen.json")) as f:
+        resumen = json.load(f)
+    assert list(kpis["por_subdominio"]) == list(resumen)
+    for subdominio, info in resumen.items():
+        propio = kpis["por_subdominio"][subdominio]
+        assert (propio["riesgo_max"], propio["riesgo_promedio"]) == (info["riesgo_max"], info["riesgo_promedio"])
+        assert (propio["total_tecnologias"], propio["total_cves"]) == (info["total_tecnologias"], info["total_cves"])
+    assert kpis["total_subdominios"] == len(resumen)
+    assert UMBRAL_SUBDOMINIO_ALTO == dict(BANDAS_RIESGO)["mitigable"]
+    assert kpis["subdominios_alto_riesgo"] == sum(1 for info in resumen.values() if info["riesgo_max"] >= 25)
+    print(f"✅ Indicadores agregados por SQLite ({kpis['total_hallazgos']} hallazgos)")
+
+
+def test_instantanea_guardada_con_el_analisis():
+    """Los indicadores se calculan al guardar el análisis y después solo se leen."""
+    almacen = AlmacenResultados(":memory:")
+    original = almacen_resultados.calcular_indicadores
+    try:
+        almacen.importar_json("marfishecuador.com", MUESTRA)
+        guardados = almacen.indicadores("marfishecuador.com")
+
+        def sin_recalcular(conexion, escaneo_id):
+            raise AssertionError("indicadores recalculados")
+        almacen_resultados.calcular_indicadores = sin_recalcular
+        assert almacen.indicadores("marfishecuador.com") == guardados
+        assert guardados == original(almacen._conexion(), almacen.ultimo_escaneo("marfishecuador.com")["id"])
+    finally:
+        almacen_resultados.calcular_indicadores = original
+        almacen.cerrar()
+    print("✅ Instantánea de indicadores guardada con el análisis")
+
+
+def test_consulta_sin_escribir():
+    """Las pantallas consultan los indicadores sin crear archivos y ven los cambios de riesgo.json."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        dominio = os.path.join(carpeta, "ejemplo.com")
+        shutil.copytree(MUESTRA, dominio)
+        antes = sorted(os.listdir(dominio))
+        assert consultar_dominio("no_existe.com", "indicadores", carpeta) is None
+
+        assert consultar_dominio("ejemplo.com", "indicadores", carpeta)["total_hallazgos"] == len(_filas_muestra())
+        with open(os.path.join(dominio, "riesgo.json"), "w") as f:
+            json.dump(_filas_muestra()[:5], f)
+        assert consultar_dominio("ejemplo.com", "indicadores", carpeta)["total_hallazgos"] == 5
+        assert sorted(os.listdir(dominio)) == antes
+        assert sorted(os.listdir(carpeta)) == ["ejemplo.com"]
+        print("✅ Indicadores consultados sin escribir en disco")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_mismas_cifras_que_los_calculos_anteriores()
+    test_instantanea_guardada_con_el_analisis()
+    test_consulta_sin_escribir()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test del lector incremental de WhatWeb (app/lector_whatweb.py).
+
+Cubre el formato array que genera --log-json, JSON por líneas, objetos en
+varias líneas, registros truncados y la lectura de un archivo que todavía
+se está escribiendo.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.lector_whatweb import leer_registros
+
+REGISTROS = [{"target": f"http://h{i}.ejemplo.com", "plugins": {"Apache": {}}} for i in range(3)]
+
+
+def _leer(contenido, **kwargs):
+    carpeta = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(carpeta, "tecnologias.json")
+        with open(ruta, "w") as f:
+            f.write(contenido)
+        return list(leer_registros(ruta, **kwargs))
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def _objetivos(eventos):
+    return [registro["target"] for _, registro, error in eventos if registro]
+
+
+def _errores(eventos):
+    return [(linea, error) for linea, _, error in eventos if error]
+
+
+def test_formato_array_sin_errores():
+    """El array de WhatWeb ('[', ',' y ']' en líneas propias) no genera errores."""
+    contenido = "[\n" + "\n,\n".join(json.dumps(r) for r in REGISTROS) + "\n]\n"
+    eventos = _leer(contenido)
+    assert _objetivos(eventos) == [r["target"] for r in REGISTROS]
+    assert _errores(eventos) == []
+    print("✅ Formato array de WhatWeb")
+
+
+def test_json_lineas_y_multilinea():
+    """JSON por líneas, varios objetos por línea y objetos con sangría."""
+    contenido = json.dumps(REGISTROS[0]) + "\n"
+    contenido += json.dumps(REGISTROS[1]) + "," + json.dumps(REGISTROS[2]) + "\n"
+    contenido += json.dumps({"target": "http://multi.ejemplo.com", "plugins": {"PHP": {"version": ["8.2"]}}}, indent=2) + "\n"
+    eventos = _leer(contenido)
+    assert _objetivos(eventos) == [r["target"] for r in REGISTROS] + ["http://multi.ejemplo.com"]
+    assert _errores(eventos) == []
+    print("✅ JSON por líneas y multilínea")
+
+
+def test_registros_corruptos():
+    """Un registro truncado o basura se informa y la lectura continúa."""
+    contenido = "[\n" + json.dumps(REGISTROS[0])[:30] + "\n,\n" + json.dumps(REGISTROS[1]) + "\n,\nbasura\n,\n"
+    contenido += json.dumps(REGISTROS[2])[:25]
+    eventos = _leer(contenido)
+    assert _objetivos(eventos) == [REGISTROS[1]["target"]]
+    errores = _errores(eventos)
+    assert [linea for linea, _ in errores] == [2, 6, 8]
+    print("✅ Registros corruptos informados sin detener la lectura")
+
+
+def test_seguir_archivo_en_escritura():
+    """Los registros se entregan mientras el archivo se sigue escribiendo."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(carpeta, "tecnologias.json")
+        open(ruta, "w").close()
+        terminado = threading.Event()
+        recibidos = []
+
+        def escribir():
+            with open(ruta, "a") as f:
+                f.write("[\n")
+                for i, registro in enumerate(REGISTROS):
+                    texto = json.dumps(registro)
+                    # Escribir la línea en dos partes para simular escrituras parciales
+                    f.write(texto[:10]); f.flush(); time.sleep(0.05)
+                    f.write(texto[10:] + "\n"); f.flush()
+                    if i < len(REGISTROS) - 1:
+                        f.write(",\n"); f.flush()
+                    time.sleep(0.05)
+                f.write("]\n")
+            terminado.set()
+
+        hilo = threading.Thread(target=escribir)
+        hilo.start()
+        for _, registro, error in leer_registros(ruta, seguir=lambda: not terminado.is_set(), intervalo=0.01):
+            assert error is None
+            recibidos.append((registro["target"], terminado.is_set()))
+        hilo.join()
+
+        assert [t for t, _ in recibidos] == [r["target"] for r in REGISTROS]
+        # El primer registro llegó antes de que WhatWeb terminara
+        assert recibidos[0][1] is False
+        print("✅ Lectura incremental de un archivo en escritura")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_formato_array_sin_errores()
+    test_json_lineas_y_multilinea()
+    test_registros_corruptos()
+    test_seguir_archivo_en_escritura()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test del escaneo de puertos en lote con salida XML de nmap.
+
+Usa una salida XML de ejemplo y sustituye la ejecución de nmap, por lo que
+no requiere nmap instalado ni acceso a la red.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+XML_NMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -T4 -F -oX - a.ejemplo.com b.ejemplo.com c.ejemplo.com">
+<host starttime="1" endtime="2"><status state="up" reason="syn-ack"/>
+<address addr="10.0.0.1" addrtype="ipv4"/>
+<hostnames><hostname name="a.ejemplo.com" type="user"/><hostname name="srv1.ejemplo.com" type="PTR"/></hostnames>
+<ports><extraports state="closed" count="97"/>
+<port protocol="tcp" portid="80"><state state="open" reason="syn-ack"/><service name="http" method="table" conf="3"/></port>
+<port protocol="tcp" portid="443"><state state="open" reason="syn-ack"/><service name="https" method="table" conf="3"/></port>
+<port protocol="tcp" portid="8080"><state state="filtered" reason="no-response"/><service name="http-proxy" method="table" conf="3"/></port>
+<port protocol="tcp" portid="2000"><state state="open" reason="syn-ack"/></port>
+</ports></host>
+<host starttime="1" endtime="2"><status state="up" reason="syn-ack"/>
+<address addr="10.0.0.2" addrtype="ipv4"/>
+<hostnames><hostname name="b.ejemplo.com" type="user"/></hostnames>
+<ports><extraports state="closed" count="100"/></ports></host>
+<host starttime="1" endtime="46" timedout="true"><status state="up" reason="syn-ack"/>
+<address addr="10.0.0.3" addrtype="ipv4"/>
+<hostnames><hostname name="c.ejemplo.com" type="user"/></hostnames>
+</host>
+<runstats><finished time="46"/><hosts up="3" down="0" total="3"/></runstats>
+</nmaprun>
+"""
+
+
+def test_parsear_xml_nmap():
+    """El parser XML extrae los puertos abiertos con el formato del escaneo individual."""
+    hosts = analyzer.parsear_xml_nmap(XML_NMAP)
+    assert hosts["a.ejemplo.com"]["puertos"] == ["80/tcp open http", "443/tcp open https", "2000/tcp open unknown"]
+    assert hosts["10.0.0.1"] is hosts["a.ejemplo.com"]
+    assert hosts["b.ejemplo.com"]["puertos"] == []
+    assert hosts["c.ejemplo.com"]["timeout"] is True
+    print("✅ XML de nmap interpretado correctamente")
+
+
+def test_escaneo_lote_mapea_urls():
+    """Una sola ejecución de nmap cubre cada IP una vez y se reparte por URL."""
+    llamadas = []
+
+    def check_output_falso(cmd, **kwargs):
+        llamadas.append(cmd)
+        return XML_NMAP.encode()
+
+    ips = {"a.ejemplo.com": "10.0.0.1", "www.ejemplo.com": "10.0.0.1",
+           "b.ejemplo.com": "10.0.0.2", "c.ejemplo.com": "10.0.0.3"}
+
+    def resolver_falso(hostname, puerto, *args, **kwargs):
+        if hostname not in ips:
+            raise analyzer.socket.gaierror("NXDOMAIN")
+        return [(analyzer.socket.AF_INET, analyzer.socket.SOCK_STREAM, 6, "", (ips[hostname], 0))]
+
+    originales = (analyzer.subprocess.check_output, analyzer.socket.getaddrinfo)
+    analyzer.subprocess.check_output = check_output_falso
+    analyzer.socket.getaddrinfo = resolver_falso
+    try:
+        urls = ["http://a.ejemplo.com", "https://a.ejemplo.com/login", "http://www.ejemplo.com", "http://b.ejemplo.com",
+                "http://c.ejemplo.com:8080", "http://nx.ejemplo.com"]
+        resultado = analyzer.escanear_puertos_nmap_lote(urls)
+    finally:
+        analyzer.subprocess.check_output, analyzer.socket.getaddrinfo = originales
+
+    assert len(llamadas) == 1
+    assert llamadas[0][-3:] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    assert resultado["http://a.ejemplo.com"] == ["80/tcp open http", "443/tcp open https", "2000/tcp open unknown"]
+    assert resultado["https://a.ejemplo.com/login"] == resultado["http://a.ejemplo.com"]
+    assert resultado["http://www.ejemplo.com"] == resultado["http://a.ejemplo.com"]
+    assert resultado["http://b.ejemplo.com"] == ["No hay puertos abiertos"]
+    assert resultado["http://c.ejemplo.com:8080"] == ["Timeout en escaneo (45s)"]
+    assert resultado["http://nx.ejemplo.com"] == ["DNS no resuelve: nx.ejemplo.com"]
+    print("✅ Escaneo en lote repartido por URL")
+
+
+def test_cache_endpoints_deduplica_por_ip():
+    """Puertos se sondean una vez por IP y TLS una vez por (IP, SNI)."""
+    llamadas_puertos = []
+    llamadas_tls = []
+
+    originales = (analyzer._resolver_direcciones, analyzer.escanear_puertos_nmap, analyzer.verificar_tls)
+    analyzer._resolver_direcciones = lambda hostname: ["10.0.0.1"]
+    analyzer.escanear_puertos_nmap = lambda url, ip=None, escaner=None, progresivo=None: llamadas_puertos.append(url) or ["80/tcp open http"]
+    analyzer.verificar_tls = lambda hostname, ip=None: llamadas_tls.append((hostname, ip)) or {"tls_version": "TLSv1.3"}
+    try:
+        cache = analyzer.CacheEndpoints()
+        urls = ["http://a.ejemplo.com", "https://a.ejemplo.com", "http://b.ejemplo.com"]
+        puertos = [cache.puertos(url) for url in urls]
+        tls = [cache.tls(url) for url in urls]
+    finally:
+        analyzer._resolver_direcciones, analyzer.escanear_puertos_nmap, analyzer.verificar_tls = originales
+
+    assert llamadas_puertos == ["http://a.ejemplo.com"]
+    assert puertos == [["80/tcp open http"]] * 3
+    assert llamadas_tls == [("a.ejemplo.com", "10.0.0.1"), ("b.ejemplo.com", "10.0.0.1")]
+    assert tls[0] == tls[1] == tls[2]
+    print("✅ Sondas deduplicadas por endpoint")
+
+
+if __name__ == "__main__":
+    test_parsear_xml_nmap()
+    test_escaneo_lote_mapea_urls()
+    test_cache_endpoints_deduplica_por_ip()
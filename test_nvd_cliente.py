@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test del cliente NVD (app/nvd_cliente.py) contra un servidor HTTP local.
+
+El servidor simula las respuestas de limitación de la NVD (403 y 429)
+antes de devolver resultados, sin salir a Internet.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.nvd_cliente import ClienteNVD, LimiteVentana
+
+
+class ServidorNVDSimulado(BaseHTTPRequestHandler):
+    """Responde 429, luego 403 y finalmente 200 para cada palabra clave."""
+
+    protocol_version = "HTTP/1.1"
+
+    retry_after = "0"
+    intentos = {}
+    conexiones = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        keyword = parse_qs(urlparse(self.path).query).get("keywordSearch", [""])[0]
+        with self.lock:
+            self.conexiones.add(self.client_address)
+            intento = self.intentos.get(keyword, 0)
+            self.intentos[keyword] = intento + 1
+
+        if intento == 0:
+            self._responder(429, {}, {"Retry-After": self.retry_after})
+        elif intento == 1:
+            self._responder(403, {})
+        else:
+            cuerpo = {"vulnerabilities": [{"cve": {"id": f"CVE-2024-{keyword}", "metrics": {}}}]}
+            self._responder(200, cuerpo)
+
+    def _responder(self, codigo, cuerpo, cabeceras=None):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorNVDPaginado(BaseHTTPRequestHandler):
+    """Reparte TOTAL_RESULTADOS CVEs en páginas según startIndex y resultsPerPage."""
+
+    TOTAL_RESULTADOS = 5
+    peticiones = []
+
+    def do_GET(self):
+        parametros = parse_qs(urlparse(self.path).query)
+        inicio = int(parametros["startIndex"][0])
+        por_pagina = int(parametros["resultsPerPage"][0])
+        self.peticiones.append(inicio)
+        fin = min(inicio + por_pagina, self.TOTAL_RESULTADOS)
+        cuerpo = {"totalResults": self.TOTAL_RESULTADOS, "startIndex": inicio,
+                  "vulnerabilities": [{"cve": {"id": f"CVE-2024-{i}", "metrics": {}}} for i in range(inicio, fin)]}
+        ServidorNVDSimulado._responder(self, 200, cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _keyword(keyword):
+    return {"keywordSearch": keyword, "resultsPerPage": 3}
+
+
+def _iniciar_servidor():
+    ServidorNVDSimulado.intentos = {}
+    ServidorNVDSimulado.conexiones = set()
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorNVDSimulado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def test_reintentos_ante_limitacion():
+    """Los 429/403 se reintentan y la consulta termina con éxito."""
+    servidor = _iniciar_servidor()
+    try:
+        cliente = ClienteNVD(f"http://127.0.0.1:{servidor.server_port}/", api_key="",
+                             limite=100, periodo=0.1, espera_reintento=0.01)
+        ok, datos = cliente.consultar(_keyword("1111"))
+        assert ok
+        assert datos[0]["cve"]["id"] == "CVE-2024-1111"
+        assert ServidorNVDSimulado.intentos["1111"] == 3
+
+        sin_reintentos = ClienteNVD(f"http://127.0.0.1:{servidor.server_port}/", api_key="",
+                                    limite=100, periodo=0.1, max_reintentos=0)
+        assert sin_reintentos.consultar(_keyword("2222")) == (False, [])
+        print("✅ Reintentos ante 403/429 correctos")
+    finally:
+        servidor.shutdown()
+
+
+def test_retry_after_una_sola_espera():
+    """Tras un 429 se espera lo que pide Retry-After, no además la ventana entera."""
+    servidor = _iniciar_servidor()
+    ServidorNVDSimulado.retry_after = "0.3"
+    try:
+        cliente = ClienteNVD(f"http://127.0.0.1:{servidor.server_port}/", api_key="",
+                             limite=100, periodo=1.0, espera_reintento=0.01)
+        inicio = time.monotonic()
+        ok, _ = cliente.consultar(_keyword("3333"))
+        duracion = time.monotonic() - inicio
+        assert ok
+        assert 0.3 <= duracion < 0.55
+        print(f"✅ Retry-After respetado con una sola espera ({duracion:.2f}s)")
+    finally:
+        ServidorNVDSimulado.retry_after = "0"
+        servidor.shutdown()
+
+
+def test_consultas_concurrentes():
+    """Varios hilos comparten el cliente reutilizando sus conexiones."""
+    servidor = _iniciar_servidor()
+    try:
+        cliente = ClienteNVD(f"http://127.0.0.1:{servidor.server_port}/", api_key="",
+                             limite=100, periodo=0.1, espera_reintento=0.01, concurrencia=3)
+        with ThreadPoolExecutor(max_workers=cliente.concurrencia) as pool:
+            resultados = list(pool.map(lambda k: cliente.consultar(_keyword(k)), ["1", "2", "3", "4"]))
+        assert all(ok for ok, _ in resultados)
+        assert sum(ServidorNVDSimulado.intentos.values()) == 12
+        # 12 peticiones sobre como mucho 3 conexiones keep-alive
+        assert len(ServidorNVDSimulado.conexiones) <= 3
+        print("✅ Consultas concurrentes con pool de conexiones")
+    finally:
+        servidor.shutdown()
+
+
+def test_consulta_paginada():
+    """consultar_todo recorre startIndex hasta totalResults."""
+    ServidorNVDPaginado.peticiones = []
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorNVDPaginado)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        cliente = ClienteNVD(f"http://127.0.0.1:{servidor.server_port}/", api_key="", limite=100, periodo=0.1)
+        ok, datos = cliente.consultar_todo({"virtualMatchString": "cpe:2.3:a:php:php:8.1.2", "resultsPerPage": 2})
+        assert ok
+        assert [v["cve"]["id"] for v in datos] == [f"CVE-2024-{i}" for i in range(5)]
+        assert ServidorNVDPaginado.peticiones == [0, 2, 4]
+        print("✅ Consulta paginada completa")
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_limite_ventana_deslizante():
+    """Nunca hay más de `limite` peticiones en un intervalo de `periodo` segundos."""
+    ventana = LimiteVentana(2, 0.2)
+    marcas = []
+    for _ in range(6):
+        ventana.adquirir()
+        marcas.append(time.monotonic())
+    # Cada petición queda a un periodo completo de la que va dos antes
+    assert all(marcas[i] - marcas[i - 2] >= 0.2 for i in range(2, len(marcas)))
+    assert marcas[-1] - marcas[0] >= 0.4
+
+    # Tras un aviso de límite del servidor la ventana entera queda bloqueada
+    ventana.vaciar()
+    inicio = time.monotonic()
+    ventana.adquirir()
+    assert time.monotonic() - inicio >= 0.19
+    # ...el tiempo que pida el servidor, aunque supere el periodo
+    ventana.vaciar(0.3)
+    inicio = time.monotonic()
+    ventana.adquirir()
+    assert time.monotonic() - inicio >= 0.29
+    print("✅ Ventana deslizante respeta el límite")
+
+
+if __name__ == "__main__":
+    test_reintentos_ante_limitacion()
+    test_retry_after_una_sola_espera()
+    test_consultas_concurrentes()
+    test_consulta_paginada()
+    test_limite_ventana_deslizante()
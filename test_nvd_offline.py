@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test del espejo local de la NVD (app/nvd_offline.py).
+
+Genera un feed NVD JSON 2.0 mínimo en un directorio temporal, lo importa
+y comprueba que las búsquedas por palabra clave respondan sin red.
+"""
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.nvd_offline import EspejoNVD, main
+from app import analyzer
+
+
+def _cve(cve_id, publicado, descripcion, criteria):
+    return {"cve": {
+        "id": cve_id,
+        "published": publicado,
+        "descriptions": [{"lang": "en", "value": descripcion}],
+        "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": 7.5}}]},
+        "configurations": [{"nodes": [{"cpeMatch": [
+            {"vulnerable": True, "criteria": criteria, "versionEndExcluding": "8.5.51"}]}]}],
+    }}
+
+FEED = {"format": "NVD_CVE", "version": "2.0", "vulnerabilities": [
+    _cve("CVE-2020-1938", "2020-02-24T22:15:00", "Apache Tomcat AJP connector file read (Ghostcat).",
+         "cpe:2.3:a:apache:tomcat:*:*:*:*:*:*:*:*"),
+    _cve("CVE-2019-0211", "2019-04-08T22:29:00", "In Apache HTTP Server 2.4 releases, code in less-privileged child processes.",
+         "cpe:2.3:a:apache:http_server:*:*:*:*:*:*:*:*"),
+    _cve("CVE-2021-23017", "2021-06-01T13:15:00", "A security issue in nginx resolver was identified.",
+         "cpe:2.3:a:f5:nginx:*:*:*:*:*:*:*:*"),
+]}
+
+
+def test_importar_y_buscar():
+    """El espejo responde keywordSearch con el formato de la API."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        feed = os.path.join(carpeta, "nvdcve-2.0-prueba.json.gz")
+        with gzip.open(feed, "wt", encoding="utf-8") as f:
+            json.dump(FEED, f)
+        db = os.path.join(carpeta, "nvd.sqlite")
+        assert main([feed, "--db", db]) == 0
+        # Reimportar no duplica entradas
+        assert main([feed, "--db", db]) == 0
+
+        espejo = EspejoNVD(db)
+        assert espejo.total_cves() == 3
+        assert [v["cve"]["id"] for v in espejo.buscar_keyword("Apache")] == ["CVE-2019-0211", "CVE-2020-1938"]
+        assert [v["cve"]["id"] for v in espejo.buscar_keyword("apache tomcat")] == ["CVE-2020-1938"]
+        assert espejo.buscar_keyword("Apache", limite=1)[0]["cve"]["id"] == "CVE-2019-0211"
+        assert espejo.buscar_keyword("IIS") == []
+
+        original = analyzer.espejo_nvd
+        analyzer.espejo_nvd = espejo
+        try:
+            cves = analyzer.buscar_cves("nginx", backend="offline")
+        finally:
+            analyzer.espejo_nvd = original
+        assert cves[0]["cve"]["metrics"]["cvssMetricV31"][0]["cvssData"]["baseScore"] == 7.5
+        print("✅ Espejo NVD local operativo")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+def test_espejo_sin_importar():
+    """Un archivo de espejo sin esquema responde sin resultados en lugar de fallar."""
+    carpeta = tempfile.mkdtemp()
+    try:
+        db = os.path.join(carpeta, "nvd.sqlite")
+        open(db, "w").close()
+        espejo = EspejoNVD(db)
+        assert espejo.disponible()
+        assert espejo.buscar_keyword("nginx") == []
+        assert espejo.buscar_cpe("nginx", "nginx", "1.18.0") == []
+        print("✅ Espejo NVD sin importar responde sin resultados")
+    finally:
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_importar_y_buscar()
+    test_espejo_sin_importar()
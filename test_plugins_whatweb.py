@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test del registro de plugins de WhatWeb (app/plugins_whatweb.py).
+
+Comprueba que los plugins informativos no generen búsquedas de CVEs y
+que las consultas de los productos incluyan la versión detectada.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.plugins_whatweb import consulta_cve, producto_desde_cadena, clasificar_plugin, INFORMATIVO
+
+# Plugins reales de resultados/testfire.net y resultados/marfishecuador.com
+PLUGINS = {
+    "Apache": {},
+    "Cookies": {"string": ["JSESSIONID"]},
+    "Country": {"string": ["UNITED STATES"], "module": ["US"]},
+    "HTTPServer": {"string": ["Apache-Coyote/1.1"]},
+    "HttpOnly": {"string": ["JSESSIONID"]},
+    "IP": {"string": ["65.61.137.117"]},
+    "Java": {},
+    "Title": {"string": ["Altoro Mutual"]},
+    "PHP": {"version": ["8.2.28"]},
+    "X-Powered-By": {"string": ["PHP/8.2.28"]},
+    "MetaGenerator": {"string": ["WordPress 6.8.1"]},
+    "OpenSSL": {"version": ["1.0.2k-fips"]},
+}
+
+
+def test_consultas_solo_productos():
+    """Solo los productos generan consulta, con su versión."""
+    consultas = {tech: consulta_cve(tech, datos) for tech, datos in PLUGINS.items()}
+    for informativo in ("Cookies", "Country", "HttpOnly", "IP", "Title"):
+        assert clasificar_plugin(informativo) == INFORMATIVO
+        assert consultas[informativo] is None
+    assert consultas["Apache"] == "Apache"
+    assert consultas["Java"] == "Java"
+    assert consultas["HTTPServer"] == "Apache-Coyote 1.1"
+    assert consultas["PHP"] == "PHP 8.2.28"
+    assert consultas["X-Powered-By"] == "PHP 8.2.28"
+    assert consultas["MetaGenerator"] == "WordPress 6.8.1"
+    assert consultas["OpenSSL"] == "OpenSSL 1.0.2k-fips"
+    print("✅ Plugins informativos excluidos de la búsqueda de CVEs")
+
+
+def test_producto_desde_cadena():
+    """Las cadenas de cabecera se separan en producto y versión."""
+    assert producto_desde_cadena("Apache/2.4.41 (Ubuntu)") == ("Apache", "2.4.41")
+    assert producto_desde_cadena("Microsoft-IIS/10.0") == ("Microsoft-IIS", "10.0")
+    assert producto_desde_cadena("nginx") == ("nginx", None)
+    assert producto_desde_cadena("") == (None, None)
+    print("✅ Cadenas de cabecera interpretadas")
+
+
+if __name__ == "__main__":
+    test_consultas_solo_productos()
+    test_producto_desde_cadena()
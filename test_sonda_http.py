@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test de la sonda HTTP HEAD en proceso (app/sonda_http.py).
+
+Usa servidores HTTP/HTTPS locales: comprueba que las peticiones al mismo
+host reutilizan la conexión, que la heurística de SO recibe las cabeceras
+con el formato de curl -sI, que la sonda HTTPS reanuda la sesión TLS
+negociada previamente para el host y que la sonda combinada obtiene TLS y
+cabeceras por una sola conexión.
+"""
+
+import os
+import ssl
+import sys
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer, sonda_http
+from app.sonda_http import SondaHTTP
+
+
+class ManejadorIIS(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    conexiones = set()
+
+    def do_HEAD(self):
+        ManejadorIIS.conexiones.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Server", "Microsoft-IIS/10.0")
+        self.send_header("X-AspNet-Version", "4.0.30319")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _servidor(contexto=None):
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ManejadorIIS)
+    if contexto is not None:
+        servidor.socket = contexto.wrap_socket(servidor.socket, server_side=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def test_head_reutiliza_conexion():
+    """Varias sondas al mismo host usan una sola conexión keep-alive."""
+    ManejadorIIS.conexiones = set()
+    servidor = _servidor()
+    sonda = SondaHTTP()
+    try:
+        url = f"http://127.0.0.1:{servidor.server_port}/"
+        cabeceras = [sonda.head(url) for _ in range(5)]
+        assert all(c.startswith("HTTP/1.1 200 OK\r\n") for c in cabeceras)
+        assert "Server: Microsoft-IIS/10.0" in cabeceras[0]
+        assert analyzer.clasificar_sistema_operativo(cabeceras[0]) == "Windows/IIS"
+        assert sonda.conexiones_creadas == 1
+        assert len(ManejadorIIS.conexiones) == 1
+        print("✅ 5 sondas HEAD sobre una única conexión")
+    finally:
+        sonda.cerrar()
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_host_sin_respuesta():
+    """Un puerto cerrado produce "Desconocido" sin excepciones."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+    original = analyzer.sonda_http
+    analyzer.sonda_http = SondaHTTP(timeout=2)
+    try:
+        assert analyzer.detectar_sistema_operativo(f"http://127.0.0.1:{puerto}") == "Desconocido"
+        print("✅ Host sin respuesta clasificado como Desconocido")
+    finally:
+        analyzer.sonda_http = original
+
+
+def _contexto_servidor_tls(carpeta):
+    """Certificado autofirmado para localhost, aceptado por contexto_tls."""
+    certificado = os.path.join(carpeta, "cert.pem")
+    clave = os.path.join(carpeta, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+                    "-keyout", clave, "-out", certificado],
+                   check=True, capture_output=True)
+    contexto_servidor = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    contexto_servidor.maximum_version = ssl.TLSVersion.TLSv1_2
+    contexto_servidor.load_cert_chain(certificado, clave)
+    sonda_http.contexto_tls.load_verify_locations(certificado)
+    return contexto_servidor
+
+
+def test_https_reanuda_sesion_tls():
+    """La sonda HTTPS reanuda la sesión TLS guardada para el host."""
+    if shutil.which("openssl") is None:
+        print("⏭️ openssl no disponible: se omite la prueba de sesión TLS")
+        return
+    carpeta = tempfile.mkdtemp()
+    servidor = _servidor(_contexto_servidor_tls(carpeta))
+    sonda = SondaHTTP()
+    try:
+        # Handshake previo, como el de verificar_tls
+        with socket.create_connection(("127.0.0.1", servidor.server_port)) as sock:
+            with sonda_http.contexto_tls.wrap_socket(sock, server_hostname="localhost") as ssock:
+                sonda.guardar_sesion_tls("localhost", ssock.session)
+
+        cabeceras = sonda.head(f"https://localhost:{servidor.server_port}/", ip="127.0.0.1")
+        assert "Microsoft-IIS" in cabeceras
+        conexion = sonda._libres[("https", "localhost", servidor.server_port)][0]
+        assert conexion.sock.session_reused
+        print("✅ Sonda HTTPS con sesión TLS reanudada")
+    finally:
+        sonda.cerrar()
+        servidor.shutdown()
+        servidor.server_close()
+        shutil.rmtree(carpeta)
+
+
+def test_certificado_invalido_sin_segundo_handshake():
+    """Un certificado que no se verifica falla sin repetir la conexión."""
+    if shutil.which("openssl") is None:
+        print("⏭️ openssl no disponible: se omite la prueba de certificado inválido")
+        return
+    carpeta = tempfile.mkdtemp()
+    servidor = _servidor(_contexto_servidor_tls(carpeta))
+    original = socket.create_connection
+    conexiones = []
+
+    def contar(*args, **kwargs):
+        conexiones.append(args[0])
+        return original(*args, **kwargs)
+    socket.create_connection = contar
+    try:
+        # El certificado es para localhost, no para la IP
+        conexion = sonda_http._ConexionHTTPS("127.0.0.1", servidor.server_port)
+        try:
+            conexion.connect()
+            assert False, "se esperaba ssl.SSLCertVerificationError"
+        except ssl.SSLCertVerificationError:
+            pass
+        assert len(conexiones) == 1
+        print("✅ Certificado inválido sin segundo handshake")
+    finally:
+        socket.create_connection = original
+        servidor.shutdown()
+        servidor.server_close()
+        shutil.rmtree(carpeta)
+
+
+def test_sonda_combinada_una_conexion():
+    """TLS y cabeceras por una conexión; la detección de SO no abre otra."""
+    if shutil.which("openssl") is None:
+        print("⏭️ openssl no disponible: se omite la prueba de sonda combinada")
+        return
+    carpeta = tempfile.mkdtemp()
+    ManejadorIIS.conexiones = set()
+    servidor = _servidor(_contexto_servidor_tls(carpeta))
+    original = analyzer.sonda_http
+    analyzer.sonda_http = sonda = SondaHTTP()
+    try:
+        (certificado, cifrado, version), cabeceras = sonda.sondear_https(
+            "localhost", servidor.server_port, ip="127.0.0.1")
+        assert version == "TLSv1.2"
+        assert cifrado[0] and certificado.get("notAfter")
+        assert "Server: Microsoft-IIS/10.0" in cabeceras
+
+        assert analyzer.detectar_sistema_operativo("http://localhost") == "Windows/IIS"
+        assert sonda.conexiones_creadas == 1
+        assert len(ManejadorIIS.conexiones) == 1
+        print("✅ Certificado, cifrado, versión y cabeceras con un solo handshake")
+    finally:
+        analyzer.sonda_http = original
+        sonda.cerrar()
+        servidor.shutdown()
+        servidor.server_close()
+        shutil.rmtree(carpeta)
+
+
+def test_head_reutiliza_conexion_de_sondeo_con_ip():
+    """Un HEAD por nombre reutiliza la conexión abierta por sondear_https hacia la IP."""
+    if shutil.which("openssl") is None:
+        print("⏭️ openssl no disponible: se omite la prueba de reutilización HTTPS")
+        return
+    carpeta = tempfile.mkdtemp()
+    ManejadorIIS.conexiones = set()
+    servidor = _servidor(_contexto_servidor_tls(carpeta))
+    sonda = SondaHTTP()
+    try:
+        sonda.sondear_https("localhost", servidor.server_port, ip="127.0.0.1")
+        cabeceras = sonda.head(f"https://localhost:{servidor.server_port}/")
+        assert "Microsoft-IIS" in cabeceras
+        assert sonda.conexiones_creadas == 1
+        assert len(ManejadorIIS.conexiones) == 1
+        print("✅ HEAD por nombre sobre la conexión del sondeo TLS")
+    finally:
+        sonda.cerrar()
+        servidor.shutdown()
+        servidor.server_close()
+        shutil.rmtree(carpeta)
+
+
+if __name__ == "__main__":
+    test_head_reutiliza_conexion()
+    test_host_sin_respuesta()
+    test_https_reanuda_sesion_tls()
+    test_certificado_invalido_sin_segundo_handshake()
+    test_sonda_combinada_una_conexion()
+    test_head_reutiliza_conexion_de_sondeo_con_ip()
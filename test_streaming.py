@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test del modo streaming de analizar_dominio.
+
+Sustituye assetfinder y whatweb por scripts locales que emiten resultados
+poco a poco, y comprueba que los hosts se procesen mientras WhatWeb
+todavía está escribiendo. Las sondas de red se simulan.
+"""
+
+import os
+import sys
+import json
+import time
+import stat
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import analyzer
+
+ASSETFINDER = """#!/bin/sh
+for h in a b c d; do echo "$h.ejemplo.com"; sleep 0.1; done
+echo "a.ejemplo.com"
+"""
+
+WHATWEB = """#!/usr/bin/env python3
+import json, sys, time
+args = sys.argv[1:]
+entrada = args[args.index("-i") + 1]
+salida = args[args.index("--log-json") + 1]
+with open(entrada) as fin, open(salida, "a") as fout:
+    fout.write("[\\n"); fout.flush()
+    primero = True
+    for linea in fin:
+        host = linea.strip()
+        if not primero:
+            fout.write(",\\n")
+        primero = False
+        fout.write(json.dumps({"target": "http://" + host, "plugins": {"Apache": {}, "Title": {}}}) + "\\n")
+        fout.flush()
+    fout.write("]\\n")
+"""
+
+
+def _script(carpeta, nombre, contenido):
+    ruta = os.path.join(carpeta, nombre)
+    with open(ruta, "w") as f:
+        f.write(contenido)
+    os.chmod(ruta, os.stat(ruta).st_mode | stat.S_IEXEC)
+
+
+def test_streaming_solapa_etapas(analyzer_simulado, monkeypatch, tmp_path):
+    """Los hosts se sondean antes de que AssetFinder y WhatWeb terminen."""
+    bin_dir = os.path.join(tmp_path, "bin")
+    os.makedirs(bin_dir)
+    _script(bin_dir, "assetfinder", ASSETFINDER)
+    _script(bin_dir, "whatweb", WHATWEB)
+
+    inicios = {}
+    inicio = time.monotonic()
+
+    def sistema_operativo_falso(url):
+        inicios[url] = time.monotonic() - inicio
+        return "Linux"
+
+    monkeypatch.setenv("PATH", bin_dir + os.pathsep + os.environ["PATH"])
+    analyzer_simulado(detectar_sistema_operativo=sistema_operativo_falso)
+    resultados = analyzer.analizar_dominio("ejemplo.com", concurrencia=2, streaming=True)
+    duracion = time.monotonic() - inicio
+
+    carpeta_dominio = os.path.join(analyzer.RESULTADOS_DIR, "ejemplo.com")
+    with open(os.path.join(carpeta_dominio, "subdominios.txt")) as f:
+        assert f.read().split() == ["a.ejemplo.com", "b.ejemplo.com", "c.ejemplo.com", "d.ejemplo.com"]
+    with open(os.path.join(carpeta_dominio, "metadata.json")) as f:
+        metadata = json.load(f)
+    assert metadata["estadisticas_puertos"]["total_hosts_escaneados"] == 4
+    assert len(resultados) == 8
+    # El primer host se sondeó mientras AssetFinder seguía emitiendo
+    assert inicios["http://a.ejemplo.com"] < duracion - 0.2
+    print("✅ Etapas solapadas en modo streaming")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-q", "-s", __file__]))